@@ -0,0 +1,34 @@
+"""Measure the memory allocated by evaluating expressions.
+
+Evaluates a comparison and a small-integer addition many times, keeping
+every result alive, and uses tracemalloc to report the bytes allocated
+per evaluation. Results that are shared (the canonical TRUE and FALSE
+objects, cached small Numbers) cost only the list slot that holds them.
+
+"""
+
+from simple.simple_expressions import Add, LessThan, Number, Variable
+
+import tracemalloc
+
+N = 100000
+
+
+def bytes_per_evaluation(expression, environment):
+    """Produce the bytes allocated per retained evaluation result."""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    results = [expression.evaluate(environment) for _ in range(N)]
+    end = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return (end - start) / N
+
+
+env = dict(i=Number(17), limit=Number(24), big=Number(10 ** 6))
+for name, expression in [
+        ("i < limit", LessThan(Variable('i'), Variable('limit'))),
+        ("i + 1", Add(Variable('i'), Number(1))),
+        ("big + 1", Add(Variable('big'), Number(1)))]:
+    print("{0:12} {1:6.1f} bytes per evaluation".format(
+        name, bytes_per_evaluation(expression, env)))
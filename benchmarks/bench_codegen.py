@@ -0,0 +1,54 @@
+"""Compare the cost of generating Python code by the two routes.
+
+Builds straight-line programs of up to 100000 statements and reports
+the best time to compile each with simple_python (to_python() source
+text, parsed by compile()) and with simple_ast (ast nodes handed to
+compile()), along with the time per statement, which stays flat if
+code generation is linear. timeit pauses the cyclic garbage collector
+while it times; the ast route is timed again with it running, since
+its passes over the growing tree of nodes are a large part of the cost.
+
+"""
+
+from simple.simple_ast import compile_ast
+from simple.simple_expressions import Add, LessThan, Multiply, Number, \
+    Variable
+from simple.simple_python import compile_python
+from simple.simple_statements import Assign, Block, If
+
+import gc
+import timeit
+
+# Every other statement is an If, so that the programs nest a little.
+#
+VARIABLES = 64
+names = ["x{0}".format(i) for i in range(VARIABLES)]
+
+
+def build(statements):
+    """Produce a program of the given number of statements."""
+    def statement(i):
+        assign = Assign(
+            names[i % VARIABLES],
+            Add(
+                Variable(names[(i + 1) % VARIABLES]),
+                Multiply(Number(i), Variable('y'))))
+        if i % 2:
+            return If(
+                LessThan(Variable('y'), Number(i)), assign, Block([]))
+        return assign
+    return Block(statement(i) for i in range(statements))
+
+
+for statements in (10000, 50000, 100000):
+    program = build(statements)
+    print("statements={0}".format(statements))
+    for name, compiler, setup in (
+            ("python", compile_python, "pass"),
+            ("ast", compile_ast, "pass"),
+            ("ast+gc", compile_ast, "gc.enable()")):
+        seconds = min(timeit.repeat(
+            "compiler(program)", setup=setup, number=1, repeat=3,
+            globals=dict(compiler=compiler, gc=gc, program=program)))
+        print("  {0:8s} {1:8.3f}s  {2:6.2f}us/statement".format(
+            name, seconds, seconds / statements * 1e6))
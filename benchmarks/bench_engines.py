@@ -0,0 +1,59 @@
+"""Compare the execution engines on the phi-env example.
+
+Runs the phi-env example loop with large limits under every engine in
+simple.simple_engines.ENGINES and reports the best of several runs for
+each, along with the cost of compiling the program. The x values grow
+without bound, so at the larger limits big-integer arithmetic accounts
+for a growing share of the time and the engines draw closer together.
+
+"""
+
+from pypeg2 import parse
+import parsing.parsing_simple as p
+from simple.simple_engines import compile_program, ENGINES
+from simple.simple_expressions import Number
+
+import os
+import timeit
+
+# Load the phi-env example
+#
+fn = os.path.join(
+    os.path.dirname(__file__), "..", "examples", "phi-env", "example.simple")
+with open(fn, "r", encoding="utf-8") as f:
+    smpl = parse(f.read(), p.Program).to_simple()
+
+
+def environment(limit):
+    """Produce the phi-env inputs."""
+    return dict([
+        ('phi', Number(0)),
+        ('x0', Number(0)),
+        ('x1', Number(4567)),
+        ('x2', Number(7654)),
+        ('i', Number(0)),
+        ('limit', Number(limit))])
+
+
+def best(stmt, arg, repeat=5):
+    """Produce the best time of several runs of stmt(arg)."""
+    return min(timeit.repeat(
+        "stmt(arg)", number=1, repeat=repeat,
+        globals=dict(stmt=stmt, arg=arg)))
+
+
+print("compile")
+for engine in sorted(ENGINES):
+    print("  {0:10s} {1:10.6f}s".format(
+        engine, best(lambda s: compile_program(s, engine), smpl)))
+
+for limit in (1000, 10000, 100000):
+    env = environment(limit)
+    print("limit={0}".format(limit))
+    baseline = None
+    for engine in sorted(ENGINES, key=lambda name: name != "tree"):
+        program = compile_program(smpl, engine)
+        seconds = best(program.evaluate, env, repeat=3)
+        baseline = baseline or seconds
+        print("  {0:10s} {1:10.4f}s  {2:5.1f}x".format(
+            engine, seconds, baseline / seconds))
@@ -0,0 +1,56 @@
+"""Compare functional evaluate() with in-place execute().
+
+Runs the phi-env example loop with a large limit, against a small
+environment and against one seeded with thousands of extra variables,
+and reports the best of several runs for each execution mode.
+
+"""
+
+from pypeg2 import parse
+import parsing.parsing_simple as p
+from simple.simple_environments import MutableEnvironment, \
+    PersistentEnvironment
+from simple.simple_expressions import Number
+
+import os
+import timeit
+
+# Load and compile the phi-env example
+#
+fn = os.path.join(
+    os.path.dirname(__file__), "..", "examples", "phi-env", "example.simple")
+with open(fn, "r", encoding="utf-8") as f:
+    smpl = parse(f.read(), p.Program).to_simple()
+
+
+def environment(limit, extra):
+    """Produce the phi-env inputs plus some unrelated variables."""
+    env = dict([
+        ('phi', Number(0)),
+        ('x0', Number(0)),
+        ('x1', Number(4567)),
+        ('x2', Number(7654)),
+        ('i', Number(0)),
+        ('limit', Number(limit))])
+    env.update(("v{0}".format(i), Number(i)) for i in range(extra))
+    return env
+
+
+def best(stmt, setup=lambda: None):
+    """Produce the best time of several runs of stmt(setup())."""
+    return min(timeit.repeat(
+        "stmt(arg)", setup="arg = setup()", number=1, repeat=5,
+        globals=dict(stmt=stmt, setup=setup)))
+
+
+for limit, extra in [(20000, 0), (2000, 5000)]:
+    env = environment(limit, extra)
+    print("limit={0}, {1} extra variables".format(limit, extra))
+    print("  evaluate(dict)               {0:8.4f}s".format(
+        best(smpl.evaluate, lambda: env)))
+    print("  evaluate(PersistentEnv)      {0:8.4f}s".format(
+        best(smpl.evaluate, lambda: PersistentEnvironment(env))))
+    print("  execute(dict)                {0:8.4f}s".format(
+        best(smpl.execute, lambda: dict(env))))
+    print("  execute(MutableEnvironment)  {0:8.4f}s".format(
+        best(smpl.execute, lambda: MutableEnvironment(env))))
@@ -0,0 +1,34 @@
+"""Time the evaluation of deep arithmetic expressions.
+
+Builds left-nested chains of additions and multiplications over a
+variable and evaluates each many times, reporting the time per operator.
+
+"""
+
+from simple.simple_expressions import Add, LessThan, Multiply, Number, \
+    Variable
+
+import timeit
+
+OPERATORS = 64
+N = 2000
+
+
+def chain(operator, operand):
+    """Produce a left-nested chain of OPERATORS operations."""
+    expression = Variable('x')
+    for _ in range(OPERATORS):
+        expression = operator(expression, operand)
+    return expression
+
+
+env = dict(x=Number(12345678901), y=Number(1.5))
+for name, expression in [
+        ("x + 3 + 3 ...", chain(Add, Number(3))),
+        ("x * 1 * 1 ...", chain(Multiply, Number(1))),
+        ("x + y + y ...", chain(Add, Variable('y'))),
+        ("(x + 3 ...) < x", LessThan(chain(Add, Number(3)), Variable('x')))]:
+    seconds = min(timeit.repeat(
+        lambda: expression.evaluate(env), number=N, repeat=5))
+    print("{0:16} {1:6.1f} ns per operator".format(
+        name, seconds / N / OPERATORS * 1e9))
@@ -0,0 +1,61 @@
+"""Measure the cost of enforcing Limits on the phi-env example.
+
+Runs the phi-env example loop under every engine in
+simple.simple_engines.ENGINES, first without limits and then held to
+Limits on every resource (set high enough never to be reached), and
+reports the best of several interleaved runs of each, so that both
+see the same conditions on a noisy machine, with the overhead of the
+checks. The loop does no multiplication, so each iteration pays for
+one counted iteration.
+
+"""
+
+from pypeg2 import parse
+import parsing.parsing_simple as p
+from simple.simple_engines import compile_program, ENGINES
+from simple.simple_expressions import Number
+from simple.simple_limits import Limits
+
+import os
+import time
+
+# Load the phi-env example
+#
+fn = os.path.join(
+    os.path.dirname(__file__), "..", "examples", "phi-env", "example.simple")
+with open(fn, "r", encoding="utf-8") as f:
+    smpl = parse(f.read(), p.Program).to_simple()
+
+
+def environment(limit):
+    """Produce the phi-env inputs."""
+    return dict([
+        ('phi', Number(0)),
+        ('x0', Number(0)),
+        ('x1', Number(4567)),
+        ('x2', Number(7654)),
+        ('i', Number(0)),
+        ('limit', Number(limit))])
+
+
+def best(stmts, arg, repeat=15):
+    """Produce the best times of interleaved runs of each stmt(arg)."""
+    times = [[] for _ in stmts]
+    for _ in range(repeat):
+        for stmt, seconds in zip(stmts, times):
+            started = time.perf_counter()
+            stmt(arg)
+            seconds.append(time.perf_counter() - started)
+    return [min(seconds) for seconds in times]
+
+
+limits = Limits(iterations=10 ** 9, variables=1000, bits=10 ** 9, seconds=60)
+for limit in (1000, 10000):
+    env = environment(limit)
+    print("limit={0}".format(limit))
+    for engine in sorted(ENGINES):
+        free, governed = best((
+            compile_program(smpl, engine).evaluate,
+            compile_program(smpl, engine, limits).evaluate), env)
+        print("  {0:10s} {1:10.4f}s {2:10.4f}s  {3:+6.1f}%".format(
+            engine, free, governed, (governed / free - 1) * 100))
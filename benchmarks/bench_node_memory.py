@@ -0,0 +1,59 @@
+"""Measure the memory used per node of a large program.
+
+Builds a straight-line program of roughly 100000 expression and
+statement nodes while tracing allocations, and reports the bytes
+allocated per node. The program is built twice: once from the node
+classes, which declare __slots__, and once, as a baseline, from classes
+with the same constructors but without __slots__, whose instances keep
+their attributes in a per-instance __dict__ as the nodes used to.
+
+"""
+
+from simple.simple_expressions import Add, Multiply, Number, Variable
+from simple.simple_statements import Assign, Block
+
+import tracemalloc
+
+# Each assignment "xI = xJ + I * y;" is 6 nodes: Assign, Add, Variable,
+# Multiply, Number and Variable. The enclosing Block is one more.
+#
+NODES_PER_STATEMENT = 6
+STATEMENTS = 100000 // NODES_PER_STATEMENT
+names = ["x{0}".format(i) for i in range(STATEMENTS)]
+
+
+def unslotted(cls):
+    """Produce a class like cls, whose instances have a __dict__."""
+    return type(cls.__name__, (), {"__init__": cls.__init__})
+
+
+def build(add, assign, block, multiply, number, variable):
+    """Produce the program from the given node classes."""
+    return block(
+        assign(
+            names[i],
+            add(
+                variable(names[i - 1]),
+                multiply(number(i), variable('y'))))
+        for i in range(STATEMENTS))
+
+
+def measure(classes):
+    """Produce the bytes allocated to build the program."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    program = build(*classes)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del program
+    return sum(
+        stat.size_diff for stat in after.compare_to(before, "filename"))
+
+
+nodes = NODES_PER_STATEMENT * STATEMENTS + 1
+classes = (Add, Assign, Block, Multiply, Number, Variable)
+for label, allocated in (
+        ("__dict__", measure([unslotted(cls) for cls in classes])),
+        ("__slots__", measure(classes))):
+    print("{0:9s} {1} nodes, {2} bytes allocated, {3:.1f} bytes per node"
+          .format(label, nodes, allocated, allocated / nodes))
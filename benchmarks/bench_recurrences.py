@@ -0,0 +1,58 @@
+"""Measure loop acceleration on the phi-env example.
+
+Runs the phi-env example loop with the tree walker as parsed, pruned by
+eliminate_dead_code(), which moves phi = x2 / x1 out of the loop, and
+then accelerated by accelerate_loops(), and reports the best of several
+interleaved runs of each. The accelerated loop takes O(log limit)
+matrix products, but of ints that grow with limit, like the loop's own.
+
+"""
+
+from pypeg2 import parse
+import parsing.parsing_simple as p
+from simple.simple_elimination import eliminate_dead_code
+from simple.simple_expressions import Number
+from simple.simple_recurrences import accelerate_loops
+
+import os
+import time
+
+# Load the phi-env example
+#
+fn = os.path.join(
+    os.path.dirname(__file__), "..", "examples", "phi-env", "example.simple")
+with open(fn, "r", encoding="utf-8") as f:
+    smpl = parse(f.read(), p.Program).to_simple()
+pruned = eliminate_dead_code(smpl, ["phi"])
+accelerated = accelerate_loops(pruned)
+
+
+def environment(limit):
+    """Produce the phi-env inputs."""
+    return dict([
+        ('phi', Number(0)),
+        ('x0', Number(0)),
+        ('x1', Number(4567)),
+        ('x2', Number(7654)),
+        ('i', Number(0)),
+        ('limit', Number(limit))])
+
+
+def best(stmts, arg, repeat=5):
+    """Produce the best times of interleaved runs of each stmt(arg)."""
+    times = [[] for _ in stmts]
+    for _ in range(repeat):
+        for stmt, seconds in zip(stmts, times):
+            started = time.perf_counter()
+            stmt(arg)
+            seconds.append(time.perf_counter() - started)
+    return [min(seconds) for seconds in times]
+
+
+print("{0:>8s} {1:>10s} {2:>10s} {3:>12s}".format(
+    "limit", "parsed", "pruned", "accelerated"))
+for limit in (100, 1000, 10000, 100000):
+    env = environment(limit)
+    assert accelerated.evaluate(env)['phi'] == smpl.evaluate(env)['phi']
+    print("{0:8d} {1:9.5f}s {2:9.5f}s {3:11.5f}s".format(limit, *best((
+        smpl.evaluate, pruned.evaluate, accelerated.evaluate), env)))
@@ -0,0 +1,54 @@
+"""Measure the cost of running many programs on one Scheduler.
+
+Submits thousands of small phi-env programs to a Scheduler and reports
+the time to run them all to completion, per program, for a few step
+quanta, against evaluating the same programs one after another.
+
+"""
+
+from pypeg2 import parse
+import parsing.parsing_simple as p
+from simple.simple_expressions import Number
+from simple.simple_scheduler import Scheduler
+
+import os
+import time
+
+# Load the phi-env example
+#
+fn = os.path.join(
+    os.path.dirname(__file__), "..", "examples", "phi-env", "example.simple")
+with open(fn, "r", encoding="utf-8") as f:
+    smpl = parse(f.read(), p.Program).to_simple()
+
+
+def environment(limit):
+    """Produce the phi-env inputs."""
+    return dict([
+        ('phi', Number(0)),
+        ('x0', Number(0)),
+        ('x1', Number(4567)),
+        ('x2', Number(7654)),
+        ('i', Number(0)),
+        ('limit', Number(limit))])
+
+
+count = 10000
+envs = [environment(10 + i % 20) for i in range(count)]
+
+started = time.perf_counter()
+for env in envs:
+    smpl.evaluate(env)
+seconds = time.perf_counter() - started
+print("{0} programs".format(count))
+print("  evaluate() in turn  {0:8.4f}s  {1:8.1f}us/program".format(
+    seconds, seconds / count * 1e6))
+
+for quantum in (10, 100, 1000):
+    scheduler = Scheduler(quantum)
+    started = time.perf_counter()
+    futures = [scheduler.submit(smpl, env) for env in envs]
+    scheduler.run()
+    seconds = time.perf_counter() - started
+    print("  quantum={0:<5d}       {1:8.4f}s  {2:8.1f}us/program".format(
+        quantum, seconds, seconds / count * 1e6))
@@ -0,0 +1,177 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module parsing.parsing_cache.
+
+Loads simple programs from source files through an on-disk cache of
+their translated statement trees, much as Python keeps compiled modules
+in __pycache__. A cache entry is keyed by a SHA-256 hash of the source
+and records a hash of the sources of the translator that wrote it: the
+modules of the parsing and simple packages, which define the parser,
+the transformations Program.to_simple() applies and the classes of the
+pickled nodes. An edited program, or an edited translator, is therefore
+translated afresh, without a version number to remember to bump. On a
+cache hit the program is unpickled directly and pyPEG2 is never
+imported.
+
+Cache entries are pickles, so a cache directory must be trusted as much
+as the source files themselves.
+
+"""
+
+import hashlib
+import os
+import pickle
+
+import simple
+
+CACHE_DIRECTORY = "__simplecache__"
+CACHE_SUFFIX = ".simplec"
+_MAGIC = "simple-program-cache"
+
+# The translator_digest() of this process, once computed
+#
+_translator = None
+
+
+def cache_path(source_path, source, cache_dir=None):
+    """Produce the path of the cache entry for a program source.
+
+    Args:
+        source_path: the path of the .simple source file.
+        source: the bytes of the source.
+        cache_dir: the directory that holds cache entries. If None, the
+            entries are kept in a __simplecache__ directory beside the
+            source file.
+
+    Returns:
+        The path of the cache entry, named by the hash of the source.
+
+    """
+    return _cache_path(
+        source_path, hashlib.sha256(source).hexdigest(), cache_dir)
+
+
+def load_program(source_path, cache_dir=None):
+    """Load a program, translating its source only if it is not cached.
+
+    Args:
+        source_path: the path of the .simple source file, which is
+            UTF-8 encoded.
+        cache_dir: the directory that holds cache entries, created if
+            need be. If None, a __simplecache__ directory beside the
+            source file is used.
+
+    Returns:
+        The statement translated from the program, as
+        Program.to_simple() would produce it.
+
+    A cache entry that cannot be read, or that was written from other
+    source or by another translator, is ignored and replaced.
+    Failure to write an entry is ignored, as the program has been
+    translated anyway.
+
+    """
+    with open(source_path, "rb") as f:
+        source = f.read()
+    digest = hashlib.sha256(source).hexdigest()
+    path = _cache_path(source_path, digest, cache_dir)
+    header = (_MAGIC, translator_digest(), digest)
+
+    statement = _read(path, header)
+    if statement is None:
+        statement = translate(source.decode("utf-8"))
+        _write(path, header, statement)
+    return statement
+
+
+def translator_digest():
+    """Produce a hash of the sources of the translator.
+
+    Returns:
+        A SHA-256 hex digest of the Python sources of the parsing and
+        simple packages, read once per process, so that it changes
+        whenever a change to them could change what a cache entry
+        should hold.
+
+    """
+    global _translator
+    if _translator is None:
+        _translator = source_digest([
+            os.path.dirname(os.path.abspath(__file__)),
+            os.path.dirname(os.path.abspath(simple.__file__))])
+    return _translator
+
+
+def source_digest(directories):
+    """Produce a hash of the Python sources in some directories.
+
+    Args:
+        directories: a sequence of directory paths.
+
+    Returns:
+        A SHA-256 hex digest of the names and contents of the .py files
+        directly within the directories, taken in order.
+
+    """
+    sha = hashlib.sha256()
+    for directory in directories:
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".py"):
+                with open(os.path.join(directory, name), "rb") as f:
+                    source = f.read()
+                sha.update(name.encode("utf-8") + b"\0")
+                sha.update(hashlib.sha256(source).digest())
+    return sha.hexdigest()
+
+
+def translate(text):
+    """Translate program source text to a statement.
+
+    Args:
+        text: the source of a simple program.
+
+    Returns:
+        The statement produced by Program.to_simple().
+
+    """
+    from pypeg2 import parse
+    import parsing.parsing_simple as p
+
+    return parse(text, p.Program).to_simple()
+
+
+def _cache_path(source_path, digest, cache_dir):
+    if cache_dir is None:
+        cache_dir = os.path.join(
+            os.path.dirname(os.path.abspath(source_path)), CACHE_DIRECTORY)
+    return os.path.join(cache_dir, digest + CACHE_SUFFIX)
+
+
+def _read(path, header):
+    """Produce the cached statement, or None if there is no valid entry."""
+    try:
+        with open(path, "rb") as f:
+            if pickle.load(f) != header:
+                return None
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _write(path, header, statement):
+    """Write a cache entry, replacing any other atomically."""
+    temporary_path = "{0}.{1}.tmp".format(path, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary_path, "wb") as f:
+            pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(statement, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+    except (OSError, pickle.PicklingError, RecursionError):
+        try:
+            os.remove(temporary_path)
+        except OSError:
+            pass
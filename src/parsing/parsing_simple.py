@@ -9,6 +9,8 @@ from re import compile as regex
 from pypeg2 import Enum, Keyword, K, Literal, List, Symbol, some
 import simple.simple_expressions as s_e
 import simple.simple_statements as s_s
+from simple.simple_folding import fold_constants
+from simple.simple_fusion import fuse
 
 
 class Add(List):
@@ -77,26 +79,6 @@ class Block(List):
 
     """Matches a block of statements."""
 
-    def _to_simple_subblock(self, remaining):
-        """Nest additional statements within Sequence objects.
-
-        This is a helper method for to_simple(). Required because
-        the simple Sequence object only holds two statements. We
-        take advantage of the fact that one or both of those
-        statements can also be a Sequence object. By nesting
-        Sequence objects, we can represent a block of arbitrary
-        length.
-
-        """
-        if 2 < len(remaining):
-            return s_s.Sequence(
-                remaining[0].to_simple(),
-                self._to_simple_subblock(remaining[1:]))
-        else:
-            return s_s.Sequence(
-                remaining[0].to_simple(),
-                remaining[1].to_simple())
-
     def compose(self, p, **x):
         """Produce the equivalent simple language as matched.
 
@@ -114,7 +96,7 @@ class Block(List):
         if 1 == len(self):
             return self[0].to_simple()
         else:
-            return self._to_simple_subblock(self[:])
+            return s_s.Block(statement.to_simple() for statement in self)
 
 
 class Boolean(Literal):
@@ -330,8 +312,14 @@ class Program(List):
         return p.compose(self[0], **x)
 
     def to_simple(self):
-        """Generate corresponding simple object that can be evaluated."""
-        return self[0].to_simple()
+        """Generate corresponding simple object that can be evaluated.
+
+        Constants are folded and propagated by simple_folding, then the
+        common statement and condition shapes are replaced with the
+        fused nodes of simple_fusion.
+
+        """
+        return fuse(fold_constants(self[0].to_simple()))
 
 
 class Subtract(List):
@@ -361,7 +349,7 @@ class Variable(str):
 
     def to_simple(self):
         """Generate corresponding simple object that can be evaluated."""
-        return s_e.Variable(self)
+        return s_e.Variable(str(self))
 
 
 class While(List):
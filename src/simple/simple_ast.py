@@ -0,0 +1,302 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_ast.
+
+Runs a program like simple_python does, but builds the function as a
+tree of Python ast nodes and hands that straight to compile(), rather
+than formatting source text that CPython must then parse. The function
+produced is the same, so the two backends evaluate programs alike.
+
+"""
+
+import ast
+
+from .simple_expressions import Add, And, Boolean, Divide, GreaterThan, \
+    LessThan, Multiply, Not, Number, Or, Subtract, Variable
+from .simple_limits import Check, hooks
+from .simple_python import fold_condition, is_boolean, local_name, \
+    PythonProgram
+from .simple_statements import Assign, Block, Delete, DoNothing, If, \
+    Sequence, While
+from .simple_trees import dispatch
+
+# Every generated node is placed at line 1, column 0. Giving each node
+# its location as it is made is much cheaper than a later pass of
+# ast.fix_missing_locations() over the whole tree.
+#
+_AT = dict(lineno=1, col_offset=0, end_lineno=1, end_col_offset=0)
+_IS = ast.Is()
+_LOAD = ast.Load()
+_STORE = ast.Store()
+_COUNTDOWN_LOAD = ast.Name(id="countdown", ctx=_LOAD, **_AT)
+_COUNTDOWN_STORE = ast.Name(id="countdown", ctx=_STORE, **_AT)
+
+
+class AstProgram(PythonProgram):
+
+    """Represents a program compiled to a Python function via the ast."""
+
+    def _compile(self):
+        """Produce the code object that defines the run() function."""
+        tree = function_tree(self.statement, self.names)
+        return compile(tree, "<simple>", "exec")
+
+
+def compile_ast(statement):
+    """Compile a program to a Python function via the ast module.
+
+    Args:
+        statement: the statement to be compiled.
+
+    Returns:
+        An AstProgram.
+
+    """
+    return AstProgram(statement)
+
+
+def function_tree(statement, names):
+    """Produce the ast of the function that runs a program.
+
+    Args:
+        statement: the statement to be translated.
+        names: a sequence of the variable names of the program, indexed
+            by slot.
+
+    Returns:
+        An ast.Module defining run(frame), which takes a frame of plain
+        values, as produced by unbox_frame(), and returns the updated
+        frame, as the function built by simple_python does. Leaf nodes
+        for the same variable or constant are shared within the tree.
+
+    """
+    governed = bool(hooks(statement))
+    generator = _Generator()
+    load = generator.load
+    store = generator.store
+    body = []
+    if names:
+        body.append(ast.Assign(
+            targets=[ast.Tuple(
+                elts=[store(name) for name in names], ctx=_STORE, **_AT)],
+            value=ast.Name(id="frame", ctx=_LOAD, **_AT), **_AT))
+        for name in names:
+            body.append(ast.If(
+                test=ast.Compare(
+                    left=load(name), ops=[_IS],
+                    comparators=[generator.constant(None)], **_AT),
+                body=[ast.Delete(
+                    targets=[ast.Name(
+                        id=local_name(name), ctx=ast.Del(), **_AT)],
+                    **_AT)],
+                orelse=[], **_AT))
+    if governed:
+        body.append(ast.Assign(
+            targets=[_COUNTDOWN_STORE], value=generator.constant(0), **_AT))
+    body.extend(generator.statements(statement))
+    if governed:
+        body.append(ast.Expr(
+            value=_call(_name("settle"), _COUNTDOWN_LOAD), **_AT))
+    body.append(ast.Assign(
+        targets=[ast.Name(id="values", ctx=_STORE, **_AT)],
+        value=_call(ast.Name(id="locals", ctx=_LOAD, **_AT)), **_AT))
+    values_get = ast.Attribute(
+        value=ast.Name(id="values", ctx=_LOAD, **_AT), attr="get",
+        ctx=_LOAD, **_AT)
+    body.append(ast.Return(
+        value=ast.List(
+            elts=[
+                _call(values_get, generator.constant(local_name(name)))
+                for name in names],
+            ctx=_LOAD, **_AT),
+        **_AT))
+    function = ast.FunctionDef(
+        name="run",
+        args=ast.arguments(
+            posonlyargs=[], args=[ast.arg(arg="frame", **_AT)],
+            kwonlyargs=[], kw_defaults=[], defaults=[]),
+        body=body, decorator_list=[], returns=None, **_AT)
+    if "type_params" in ast.FunctionDef._fields:
+        function.type_params = []
+    return ast.Module(body=[function], type_ignores=[])
+
+
+def _call(function, *args):
+    return ast.Call(func=function, args=list(args), keywords=[], **_AT)
+
+
+def _name(name):
+    return ast.Name(id=name, ctx=_LOAD, **_AT)
+
+
+class _Generator:
+
+    """Builds ast nodes, sharing those for the same variable or constant."""
+
+    def __init__(self):
+        self._constants = {}
+        self._loads = {}
+        self._stores = {}
+
+    def constant(self, value):
+        """Produce the node for a constant."""
+        key = (type(value), repr(value))
+        node = self._constants.get(key)
+        if node is None:
+            node = self._constants[key] = ast.Constant(value=value, **_AT)
+        return node
+
+    def load(self, name):
+        """Produce the node that reads a program variable."""
+        node = self._loads.get(name)
+        if node is None:
+            node = self._loads[name] = ast.Name(
+                id=local_name(name), ctx=_LOAD, **_AT)
+        return node
+
+    def store(self, name):
+        """Produce the node that assigns a program variable."""
+        node = self._stores.get(name)
+        if node is None:
+            node = self._stores[name] = ast.Name(
+                id=local_name(name), ctx=_STORE, **_AT)
+        return node
+
+    def expression(self, node):
+        """Produce the ast expression for an expression."""
+        return dispatch(_EXPRESSIONS, node)(self, node)
+
+    def statements(self, node):
+        """Produce the list of ast statements for a statement."""
+        return dispatch(_STATEMENTS, node)(self, node)
+
+    def block(self, statements):
+        """Produce the list of ast statements for several statements."""
+        body = []
+        for statement in statements:
+            body.extend(self.statements(statement))
+        return body
+
+    def condition(self, node):
+        """Produce the test of an if or while statement."""
+        node = fold_condition(node)
+        if isinstance(node, Number):
+            return self.constant(False)
+        test = self.expression(node)
+        if is_boolean(node):
+            return test
+        return ast.Compare(
+            left=test, ops=[_IS], comparators=[self.constant(True)], **_AT)
+
+    def suite(self, node):
+        """Produce a non-empty list of ast statements, as a body requires."""
+        return self.statements(node) or [ast.Pass(**_AT)]
+
+
+def _binary(operator):
+    def binary(generator, node):
+        return ast.BinOp(
+            left=generator.expression(node.left), op=operator,
+            right=generator.expression(node.right), **_AT)
+    return binary
+
+
+def _bool_op(operator):
+    def bool_op(generator, node):
+        value = ast.BoolOp(
+            op=operator,
+            values=[
+                generator.expression(node.left),
+                generator.expression(node.right)],
+            **_AT)
+        if is_boolean(node):
+            return value
+        return _call(ast.Name(id="bool", ctx=_LOAD, **_AT), value)
+    return bool_op
+
+
+def _check(generator, node):
+    # Count down the iterations leased from the governor, as the code
+    # of LocalCheck does
+    #
+    if node.name is not None:
+        return [ast.Expr(
+            value=_call(_name("measure"), generator.load(node.name)),
+            **_AT)]
+    return [
+        ast.AugAssign(
+            target=_COUNTDOWN_STORE, op=ast.Sub(),
+            value=generator.constant(1), **_AT),
+        ast.If(
+            test=ast.Compare(
+                left=_COUNTDOWN_LOAD, ops=[ast.Lt()],
+                comparators=[generator.constant(0)], **_AT),
+            body=[ast.Assign(
+                targets=[_COUNTDOWN_STORE], value=_call(_name("lease")),
+                **_AT)],
+            orelse=[], **_AT)]
+
+
+def _compare(operator):
+    def compare(generator, node):
+        return ast.Compare(
+            left=generator.expression(node.left), ops=[operator],
+            comparators=[generator.expression(node.right)], **_AT)
+    return compare
+
+
+def _delete(generator, node):
+    # Set the locals to None, as the code of LocalDelete does
+    #
+    if not node.names:
+        return []
+    return [ast.Assign(
+        targets=[generator.store(name) for name in node.names],
+        value=generator.constant(None), **_AT)]
+
+
+def _sequence(generator, node):
+    statements = []
+    while isinstance(node, Sequence):
+        statements.append(node.first)
+        node = node.second
+    statements.append(node)
+    return generator.block(statements)
+
+
+_EXPRESSIONS = {
+    Add: _binary(ast.Add()),
+    And: _bool_op(ast.And()),
+    Boolean: lambda generator, node: generator.constant(node.value),
+    Divide: _binary(ast.Div()),
+    GreaterThan: _compare(ast.Gt()),
+    LessThan: _compare(ast.Lt()),
+    Multiply: _binary(ast.Mult()),
+    Not: lambda generator, node: ast.UnaryOp(
+        op=ast.Not(), operand=generator.expression(node.value), **_AT),
+    Number: lambda generator, node: generator.constant(node.value),
+    Or: _bool_op(ast.Or()),
+    Subtract: _binary(ast.Sub()),
+    Variable: lambda generator, node: generator.load(node.name),
+}
+
+_STATEMENTS = {
+    Assign: lambda generator, node: [ast.Assign(
+        targets=[generator.store(node.name)],
+        value=generator.expression(node.expression), **_AT)],
+    Block: lambda generator, node: generator.block(node.statements),
+    Check: _check,
+    Delete: _delete,
+    DoNothing: lambda generator, node: [],
+    If: lambda generator, node: [ast.If(
+        test=generator.condition(node.condition),
+        body=generator.suite(node.consequence),
+        orelse=generator.statements(node.alternative), **_AT)],
+    Sequence: _sequence,
+    While: lambda generator, node: [ast.While(
+        test=generator.condition(node.condition),
+        body=generator.suite(node.body), orelse=[], **_AT)],
+}
@@ -0,0 +1,142 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_async.
+
+Runs programs inside an asyncio event loop without blocking it.
+evaluate_async() walks the statements of a program as evaluate() does,
+evaluating each assignment with the node's own evaluate(), and hands
+control back to the event loop every so many statements or
+microseconds. Several programs awaited at once thus interleave on one
+thread, and other tasks on the loop wait at most one slice for a turn.
+Given Limits (see simple_limits), a program is governed as it runs.
+
+"""
+
+import asyncio
+import time
+
+from .simple_expressions import TRUE
+from .simple_limits import govern, Governor
+from .simple_statements import Assign, Block, DoNothing, If, Sequence, While
+from .simple_trees import dispatch
+
+
+async def evaluate_async(
+        statement, environment, statements=1000, microseconds=None,
+        limits=None):
+    """Execute a program, yielding to the event loop as it runs.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple()) to be executed.
+        environment: a dictionary of variable names (keys) and their
+            values, or a PersistentEnvironment. It is not changed.
+        statements: the most statements to execute between yields.
+        microseconds: if not None, the most time to spend between
+            yields, checked after each statement.
+        limits: if not None, the Limits the program must keep to.
+
+    Returns:
+        The environment statement.evaluate(environment) would return.
+
+    Raises:
+        KeyError: the program reads a variable that has no value.
+        LimitExceeded: the program exceeded one of its limits.
+
+    """
+    clock = time.perf_counter
+    seconds = None if microseconds is None else microseconds / 1e6
+    run = statement_steps(statement, environment, limits)
+    count = 0
+    started = clock()
+    while True:
+        try:
+            next(run)
+        except StopIteration as stop:
+            return stop.value
+        count += 1
+        if count >= statements or (
+                seconds is not None and clock() - started >= seconds):
+            await asyncio.sleep(0)
+            count = 0
+            started = clock()
+
+
+def statement_steps(statement, environment, limits=None):
+    """Produce a generator that executes a program a step at a time.
+
+    Args:
+        statement: the statement to be executed.
+        environment: a dictionary of variable names (keys) and their
+            values, or a PersistentEnvironment. It is not changed.
+        limits: if not None, the Limits the program must keep to. Its
+            time starts at the first step; exceeding a limit raises
+            LimitExceeded from the step that did so.
+
+    Returns:
+        A generator that yields once after each assignment or other
+        simple statement, and after each test of a while condition, so
+        that even a loop with an empty body yields. It returns the
+        environment statement.evaluate(environment) would return.
+
+    """
+    if limits is not None:
+        return _governed(statement, environment, Governor(limits))
+    return dispatch(_STATEMENTS, statement)(statement, environment)
+
+
+def _simple(node, environment):
+    environment = node.evaluate(environment)
+    yield
+    return environment
+
+
+def _block(node, environment):
+    for statement in node.statements:
+        environment = yield from statement_steps(statement, environment)
+    return environment
+
+
+def _governed(statement, environment, governor):
+    governor.start(environment)
+    environment = yield from statement_steps(
+        govern(statement, governor), environment)
+    governor.finish(environment)
+    return environment
+
+
+def _if(node, environment):
+    if node.condition.evaluate(environment) is TRUE:
+        return (yield from statement_steps(node.consequence, environment))
+    return (yield from statement_steps(node.alternative, environment))
+
+
+def _sequence(node, environment):
+    # Walk a chain of sequences iteratively, as Sequence.evaluate() does
+    #
+    while isinstance(node, Sequence):
+        environment = yield from statement_steps(node.first, environment)
+        node = node.second
+    return (yield from statement_steps(node, environment))
+
+
+def _while(node, environment):
+    condition = node.condition
+    body = node.body
+    while condition.evaluate(environment) is TRUE:
+        environment = yield from statement_steps(body, environment)
+        yield
+    return environment
+
+
+_STATEMENTS = {
+    Assign: _simple,
+    Block: _block,
+    DoNothing: _simple,
+    If: _if,
+    Sequence: _sequence,
+    While: _while,
+}
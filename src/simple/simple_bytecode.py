@@ -0,0 +1,453 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_bytecode.
+
+Compiles a program to a compact linear bytecode and runs it on a
+register virtual machine. Each instruction is four integers in an
+array('i'): an opcode and up to three operands. Operands name
+registers, which hold the program variables (indexed by slot, as in
+simple_slots), then the constant pool, then temporaries. If and While
+become jumps, so the machine neither recurses nor touches a node object
+while it runs. A Check placed by simple_limits.govern() becomes a CHECK
+instruction, which calls the governor, and a Delete becomes a MOVE of
+None into each of its variables.
+
+"""
+
+from array import array
+
+from .simple_expressions import Add, And, Boolean, Divide, GreaterThan, \
+    LessThan, Multiply, Not, Number, Or, Subtract, Variable
+from .simple_limits import Check, hooks, LimitExceeded
+from .simple_slots import assign_slots, box_frame, deleted_names, \
+    unbox_frame
+from .simple_statements import Assign, Block, Delete, DoNothing, If, \
+    Sequence, While
+from .simple_trees import base_class, children, walk
+
+# Opcodes. Operands a, b and c are registers unless noted otherwise.
+#
+MOVE = 0                # a = b
+ADD = 1                 # a = b + c
+SUBTRACT = 2            # a = b - c
+MULTIPLY = 3            # a = b * c
+DIVIDE = 4              # a = b / c
+LESS_THAN = 5           # a = b < c
+GREATER_THAN = 6        # a = b > c
+NOT = 7                 # a = not b
+BOOL = 8                # a = bool(b)
+JUMP = 9                # go to instruction a
+JUMP_UNLESS_TRUE = 10   # go to instruction b unless a is True
+JUMP_IF_FALSY = 11      # go to instruction b if not a
+JUMP_IF_TRUTHY = 12     # go to instruction b if a
+CHECK = 13              # count an iteration if a < 0, else measure a
+
+OPCODE_NAMES = (
+    "MOVE", "ADD", "SUBTRACT", "MULTIPLY", "DIVIDE", "LESS_THAN",
+    "GREATER_THAN", "NOT", "BOOL", "JUMP", "JUMP_UNLESS_TRUE",
+    "JUMP_IF_FALSY", "JUMP_IF_TRUTHY", "CHECK")
+
+INSTRUCTION_SIZE = 4
+
+
+class BytecodeProgram:
+
+    """Represents a program compiled to bytecode."""
+
+    def __init__(self, statement):
+        """Constructor.
+
+        Args:
+            statement: the statement (usually the product of
+                Program.to_simple()) to be compiled.
+
+        """
+        self.statement = statement
+        slots = assign_slots(statement)
+        self.names = tuple(slots)
+        compiler = _Compiler(slots, statement)
+        compiler.statement(statement)
+        self.code = compiler.code
+        self.constants = tuple(compiler.constants)
+        self.temporaries = compiler.temporaries
+        self.hooks = hooks(statement)
+        self.exposed = tuple(
+            slots[name] for name in exposed_reads(statement))
+        self.deleted = deleted_names(statement)
+
+    def __repr__(self):
+        """A guillemet-delimited string representation of the program."""
+        return "«{0}»".format(self)
+
+    def __str__(self):
+        """A string representation of the program."""
+        return "{0}".format(self.statement)
+
+    def disassemble(self):
+        """Produce a readable listing of the bytecode.
+
+        Returns:
+            A list of strings, one per instruction, giving the
+            instruction index, the opcode name and the operands.
+            Register operands are shown as variable names, constant
+            values or temporary numbers.
+
+        """
+        n_names = len(self.names)
+        n_constants = len(self.constants)
+
+        def register(r):
+            if r < n_names:
+                return self.names[r]
+            if r < n_names + n_constants:
+                return repr(self.constants[r - n_names])
+            return "t{0}".format(r - n_names - n_constants)
+
+        listing = []
+        code = self.code
+        for pc in range(0, len(code), INSTRUCTION_SIZE):
+            op, a, b, c = code[pc:pc + INSTRUCTION_SIZE]
+            if op == CHECK:
+                operands = [] if a < 0 else [register(a)]
+            elif op == JUMP:
+                operands = [str(a // INSTRUCTION_SIZE)]
+            elif op >= JUMP_UNLESS_TRUE:
+                operands = [register(a), str(b // INSTRUCTION_SIZE)]
+            elif op in (MOVE, NOT, BOOL):
+                operands = [register(a), register(b)]
+            else:
+                operands = [register(a), register(b), register(c)]
+            listing.append("{0:4d} {1} {2}".format(
+                pc // INSTRUCTION_SIZE, OPCODE_NAMES[op],
+                ", ".join(operands)))
+        return listing
+
+    def evaluate(self, environment):
+        """Execute the program in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            Always returns a new environment, updated to reflect the
+            evaluation of the program, as the statement's evaluate()
+            would.
+
+        Raises:
+            KeyError: the program reads a variable that has no value.
+            LimitExceeded: a CHECK found a limit exceeded. The error
+                carries the environment as it was.
+
+        """
+        frame = unbox_frame(environment, self.names)
+        for slot in self.exposed:
+            if frame[slot] is None:
+                # The program may read a variable that has no value;
+                # let the tree walker decide, and name it if so.
+                #
+                return self.statement.evaluate(environment)
+        registers = frame + list(self.constants)
+        registers.extend([None] * self.temporaries)
+        try:
+            run(self.code, registers, self.hooks)
+        except LimitExceeded as error:
+            error.environment = box_frame(
+                environment, self.names, registers, self.deleted)
+            raise
+        return box_frame(environment, self.names, registers, self.deleted)
+
+
+def compile_bytecode(statement):
+    """Compile a program to bytecode.
+
+    Args:
+        statement: the statement to be compiled.
+
+    Returns:
+        A BytecodeProgram.
+
+    """
+    return BytecodeProgram(statement)
+
+
+def exposed_reads(statement):
+    """Find the variables a program may read before assigning them.
+
+    Args:
+        statement: the statement to be analyzed.
+
+    Returns:
+        A set of the names of the variables that some path through the
+        statement reads before it has certainly assigned them. Those
+        variables must have values in the environment for the
+        statement to run without a KeyError.
+
+    """
+    exposed = set()
+    _exposed_reads(statement, set(), exposed)
+    return exposed
+
+
+def run(code, registers, hooks=None):
+    """Run bytecode on the virtual machine.
+
+    Args:
+        code: an array('i') of instructions, as produced by
+            compile_bytecode().
+        registers: a list of the register values: the variables, the
+            constants and then the temporaries. It is updated in place.
+        hooks: the dictionary of governor methods CHECK calls, as
+            produced by simple_limits.hooks(), if the code has any CHECK
+            instructions.
+
+    """
+    # Opcodes as locals, for speed of dispatch
+    #
+    move, add, subtract, multiply, divide = (
+        MOVE, ADD, SUBTRACT, MULTIPLY, DIVIDE)
+    less_than, greater_than, not_, bool_ = (
+        LESS_THAN, GREATER_THAN, NOT, BOOL)
+    jump, jump_unless_true, jump_if_falsy, jump_if_truthy = (
+        JUMP, JUMP_UNLESS_TRUE, JUMP_IF_FALSY, JUMP_IF_TRUTHY)
+    check = CHECK
+    if hooks:
+        lease = hooks["lease"]
+        measure = hooks["measure"]
+
+    # Loop iterations are counted down in a local, leased from the
+    # governor as simple_python's generated code does
+    #
+    countdown = 0
+    size = INSTRUCTION_SIZE
+    pc = 0
+    end = len(code)
+    while pc < end:
+        op = code[pc]
+        a = code[pc + 1]
+        b = code[pc + 2]
+        pc += size
+        if op == move:
+            registers[a] = registers[b]
+        elif op == add:
+            registers[a] = registers[b] + registers[code[pc - 1]]
+        elif op == jump_unless_true:
+            if registers[a] is not True:
+                pc = b
+        elif op == jump:
+            pc = a
+        elif op == check:
+            if a >= 0:
+                measure(registers[a])
+            else:
+                countdown -= 1
+                if countdown < 0:
+                    countdown = lease()
+        elif op == less_than:
+            registers[a] = registers[b] < registers[code[pc - 1]]
+        elif op == greater_than:
+            registers[a] = registers[b] > registers[code[pc - 1]]
+        elif op == subtract:
+            registers[a] = registers[b] - registers[code[pc - 1]]
+        elif op == multiply:
+            registers[a] = registers[b] * registers[code[pc - 1]]
+        elif op == divide:
+            registers[a] = registers[b] / registers[code[pc - 1]]
+        elif op == not_:
+            registers[a] = not registers[b]
+        elif op == bool_:
+            registers[a] = bool(registers[b])
+        elif op == jump_if_falsy:
+            if not registers[a]:
+                pc = b
+        elif op == jump_if_truthy:
+            if registers[a]:
+                pc = b
+        else:
+            raise ValueError("bad opcode {0} at {1}".format(
+                op, pc - INSTRUCTION_SIZE))
+    if hooks:
+        hooks["settle"](countdown)
+
+
+def _exposed_reads(node, assigned, exposed):
+    """Add the exposed reads of a node; return the assigned names after."""
+    cls = base_class(node)
+    if cls is Variable:
+        if node.name not in assigned:
+            exposed.add(node.name)
+    elif cls is Assign:
+        _exposed_reads(node.expression, assigned, exposed)
+        assigned = assigned | {node.name}
+    elif cls is If:
+        _exposed_reads(node.condition, assigned, exposed)
+        assigned = (
+            _exposed_reads(node.consequence, assigned, exposed)
+            & _exposed_reads(node.alternative, assigned, exposed))
+    elif cls is While:
+        # The body may run no times, so it assigns nothing for certain;
+        # its first run sees the fewest assigned names.
+        #
+        _exposed_reads(node.condition, assigned, exposed)
+        _exposed_reads(node.body, assigned, exposed)
+    elif cls is Sequence:
+        while base_class(node) is Sequence:
+            assigned = _exposed_reads(node.first, assigned, exposed)
+            node = node.second
+        assigned = _exposed_reads(node, assigned, exposed)
+    else:
+        for child in children(node):
+            assigned = _exposed_reads(child, assigned, exposed)
+    return assigned
+
+
+class _Compiler:
+
+    """Accumulates the code, constants and temporaries of a program."""
+
+    def __init__(self, slots, statement):
+        self.slots = slots
+        self.code = array('i')
+        self.constants = []
+        self.temporaries = 0
+        self._constant_registers = {}
+        self._next_temporary = 0
+
+        # Pool the constants first, so that the temporaries that follow
+        # them have fixed registers. A Delete needs None.
+        #
+        for node in walk(statement):
+            if isinstance(node, (Boolean, Number, Delete)):
+                value = None if isinstance(node, Delete) else node.value
+                key = (type(value), repr(value))
+                if key not in self._constant_registers:
+                    self._constant_registers[key] = (
+                        len(slots) + len(self.constants))
+                    self.constants.append(value)
+
+    def emit(self, op, a=0, b=0, c=0):
+        """Append an instruction; return its offset in the code."""
+        offset = len(self.code)
+        self.code.extend((op, a, b, c))
+        return offset
+
+    def patch(self, offset, operand, target):
+        """Set a jump target operand of the instruction at offset."""
+        self.code[offset + operand] = target
+
+    def constant(self, value):
+        """Produce the register holding a constant."""
+        return self._constant_registers[(type(value), repr(value))]
+
+    def temporary(self):
+        """Produce the register of a new temporary."""
+        register = self._next_temporary
+        self._next_temporary += 1
+        self.temporaries = max(self.temporaries, self._next_temporary)
+        return register
+
+    def statement(self, node):
+        """Append the code of a statement."""
+        cls = base_class(node)
+        if cls is Assign:
+            self._next_temporary = 0
+            self.expression(node.expression, self.slots[node.name])
+        elif cls is Block:
+            for statement in node.statements:
+                self.statement(statement)
+        elif cls is Sequence:
+            while base_class(node) is Sequence:
+                self.statement(node.first)
+                node = node.second
+            self.statement(node)
+        elif cls is If:
+            self._next_temporary = 0
+            condition = self.expression(node.condition)
+            branch = self.emit(JUMP_UNLESS_TRUE, condition)
+            self.statement(node.consequence)
+            jump = self.emit(JUMP)
+            self.patch(branch, 2, len(self.code))
+            self.statement(node.alternative)
+            self.patch(jump, 1, len(self.code))
+        elif cls is While:
+            top = len(self.code)
+            self._next_temporary = 0
+            condition = self.expression(node.condition)
+            branch = self.emit(JUMP_UNLESS_TRUE, condition)
+            self.statement(node.body)
+            self.emit(JUMP, top)
+            self.patch(branch, 2, len(self.code))
+        elif isinstance(node, Check):
+            self.emit(
+                CHECK, -1 if node.name is None else self.slots[node.name])
+        elif isinstance(node, Delete):
+            for name in node.names:
+                self.emit(MOVE, self.slots[name], self.constant(None))
+        elif cls is not DoNothing:
+            raise TypeError("not a statement: {0!r}".format(node))
+
+    def expression(self, node, target=None):
+        """Append the code of an expression; return its register.
+
+        The value is left in target if one is given; otherwise, in a
+        variable or constant register if the expression is one, or else
+        in a new temporary.
+
+        """
+        cls = base_class(node)
+        if cls is Variable or cls is Boolean or cls is Number:
+            if cls is Variable:
+                register = self.slots[node.name]
+            else:
+                register = self.constant(node.value)
+            if target is None:
+                return register
+            self.emit(MOVE, target, register)
+            return target
+        if cls is Not:
+            value = self.expression(node.value)
+            target = self._target(target)
+            self.emit(NOT, target, value)
+            return target
+        if cls is And or cls is Or:
+            # The result register is written before the right operand
+            # is read, so it must be a fresh temporary.
+            #
+            result = self._offset(self.temporary())
+            left = self.expression(node.left)
+            self.emit(BOOL, result, left)
+            branch = self.emit(
+                JUMP_IF_FALSY if cls is And else JUMP_IF_TRUTHY, left)
+            right = self.expression(node.right)
+            self.emit(BOOL, result, right)
+            self.patch(branch, 2, len(self.code))
+            if target is None:
+                return result
+            self.emit(MOVE, target, result)
+            return target
+        left = self.expression(node.left)
+        right = self.expression(node.right)
+        target = self._target(target)
+        self.emit(_BINARY_OPCODES[cls], target, left, right)
+        return target
+
+    def _offset(self, temporary):
+        return len(self.slots) + len(self.constants) + temporary
+
+    def _target(self, target):
+        if target is None:
+            return self._offset(self.temporary())
+        return target
+
+
+_BINARY_OPCODES = {
+    Add: ADD,
+    Divide: DIVIDE,
+    GreaterThan: GREATER_THAN,
+    LessThan: LESS_THAN,
+    Multiply: MULTIPLY,
+    Subtract: SUBTRACT,
+}
@@ -0,0 +1,284 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_closures.
+
+Compiles a tree of simple statements and expressions into nested Python
+closures, once, so that running the program no longer pays for method
+dispatch and attribute lookup on every node visit. Each compiled
+expression is a function of a frame of plain Python values (see
+simple_slots) returning a plain value; each compiled statement is a
+function of the frame that updates it in place.
+
+"""
+
+import operator
+
+from .simple_expressions import Add, And, Boolean, Divide, GreaterThan, \
+    LessThan, Multiply, Not, Number, Or, Subtract, Variable
+from .simple_limits import Check, LimitExceeded
+from .simple_slots import assign_slots, box_frame, deleted_names, \
+    unbox_frame
+from .simple_statements import Assign, Block, Delete, DoNothing, If, \
+    Sequence, While
+from .simple_trees import dispatch
+
+
+class ClosureProgram:
+
+    """Represents a program compiled to Python closures."""
+
+    def __init__(self, statement):
+        """Constructor.
+
+        Args:
+            statement: the statement (usually the product of
+                Program.to_simple()) to be compiled.
+
+        """
+        self.statement = statement
+        self.slots = assign_slots(statement)
+        self.names = tuple(self.slots)
+        self.deleted = deleted_names(statement)
+        self._run = _compile(statement, self.slots)
+
+    def __repr__(self):
+        """A guillemet-delimited string representation of the program."""
+        return "«{0}»".format(self)
+
+    def __str__(self):
+        """A string representation of the program."""
+        return "{0}".format(self.statement)
+
+    def evaluate(self, environment):
+        """Execute the program in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            Always returns a new environment, updated to reflect the
+            evaluation of the program, as the statement's evaluate()
+            would.
+
+        Raises:
+            LimitExceeded: a Check found a limit exceeded. The error
+                carries the environment as it was.
+
+        """
+        frame = unbox_frame(environment, self.names)
+        try:
+            self._run(frame)
+        except LimitExceeded as error:
+            error.environment = box_frame(
+                environment, self.names, frame, self.deleted)
+            raise
+        return box_frame(environment, self.names, frame, self.deleted)
+
+
+def compile_closures(statement):
+    """Compile a program to Python closures.
+
+    Args:
+        statement: the statement to be compiled.
+
+    Returns:
+        A ClosureProgram.
+
+    """
+    return ClosureProgram(statement)
+
+
+def _compile(node, slots):
+    return dispatch(_COMPILERS, node)(node, slots)
+
+
+def _constant(node):
+    """Produce (True, value) for a literal node, else (False, None)."""
+    if isinstance(node, (Boolean, Number)):
+        return True, node.value
+    return False, None
+
+
+def _compile_binary(operator):
+    """Produce a compiler for a binary arithmetic or relational node."""
+    def compile_binary(node, slots):
+        left = _compile(node.left, slots)
+        is_constant, value = _constant(node.right)
+        if is_constant:
+            return lambda frame: operator(left(frame), value)
+        right = _compile(node.right, slots)
+        return lambda frame: operator(left(frame), right(frame))
+    return compile_binary
+
+
+def _compile_and(node, slots):
+    left = _compile(node.left, slots)
+    right = _compile(node.right, slots)
+    return lambda frame: bool(left(frame) and right(frame))
+
+
+def _compile_assign(node, slots):
+    slot = slots[node.name]
+    if isinstance(node.expression, Variable):
+        source = slots[node.expression.name]
+        name = node.expression.name
+
+        def assign_variable(frame):
+            value = frame[source]
+            if value is None:
+                raise KeyError(name)
+            frame[slot] = value
+        return assign_variable
+    expression = _compile(node.expression, slots)
+
+    def assign(frame):
+        frame[slot] = expression(frame)
+    return assign
+
+
+def _compile_block(node, slots):
+    return _compile_statements(node.statements, slots)
+
+
+def _compile_check(node, slots):
+    if node.name is None:
+        iterate = node.governor.iterate
+        return lambda frame: iterate()
+    measure = node.governor.measure
+    slot = slots[node.name]
+    return lambda frame: measure(frame[slot])
+
+
+def _compile_constant(node, slots):
+    value = node.value
+    return lambda frame: value
+
+
+def _compile_delete(node, slots):
+    deleted = tuple(slots[name] for name in node.names)
+
+    def run_delete(frame):
+        for slot in deleted:
+            frame[slot] = None
+    return run_delete
+
+
+def _compile_do_nothing(node, slots):
+    return lambda frame: None
+
+
+def _compile_governed_while(condition, governor, body):
+    # The loop of simple_limits.govern(), counting its iterations down
+    # in a local leased from the governor rather than calling a closure
+    # for its Check
+    #
+    lease = governor.lease
+    settle = governor.settle
+
+    def run_governed_while(frame):
+        countdown = 0
+        while condition(frame) is True:
+            countdown -= 1
+            if countdown < 0:
+                countdown = lease()
+            body(frame)
+        settle(countdown)
+    return run_governed_while
+
+
+def _compile_if(node, slots):
+    condition = _compile(node.condition, slots)
+    consequence = _compile(node.consequence, slots)
+    alternative = _compile(node.alternative, slots)
+
+    def run_if(frame):
+        if condition(frame) is True:
+            consequence(frame)
+        else:
+            alternative(frame)
+    return run_if
+
+
+def _compile_not(node, slots):
+    value = _compile(node.value, slots)
+    return lambda frame: not value(frame)
+
+
+def _compile_or(node, slots):
+    left = _compile(node.left, slots)
+    right = _compile(node.right, slots)
+    return lambda frame: bool(left(frame) or right(frame))
+
+
+def _compile_sequence(node, slots):
+    statements = []
+    while isinstance(node, Sequence):
+        statements.append(node.first)
+        node = node.second
+    statements.append(node)
+    return _compile_statements(statements, slots)
+
+
+def _compile_statements(statements, slots):
+    compiled = tuple(_compile(statement, slots) for statement in statements)
+    if len(compiled) == 1:
+        return compiled[0]
+
+    def run_block(frame):
+        for statement in compiled:
+            statement(frame)
+    return run_block
+
+
+def _compile_variable(node, slots):
+    slot = slots[node.name]
+    name = node.name
+
+    def variable(frame):
+        value = frame[slot]
+        if value is None:
+            raise KeyError(name)
+        return value
+    return variable
+
+
+def _compile_while(node, slots):
+    condition = _compile(node.condition, slots)
+    first = node.body.first if isinstance(node.body, Sequence) else None
+    if isinstance(first, Check) and first.name is None:
+        return _compile_governed_while(
+            condition, first.governor, _compile(node.body.second, slots))
+    body = _compile(node.body, slots)
+
+    def run_while(frame):
+        while condition(frame) is True:
+            body(frame)
+    return run_while
+
+
+_COMPILERS = {
+    Add: _compile_binary(operator.add),
+    And: _compile_and,
+    Assign: _compile_assign,
+    Block: _compile_block,
+    Boolean: _compile_constant,
+    Check: _compile_check,
+    Delete: _compile_delete,
+    Divide: _compile_binary(operator.truediv),
+    DoNothing: _compile_do_nothing,
+    GreaterThan: _compile_binary(operator.gt),
+    If: _compile_if,
+    LessThan: _compile_binary(operator.lt),
+    Multiply: _compile_binary(operator.mul),
+    Not: _compile_not,
+    Number: _compile_constant,
+    Or: _compile_or,
+    Sequence: _compile_sequence,
+    Subtract: _compile_binary(operator.sub),
+    Variable: _compile_variable,
+    While: _compile_while,
+}
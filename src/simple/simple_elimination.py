@@ -0,0 +1,247 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_elimination.
+
+Dead code elimination. eliminate_dead_code() prunes a program down to
+the statements that contribute to the variables its caller reads
+afterwards, the outputs:
+
+- an if statement whose condition is constant is replaced by the branch
+  it takes;
+- a while loop whose condition is constant and not true, or which
+  assigns no variable read after it, is removed;
+- an assignment is removed if the variable is overwritten, or is not an
+  output, before anything reads it;
+- an assignment at the top level of a loop body whose variable nothing
+  in the loop reads, such as phi = x2 / x1 in the phi example, is made
+  once after the loop rather than in every iteration. Since only the
+  last iteration's value survives, the loop is placed inside an if
+  statement that makes the assignment only if the loop runs at all.
+
+Constants are folded and propagated by simple_folding first, so that
+conditions known from earlier assignments count as constant.
+
+A program pruned this way that finishes without error leaves each
+output with the value the original program would have given it; other
+variables may be left unassigned or with older values. Code that is
+removed is not run, so an error it would have raised, such as a
+KeyError for a variable without a value or a ZeroDivisionError, is
+not raised.
+
+"""
+
+from collections import Counter
+
+from .simple_expressions import Boolean, Number, TRUE, Variable
+from .simple_folding import fold_constants, fold_expression
+from .simple_statements import Assign, Block, DoNothing, If, Sequence, While
+from .simple_trees import base_class, dispatch, rebuild, transform, walk
+
+_DO_NOTHING = DoNothing()
+
+
+def eliminate_dead_code(statement, outputs=None):
+    """Prune a program to the code its outputs depend on.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple()) to be pruned. It is not changed.
+        outputs: an iterable of the names of the variables whose values
+            are wanted after the program runs, or None for every
+            variable the program assigns.
+
+    Returns:
+        The pruned statement, as described in the module documentation.
+        A program pruned of everything is a DoNothing.
+
+    """
+    statement = fold_constants(transform(statement, _sink))
+    if outputs is None:
+        outputs = assigned_names(statement)
+    return _prune(statement, frozenset(outputs))[0]
+
+
+def assigned_names(node):
+    """Find the variables a statement assigns.
+
+    Args:
+        node: the statement to be searched.
+
+    Returns:
+        A set of the names of the variables assigned anywhere in the
+        statement.
+
+    """
+    return {child.name for child in walk(node)
+            if base_class(child) is Assign}
+
+
+def read_names(node):
+    """Find the variables an expression or statement reads.
+
+    Args:
+        node: the expression or statement to be searched.
+
+    Returns:
+        A set of the names of the variables read anywhere in the node.
+
+    """
+    return {child.name for child in walk(node)
+            if base_class(child) is Variable}
+
+
+def _is_constant(node):
+    return isinstance(node, (Boolean, Number))
+
+
+def _is_nothing(node):
+    # Subclasses of DoNothing, such as the Check of simple_limits, do
+    # something
+    #
+    return type(node) is DoNothing
+
+
+def _prune(node, live):
+    """Prune a statement; return it with the variables live before it."""
+    return dispatch(_PRUNERS, node)(node, live)
+
+
+def _prune_assign(node, live):
+    if node.name not in live:
+        return _DO_NOTHING, live
+    return node, (live - {node.name}) | read_names(node.expression)
+
+
+def _prune_block(node, live):
+    statements = []
+    for statement in reversed(node.statements):
+        statement, live = _prune(statement, live)
+        if not _is_nothing(statement):
+            statements.append(statement)
+    statements.reverse()
+    if len(statements) == len(node.statements):
+        return rebuild(node, statements), live
+    return _statements(statements), live
+
+
+def _prune_if(node, live):
+    condition = fold_expression(node.condition)
+    if _is_constant(condition):
+        if condition is TRUE:
+            return _prune(node.consequence, live)
+        return _prune(node.alternative, live)
+    consequence, live_consequence = _prune(node.consequence, live)
+    alternative, live_alternative = _prune(node.alternative, live)
+    if _is_nothing(consequence) and _is_nothing(alternative):
+        return _DO_NOTHING, live
+    return (
+        rebuild(node, [node.condition, consequence, alternative]),
+        live_consequence | live_alternative | read_names(node.condition))
+
+
+def _prune_sequence(node, live):
+    # Walk a chain of sequences from its end, iteratively
+    #
+    sequences = []
+    while base_class(node) is Sequence:
+        sequences.append(node)
+        node = node.second
+    result, live = _prune(node, live)
+    for sequence in reversed(sequences):
+        first, live = _prune(sequence.first, live)
+        if _is_nothing(first):
+            continue
+        if _is_nothing(result):
+            result = first
+        else:
+            result = rebuild(sequence, [first, result])
+    return result, live
+
+
+def _prune_while(node, live):
+    condition = fold_expression(node.condition)
+    if _is_constant(condition) and condition is not TRUE:
+        return _DO_NOTHING, live
+
+    # The variables live at the top of the loop are those live after
+    # it, those the condition reads and those the body needs; find them
+    # by iterating until they no longer grow.
+    #
+    reads = read_names(node.condition)
+    top = live | reads
+    while True:
+        body, live_body = _prune(node.body, top)
+        grown = top | live_body
+        if grown == top:
+            break
+        top = grown
+    if condition is not TRUE and not assigned_names(body) & live:
+        return _DO_NOTHING, live
+    return rebuild(node, [node.condition, body]), top
+
+
+def _sink(node):
+    """Move the loop results nothing in a loop reads to after it."""
+    if base_class(node) is not While:
+        return node
+    statements = _flatten(node.body)
+    reads = read_names(node)
+    assignments = Counter(
+        child.name for child in walk(node.body)
+        if base_class(child) is Assign)
+    kept = []
+    sunk = []
+    written_later = set()
+    for statement in reversed(statements):
+        if (base_class(statement) is Assign
+                and statement.name not in reads
+                and assignments[statement.name] == 1
+                and not read_names(statement.expression) & written_later):
+            sunk.append(statement)
+        else:
+            kept.append(statement)
+            written_later |= assigned_names(statement)
+    if not sunk:
+        return node
+    kept.reverse()
+    sunk.reverse()
+    loop = While(node.condition, _statements(kept))
+    return If(node.condition, _statements([loop] + sunk), _DO_NOTHING)
+
+
+def _flatten(node):
+    """Produce the top-level statements of nested blocks and sequences."""
+    statements = []
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        cls = base_class(node)
+        if cls is Block:
+            pending.extend(reversed(node.statements))
+        elif cls is Sequence:
+            pending.extend((node.second, node.first))
+        elif not _is_nothing(node):
+            statements.append(node)
+    return statements
+
+
+def _statements(statements):
+    """Produce one statement that runs several in order."""
+    if not statements:
+        return _DO_NOTHING
+    if len(statements) == 1:
+        return statements[0]
+    return Block(statements)
+
+
+_PRUNERS = {
+    Assign: _prune_assign,
+    Block: _prune_block,
+    DoNothing: lambda node, live: (node, live),
+    If: _prune_if,
+    Sequence: _prune_sequence,
+    While: _prune_while,
+}
@@ -0,0 +1,62 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_engines.
+
+A registry of the ways a simple program can be run. Each engine takes
+a statement (usually the product of Program.to_simple()) and produces
+an object with an evaluate(environment) method that behaves like the
+statement's own evaluate(): it returns a new environment and leaves the
+one passed in unchanged. Any engine can be held to Limits (see
+simple_limits).
+
+"""
+
+from .simple_ast import compile_ast
+from .simple_bytecode import compile_bytecode
+from .simple_closures import compile_closures
+from .simple_limits import govern, GovernedProgram, Governor
+from .simple_python import compile_python
+from .simple_quickening import quicken
+from .simple_tracing import trace_loops
+
+ENGINES = {
+    "ast": compile_ast,
+    "bytecode": compile_bytecode,
+    "closures": compile_closures,
+    "python": compile_python,
+    "quickened": quicken,
+    "tracing": trace_loops,
+    "tree": lambda statement: statement,
+}
+
+
+def compile_program(statement, engine="tree", limits=None):
+    """Prepare a program to be run by one of the engines.
+
+    Args:
+        statement: the statement to be run.
+        engine: the name of an engine in ENGINES. The default, "tree",
+            runs the statement by walking it.
+        limits: if not None, the Limits every run of the program must
+            keep to.
+
+    Returns:
+        An object with an evaluate(environment) method. With limits, it
+        is a GovernedProgram, whose evaluate() raises LimitExceeded if
+        the run exceeds one of them.
+
+    Raises:
+        ValueError: the engine is not one of ENGINES.
+
+    """
+    try:
+        compiler = ENGINES[engine]
+    except KeyError:
+        raise ValueError("unknown engine: {0!r}".format(engine)) from None
+    if limits is None:
+        return compiler(statement)
+    governor = Governor(limits)
+    return GovernedProgram(compiler(govern(statement, governor)), governor)
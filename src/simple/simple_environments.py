@@ -0,0 +1,400 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_environments.
+
+Contains PersistentEnvironment, an immutable mapping of variable names
+to values that can be used in place of a dictionary environment. Adding
+or replacing a variable produces a new environment that shares all but
+O(log n) of its structure with the old one, so statements can keep
+returning new environments without copying every variable.
+
+MutableEnvironment wraps a PersistentEnvironment for use with the
+in-place execute() methods of statements; its snapshot() method hands
+out the current state in constant time.
+
+The mapping is a hash array mapped trie (HAMT): each level of the trie
+consumes five bits of the key's hash and stores its entries in a
+compact array indexed by a 32-bit occupancy bitmap.
+
+"""
+
+from collections.abc import Mapping, MutableMapping
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_BITS = 64
+_HASH_MASK = (1 << _HASH_BITS) - 1
+
+# Marks an array slot whose companion slot holds a sub-node rather than
+# a value.
+_SUBNODE = object()
+
+
+def _hash(key):
+    return hash(key) & _HASH_MASK
+
+
+def _popcount(n):
+    return bin(n).count("1")
+
+
+def _pair(shift, hash1, key1, value1, hash2, key2, value2):
+    """Produce a node holding two entries with different keys."""
+    if hash1 == hash2 or shift >= _HASH_BITS:
+        return _CollisionNode(hash1, (key1, value1, key2, value2))
+    index1 = (hash1 >> shift) & _MASK
+    index2 = (hash2 >> shift) & _MASK
+    if index1 == index2:
+        sub_node = _pair(
+            shift + _BITS, hash1, key1, value1, hash2, key2, value2)
+        return _BitmapNode(1 << index1, (_SUBNODE, sub_node))
+    if index1 < index2:
+        array = (key1, value1, key2, value2)
+    else:
+        array = (key2, value2, key1, value1)
+    return _BitmapNode((1 << index1) | (1 << index2), array)
+
+
+class _BitmapNode:
+
+    """An interior trie node with up to 32 entries or sub-nodes."""
+
+    __slots__ = ("bitmap", "array")
+
+    def __init__(self, bitmap, array):
+        self.bitmap = bitmap
+        self.array = array
+
+    def assoc(self, shift, keyhash, key, value):
+        """Produce a node with key set; also whether key was added."""
+        bit = 1 << ((keyhash >> shift) & _MASK)
+        index = 2 * _popcount(self.bitmap & (bit - 1))
+        array = self.array
+        if not self.bitmap & bit:
+            return _BitmapNode(
+                self.bitmap | bit,
+                array[:index] + (key, value) + array[index:]), True
+        existing_key = array[index]
+        existing_value = array[index + 1]
+        if existing_key is _SUBNODE:
+            sub_node, added = existing_value.assoc(
+                shift + _BITS, keyhash, key, value)
+            if sub_node is existing_value:
+                return self, False
+            entry = (_SUBNODE, sub_node)
+        elif existing_key == key:
+            if existing_value is value:
+                return self, False
+            entry = (key, value)
+            added = False
+        else:
+            entry = (_SUBNODE, _pair(
+                shift + _BITS, _hash(existing_key), existing_key,
+                existing_value, keyhash, key, value))
+            added = True
+        return _BitmapNode(
+            self.bitmap, array[:index] + entry + array[index + 2:]), added
+
+    def without(self, shift, keyhash, key):
+        """Produce a node (or None if empty) with key removed."""
+        bit = 1 << ((keyhash >> shift) & _MASK)
+        if not self.bitmap & bit:
+            raise KeyError(key)
+        index = 2 * _popcount(self.bitmap & (bit - 1))
+        array = self.array
+        existing_key = array[index]
+        if existing_key is _SUBNODE:
+            sub_node = array[index + 1].without(shift + _BITS, keyhash, key)
+            if sub_node is not None:
+                if (isinstance(sub_node, _BitmapNode)
+                        and len(sub_node.array) == 2
+                        and sub_node.array[0] is not _SUBNODE):
+                    # Pull a lone entry up into this node.
+                    entry = sub_node.array
+                else:
+                    entry = (_SUBNODE, sub_node)
+                return _BitmapNode(
+                    self.bitmap, array[:index] + entry + array[index + 2:])
+        elif existing_key != key:
+            raise KeyError(key)
+        if self.bitmap == bit:
+            return None
+        return _BitmapNode(
+            self.bitmap ^ bit, array[:index] + array[index + 2:])
+
+    def find(self, shift, keyhash, key):
+        """Produce the value for key, or raise KeyError."""
+        node = self
+        while True:
+            if isinstance(node, _CollisionNode):
+                return node.find(shift, keyhash, key)
+            bit = 1 << ((keyhash >> shift) & _MASK)
+            if not node.bitmap & bit:
+                raise KeyError(key)
+            index = 2 * _popcount(node.bitmap & (bit - 1))
+            existing_key = node.array[index]
+            if existing_key is _SUBNODE:
+                node = node.array[index + 1]
+                shift += _BITS
+            elif existing_key == key:
+                return node.array[index + 1]
+            else:
+                raise KeyError(key)
+
+    def items(self):
+        """Produce the (key, value) pairs held under this node."""
+        array = self.array
+        for index in range(0, len(array), 2):
+            if array[index] is _SUBNODE:
+                yield from array[index + 1].items()
+            else:
+                yield array[index], array[index + 1]
+
+
+class _CollisionNode:
+
+    """A leaf trie node for keys whose hashes are identical."""
+
+    __slots__ = ("keyhash", "array")
+
+    def __init__(self, keyhash, array):
+        self.keyhash = keyhash
+        self.array = array
+
+    def assoc(self, shift, keyhash, key, value):
+        """Produce a node with key set; also whether key was added."""
+        if keyhash != self.keyhash:
+            # Push this node down a level beside the new key.
+            node = _BitmapNode(
+                1 << ((self.keyhash >> shift) & _MASK), (_SUBNODE, self))
+            return node.assoc(shift, keyhash, key, value)
+        array = self.array
+        for index in range(0, len(array), 2):
+            if array[index] == key:
+                if array[index + 1] is value:
+                    return self, False
+                return _CollisionNode(
+                    keyhash,
+                    array[:index + 1] + (value,) + array[index + 2:]), False
+        return _CollisionNode(keyhash, array + (key, value)), True
+
+    def without(self, shift, keyhash, key):
+        """Produce a node (or None if empty) with key removed."""
+        if keyhash == self.keyhash:
+            array = self.array
+            for index in range(0, len(array), 2):
+                if array[index] == key:
+                    if len(array) == 2:
+                        return None
+                    return _CollisionNode(
+                        keyhash, array[:index] + array[index + 2:])
+        raise KeyError(key)
+
+    def find(self, shift, keyhash, key):
+        """Produce the value for key, or raise KeyError."""
+        if keyhash == self.keyhash:
+            array = self.array
+            for index in range(0, len(array), 2):
+                if array[index] == key:
+                    return array[index + 1]
+        raise KeyError(key)
+
+    def items(self):
+        """Produce the (key, value) pairs held in this node."""
+        array = self.array
+        for index in range(0, len(array), 2):
+            yield array[index], array[index + 1]
+
+
+_EMPTY = _BitmapNode(0, ())
+
+
+class PersistentEnvironment(Mapping):
+
+    """Represents an immutable, structurally shared environment."""
+
+    __slots__ = ("_root", "_count")
+
+    def __init__(self, items=()):
+        """Constructor.
+
+        Args:
+            items: a mapping, or an iterable of (name, value) pairs, of
+                the initial variables of the environment.
+
+        """
+        root = _EMPTY
+        count = 0
+        if isinstance(items, Mapping):
+            items = items.items()
+        for key, value in items:
+            root, added = root.assoc(0, _hash(key), key, value)
+            count += added
+        self._root = root
+        self._count = count
+
+    def __getitem__(self, key):
+        """Produce the value of a variable.
+
+        Args:
+            key: the variable name.
+
+        Returns:
+            The value of the variable.
+
+        Raises:
+            KeyError: the variable is not in the environment.
+
+        """
+        return self._root.find(0, _hash(key), key)
+
+    def __iter__(self):
+        """Produce an iterator over the variable names."""
+        return (key for key, _ in self._root.items())
+
+    def __len__(self):
+        """Produce the number of variables in the environment."""
+        return self._count
+
+    def __repr__(self):
+        """A string representation of the environment."""
+        return "PersistentEnvironment({0!r})".format(dict(self.items()))
+
+    def copy(self):
+        """Return the environment itself.
+
+        The environment is immutable, so it can stand in for its own
+        copy.
+
+        """
+        return self
+
+    def delete(self, key):
+        """Produce an environment with one variable removed.
+
+        Args:
+            key: the variable name.
+
+        Returns:
+            A new environment that shares structure with this one. This
+            environment is unchanged.
+
+        Raises:
+            KeyError: the variable is not in the environment.
+
+        """
+        root = self._root.without(0, _hash(key), key)
+        return PersistentEnvironment._from_root(
+            _EMPTY if root is None else root, self._count - 1)
+
+    def set(self, key, value):
+        """Produce an environment with one variable added or replaced.
+
+        Args:
+            key: the variable name.
+            value: the new value of the variable.
+
+        Returns:
+            A new environment that shares structure with this one. This
+            environment is unchanged.
+
+        """
+        root, added = self._root.assoc(0, _hash(key), key, value)
+        if root is self._root:
+            return self
+        return PersistentEnvironment._from_root(root, self._count + added)
+
+    @classmethod
+    def _from_root(cls, root, count):
+        environment = cls.__new__(cls)
+        environment._root = root
+        environment._count = count
+        return environment
+
+
+class MutableEnvironment(MutableMapping):
+
+    """Represents a mutable environment that can be snapshotted cheaply.
+
+    Assignments replace the underlying PersistentEnvironment, so
+    snapshot() can hand out the current state in constant time without
+    later assignments showing through.
+
+    """
+
+    __slots__ = ("_environment",)
+
+    def __init__(self, items=()):
+        """Constructor.
+
+        Args:
+            items: a mapping, or an iterable of (name, value) pairs, of
+                the initial variables of the environment.
+
+        """
+        if isinstance(items, PersistentEnvironment):
+            self._environment = items
+        else:
+            self._environment = PersistentEnvironment(items)
+
+    def __delitem__(self, key):
+        """Remove a variable from the environment."""
+        self._environment = self._environment.delete(key)
+
+    def __getitem__(self, key):
+        """Produce the value of a variable."""
+        return self._environment[key]
+
+    def __iter__(self):
+        """Produce an iterator over the variable names."""
+        return iter(self._environment)
+
+    def __len__(self):
+        """Produce the number of variables in the environment."""
+        return len(self._environment)
+
+    def __repr__(self):
+        """A string representation of the environment."""
+        return "MutableEnvironment({0!r})".format(
+            dict(self._environment.items()))
+
+    def __setitem__(self, key, value):
+        """Add or replace a variable in the environment."""
+        self._environment = self._environment.set(key, value)
+
+    def copy(self):
+        """Produce an independent mutable copy, in constant time."""
+        return MutableEnvironment(self._environment)
+
+    def snapshot(self):
+        """Produce the current variables as an immutable environment.
+
+        Returns:
+            A PersistentEnvironment, produced in constant time, that is
+            unaffected by later changes to this environment.
+
+        """
+        return self._environment
+
+
+def snapshot(environment):
+    """Produce an immutable copy of an environment's current variables.
+
+    Args:
+        environment: a dictionary, PersistentEnvironment or
+            MutableEnvironment.
+
+    Returns:
+        The environment itself if it is already immutable; the result of
+        its snapshot() method if it has one (constant time); otherwise,
+        a copy of the dictionary.
+
+    """
+    if isinstance(environment, PersistentEnvironment):
+        return environment
+    if isinstance(environment, MutableEnvironment):
+        return environment.snapshot()
+    return dict(environment)
@@ -3,13 +3,28 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 #
 
-"""Module simple.simple_expressions."""
+"""Module simple.simple_expressions.
+
+Every expression has two evaluation entry points: evaluate() produces a
+Number or Boolean object, while evaluate_value() produces the plain
+Python int, float or bool. Expressions evaluate their operands with
+evaluate_value(), so only the outermost result of a tree is wrapped.
+
+Expressions are hashable, consistently with their equality: __hash__()
+combines the expression's class, as defined here, with its operands or
+value, so that equal expressions hash alike, including the fused and
+quickened forms of an expression, which are subclasses of these. This
+lets common subexpressions be found through dictionaries.
+
+"""
 
 
 class Add:
 
     """Represents an addition operation expression."""
 
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         """Constructor.
 
@@ -52,6 +67,10 @@ class Add:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's operation and operands."""
+        return hash((Add, self.left, self.right))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -71,9 +90,22 @@ class Add:
             Always returns a Number value.
 
         """
-        return Number(
-            self.left.evaluate(environment).value
-            + self.right.evaluate(environment).value)
+        return number(self.evaluate_value(environment))
+
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Always returns an int or float.
+
+        """
+        return (
+            self.left.evaluate_value(environment)
+            + self.right.evaluate_value(environment))
 
     def to_python(self, indentation):
         """Produce the expression translated to Python.
@@ -96,6 +128,8 @@ class And:
 
     """Represents a logical and expression."""
 
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         """Constructor.
 
@@ -138,6 +172,10 @@ class And:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's operation and operands."""
+        return hash((And, self.left, self.right))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -157,9 +195,24 @@ class And:
             Always returns a Boolean value.
 
         """
-        return Boolean(
-            bool(self.left.evaluate(environment).value)
-            and bool(self.right.evaluate(environment).value))
+        if self.evaluate_value(environment):
+            return TRUE
+        return FALSE
+
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Always returns a bool.
+
+        """
+        return bool(
+            self.left.evaluate_value(environment)
+            and self.right.evaluate_value(environment))
 
     def to_python(self, indentation):
         """Produce the expression translated to Python.
@@ -182,14 +235,21 @@ class Boolean:
 
     """Represents a boolean value expression."""
 
-    def __init__(self, value):
+    __slots__ = ("value",)
+
+    def __new__(cls, value):
         """Constructor.
 
         Args:
             value: operand to be interpreted as a boolean value.
 
+        Returns:
+            The canonical TRUE or FALSE object. There are only ever two
+            Boolean objects, so a Boolean value can be tested for truth
+            by identity.
+
         """
-        self.value = bool(value)
+        return TRUE if value else FALSE
 
     def __eq__(self, other_expression):
         """Equality relation.
@@ -223,6 +283,14 @@ class Boolean:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's kind and value."""
+        return hash((Boolean, self.value))
+
+    def __reduce__(self):
+        """Support pickling and copying without a second TRUE or FALSE."""
+        return (Boolean, (self.value,))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -244,6 +312,20 @@ class Boolean:
         """
         return self
 
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values. Not used in this class's evaluate_value()
+                implementation.
+
+        Returns:
+            Always returns the value of this object.
+
+        """
+        return self.value
+
     def to_python(self, indentation):
         """Produce the expression translated to Python.
 
@@ -263,6 +345,8 @@ class Divide:
 
     """Represents an divide operation expression."""
 
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         """Constructor.
 
@@ -305,6 +389,10 @@ class Divide:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's operation and operands."""
+        return hash((Divide, self.left, self.right))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -324,9 +412,22 @@ class Divide:
             Always returns a Number value.
 
         """
-        return Number(
-            self.left.evaluate(environment).value
-            / self.right.evaluate(environment).value)
+        return Number(self.evaluate_value(environment))
+
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Always returns a float.
+
+        """
+        return (
+            self.left.evaluate_value(environment)
+            / self.right.evaluate_value(environment))
 
     def to_python(self, indentation):
         """Produce the expression translated to Python.
@@ -349,6 +450,8 @@ class GreaterThan:
 
     """Represents a greater than relation expression."""
 
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         """Constructor.
 
@@ -391,6 +494,10 @@ class GreaterThan:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's operation and operands."""
+        return hash((GreaterThan, self.left, self.right))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -410,9 +517,24 @@ class GreaterThan:
             Always returns a Boolean value.
 
         """
-        return Boolean(
-            self.left.evaluate(environment).value
-            > self.right.evaluate(environment).value)
+        if self.evaluate_value(environment):
+            return TRUE
+        return FALSE
+
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Always returns a bool.
+
+        """
+        return (
+            self.left.evaluate_value(environment)
+            > self.right.evaluate_value(environment))
 
     def to_python(self, indentation):
         """Produce the expression translated to Python.
@@ -435,6 +557,8 @@ class LessThan:
 
     """Represents a less than relation expression."""
 
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         """Constructor.
 
@@ -477,6 +601,10 @@ class LessThan:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's operation and operands."""
+        return hash((LessThan, self.left, self.right))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -496,9 +624,24 @@ class LessThan:
             Always returns a Boolean value.
 
         """
-        return Boolean(
-            self.left.evaluate(environment).value
-            < self.right.evaluate(environment).value)
+        if self.evaluate_value(environment):
+            return TRUE
+        return FALSE
+
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Always returns a bool.
+
+        """
+        return (
+            self.left.evaluate_value(environment)
+            < self.right.evaluate_value(environment))
 
     def to_python(self, indentation):
         """Produce the expression translated to Python.
@@ -521,6 +664,8 @@ class Multiply:
 
     """Represents a multiplication operation expression."""
 
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         """Constructor.
 
@@ -563,6 +708,10 @@ class Multiply:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's operation and operands."""
+        return hash((Multiply, self.left, self.right))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -582,9 +731,22 @@ class Multiply:
             Always returns a Number value.
 
         """
-        return Number(
-            self.left.evaluate(environment).value
-            * self.right.evaluate(environment).value)
+        return number(self.evaluate_value(environment))
+
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Always returns an int or float.
+
+        """
+        return (
+            self.left.evaluate_value(environment)
+            * self.right.evaluate_value(environment))
 
     def to_python(self, indentation):
         """Produce the expression translated to Python.
@@ -607,6 +769,8 @@ class Not:
 
     """Represents a logical negation expression."""
 
+    __slots__ = ("value",)
+
     def __init__(self, value):
         """Constructor.
 
@@ -645,6 +809,10 @@ class Not:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's operation and operand."""
+        return hash((Not, self.value))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -664,8 +832,22 @@ class Not:
             Always returns a Boolean value.
 
         """
-        return Boolean(
-            not bool(self.value.evaluate(environment).value))
+        if self.value.evaluate_value(environment):
+            return FALSE
+        return TRUE
+
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Always returns a bool.
+
+        """
+        return not self.value.evaluate_value(environment)
 
     def to_python(self, indentation):
         """Produce the expression translated to Python.
@@ -687,6 +869,8 @@ class Number:
 
     """Represents a numeric value expression."""
 
+    __slots__ = ("value",)
+
     def __init__(self, value):
         """Constructor.
 
@@ -728,6 +912,10 @@ class Number:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's kind and value."""
+        return hash((Number, self.value))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -749,6 +937,20 @@ class Number:
         """
         return self
 
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values. Not used in this class's evaluate_value()
+                implementation.
+
+        Returns:
+            Always returns the value of this object.
+
+        """
+        return self.value
+
     def to_python(self, indentation):
         """Produce the expression translated to Python.
 
@@ -768,6 +970,8 @@ class Or:
 
     """Represents a logical or expression."""
 
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         """Constructor.
 
@@ -810,6 +1014,10 @@ class Or:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's operation and operands."""
+        return hash((Or, self.left, self.right))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -829,9 +1037,24 @@ class Or:
             Always returns a Boolean value.
 
         """
-        return Boolean(
-            bool(self.left.evaluate(environment).value)
-            or bool(self.right.evaluate(environment).value))
+        if self.evaluate_value(environment):
+            return TRUE
+        return FALSE
+
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Always returns a bool.
+
+        """
+        return bool(
+            self.left.evaluate_value(environment)
+            or self.right.evaluate_value(environment))
 
     def to_python(self, indentation):
         """Produce the expression translated to Python.
@@ -854,6 +1077,8 @@ class Subtract:
 
     """Represents a subtraction operation expression."""
 
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         """Constructor.
 
@@ -896,6 +1121,10 @@ class Subtract:
         """
         return not self.__eq__(other_expression)
 
+    def __hash__(self):
+        """A hash of the expression's operation and operands."""
+        return hash((Subtract, self.left, self.right))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -915,9 +1144,22 @@ class Subtract:
             Always returns a Number value.
 
         """
-        return Number(
-            self.left.evaluate(environment).value
-            - self.right.evaluate(environment).value)
+        return number(self.evaluate_value(environment))
+
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Always returns an int or float.
+
+        """
+        return (
+            self.left.evaluate_value(environment)
+            - self.right.evaluate_value(environment))
 
     def to_python(self, indentation):
         """Produce the expression translated to Python.
@@ -940,6 +1182,8 @@ class Variable:
 
     """Represents a variable expression."""
 
+    __slots__ = ("name",)
+
     def __init__(self, name):
         """Constructor.
 
@@ -981,6 +1225,10 @@ class Variable:
         """
         return not self.__eq__(other_variable)
 
+    def __hash__(self):
+        """A hash of the expression's kind and name."""
+        return hash((Variable, self.name))
+
     def __repr__(self):
         """A guillemet-delimited string representation of the expression."""
         return "«{0}»".format(self)
@@ -1002,6 +1250,19 @@ class Variable:
         """
         return environment[self.name]
 
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            The int, float or bool value of the variable.
+
+        """
+        return environment[self.name].value
+
     def to_python(self, indentation):
         """Produce the expression translated to Python.
 
@@ -1015,3 +1276,52 @@ class Variable:
 
         """
         return "e['{0}']".format(self.name)
+
+
+def box(value):
+    """Wrap a plain Python value as a Number or Boolean.
+
+    Args:
+        value: an int, float or bool.
+
+    Returns:
+        TRUE or FALSE for a bool; otherwise, the result of number().
+
+    """
+    if value is True:
+        return TRUE
+    if value is False:
+        return FALSE
+    return number(value)
+
+
+def number(value):
+    """Produce a Number for a value, sharing those for small integers.
+
+    Args:
+        value: the numeric value.
+
+    Returns:
+        A cached Number if value is an int from SMALL_NUMBER_MIN to
+        SMALL_NUMBER_MAX inclusive; otherwise, a new Number. Number
+        objects are never modified, so sharing them is safe.
+
+    """
+    if type(value) is int and SMALL_NUMBER_MIN <= value <= SMALL_NUMBER_MAX:
+        return _SMALL_NUMBERS[value - SMALL_NUMBER_MIN]
+    return Number(value)
+
+
+def _boolean(value):
+    boolean = object.__new__(Boolean)
+    boolean.value = value
+    return boolean
+
+
+TRUE = _boolean(True)
+FALSE = _boolean(False)
+
+SMALL_NUMBER_MIN = -5
+SMALL_NUMBER_MAX = 1024
+_SMALL_NUMBERS = tuple(
+    Number(value) for value in range(SMALL_NUMBER_MIN, SMALL_NUMBER_MAX + 1))
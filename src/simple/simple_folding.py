@@ -0,0 +1,202 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_folding.
+
+Constant folding and constant propagation. fold_constants() follows a
+program from its start, keeping track of the variables whose values are
+known: those last assigned a constant on every path to that point. It
+replaces a read of such a variable with the constant, and an operation
+on constants with its result, so that 2 * 3 + x becomes 6 + x, and a
+limit assigned once before a loop is a constant in the loop's test.
+
+A while loop is followed until what is known at its top no longer
+changes, so a variable the loop assigns is known inside it only if
+every assignment in the loop gives it the value it held before; a
+variable the loop leaves alone stays known. After an if statement, a
+variable is known only if both branches leave it with the same value.
+
+A constant operation is folded by evaluating it with the node's own
+evaluate(), so the result is exactly the value the program would have
+computed, int, float or bool alike. Operations that raise, such as a
+division by zero, are left for the program to raise when it runs, and
+ints longer than MAX_FOLDED_BITS are left to be computed then, so that
+folding cannot take long. Operands are never reordered or regrouped,
+nor identities such as x * 1 applied, since with floats and bools these
+change results. Every assignment is kept: the program leaves the same
+environment as before.
+
+"""
+
+from .simple_expressions import And, Boolean, Number, Or, Variable, FALSE, \
+    TRUE
+from .simple_statements import Assign, Block, DoNothing, If, Sequence, While
+from .simple_trees import base_class, children, dispatch, rebuild, transform
+
+# The longest int, in bits, that folding produces
+#
+MAX_FOLDED_BITS = 1024
+
+
+def fold_constants(statement):
+    """Fold and propagate the constants of a program.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple()) to be optimized. It is not changed.
+
+    Returns:
+        An equivalent statement, whose evaluate() returns an equal
+        environment, or raises the same error, for every environment.
+        Nodes the pass does not change are shared with the original.
+
+    """
+    return _statement(statement, {})[0]
+
+
+def fold_expression(expression, constants=None):
+    """Fold the constant operations of an expression.
+
+    Args:
+        expression: the expression to be folded. It is not changed.
+        constants: a dictionary mapping the names of variables whose
+            values are known to their Number or Boolean values, or None
+            if none are known.
+
+    Returns:
+        An equivalent expression in which the known variables are
+        replaced by their values and every operation on constants that
+        can be folded is replaced by its result.
+
+    """
+    constants = constants or {}
+
+    def fold(node):
+        cls = base_class(node)
+        if cls is Variable:
+            return constants.get(node.name, node)
+        if cls is And or cls is Or:
+            # A constant left operand that decides the result leaves the
+            # right operand unread
+            #
+            left = node.left
+            if _is_constant(left) and bool(left.value) is (cls is Or):
+                return TRUE if cls is Or else FALSE
+        operands = children(node)
+        if not operands or not all(map(_is_constant, operands)):
+            return node
+        try:
+            value = node.evaluate({})
+        except ArithmeticError:
+            return node
+        if (type(value.value) is int
+                and value.value.bit_length() > MAX_FOLDED_BITS):
+            return node
+        return value
+
+    return transform(expression, fold)
+
+
+def _is_constant(node):
+    return isinstance(node, (Boolean, Number))
+
+
+def _meet(known, other):
+    """Keep the known values that two paths agree on."""
+    return {name: value for name, value in known.items()
+            if name in other and _same(value, other[name])}
+
+
+def _same(value, other):
+    # Compare by type and representation, so that 1, 1.0 and True, or
+    # 0.0 and -0.0, are told apart
+    #
+    return (type(value.value) is type(other.value)
+            and repr(value.value) == repr(other.value))
+
+
+def _statement(node, known):
+    """Optimize a statement; return it with the values known after it.
+
+    The dictionary known is updated in place, and may be the one
+    returned, so that following straight-line code costs no copies;
+    the paths of an if statement or a loop body start from copies.
+
+    """
+    return dispatch(_STATEMENTS, node)(node, known)
+
+
+def _assign(node, known):
+    expression = fold_expression(node.expression, known)
+    if _is_constant(expression):
+        known[node.name] = expression
+    else:
+        known.pop(node.name, None)
+    return rebuild(node, [expression]), known
+
+
+def _block(node, known):
+    statements = []
+    for statement in node.statements:
+        statement, known = _statement(statement, known)
+        statements.append(statement)
+    return rebuild(node, statements), known
+
+
+def _if(node, known):
+    condition = fold_expression(node.condition, known)
+    consequence, after_consequence = _statement(
+        node.consequence, dict(known))
+    alternative, after_alternative = _statement(node.alternative, known)
+    if condition is TRUE:
+        after = after_consequence
+    elif _is_constant(condition):
+        after = after_alternative
+    else:
+        after = _meet(after_consequence, after_alternative)
+    return rebuild(node, [condition, consequence, alternative]), after
+
+
+def _sequence(node, known):
+    # Follow a chain of sequences iteratively, as Sequence.evaluate()
+    # does, then rebuild it from the end
+    #
+    firsts = []
+    while base_class(node) is Sequence:
+        first, known = _statement(node.first, known)
+        firsts.append((node, first))
+        node = node.second
+    result, known = _statement(node, known)
+    for sequence, first in reversed(firsts):
+        result = rebuild(sequence, [first, result])
+    return result, known
+
+
+def _while(node, known):
+    # Find what is known at the top of every iteration: start from what
+    # is known on entry and keep what the body agrees with, until that
+    # no longer changes. A condition that is constant and not TRUE there
+    # means the body never runs.
+    #
+    while True:
+        condition = fold_expression(node.condition, known)
+        if _is_constant(condition) and condition is not TRUE:
+            break
+        after = _meet(known, _statement(node.body, dict(known))[1])
+        if len(after) == len(known):
+            break
+        known = after
+    body = _statement(node.body, dict(known))[0]
+    return rebuild(node, [condition, body]), known
+
+
+_STATEMENTS = {
+    Assign: _assign,
+    Block: _block,
+    DoNothing: lambda node, known: (node, known),
+    If: _if,
+    Sequence: _sequence,
+    While: _while,
+}
@@ -0,0 +1,235 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_fusion.
+
+Fused nodes ("superinstructions") for the shapes that dominate simple
+programs. fuse() replaces, wherever it finds them:
+
+- an assignment of a variable, as in x0 = x1, by AssignCopy;
+- an assignment of an arithmetic operation on two variables, as in
+  x2 = x1 + x0, by AssignVariables;
+- an assignment of an arithmetic operation on a variable and a
+  constant, such as the increment i = i + 1, by AssignVariableConstant;
+- a comparison of a variable with a variable or a constant, as in
+  i < limit, by the comparison nodes of simple_quickening.
+
+A fused node evaluates its whole shape in one call, reading operands
+straight from the environment, rather than visiting each node of it.
+It keeps the nodes it replaces as its children, so it prints, compares
+and transforms as the unfused statement does. Program.to_simple()
+applies fuse() to every program it produces.
+
+"""
+
+from operator import add, mul, sub, truediv
+
+from .simple_environments import PersistentEnvironment
+from .simple_expressions import Add, Divide, GreaterThan, LessThan, \
+    Multiply, Number, Subtract, Variable, number
+from .simple_quickening import GreaterThanVariableConstant, \
+    GreaterThanVariables, LessThanVariableConstant, LessThanVariables
+from .simple_statements import Assign
+from .simple_trees import transform
+
+
+class AssignCopy(Assign):
+
+    """Represents an assignment of the value of another variable."""
+
+    __slots__ = ("source",)
+
+    def __init__(self, name, expression):
+        """Constructor.
+
+        Args:
+            name: variable name of the variable on the left hand side of
+                the assignment.
+            expression: the Variable on the right hand side of the
+                assignment.
+
+        """
+        super().__init__(name, expression)
+        self.source = expression.name
+
+    def evaluate(self, environment):
+        """Execute the statement in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            The environment Assign.evaluate() would return.
+
+        """
+        return _assign(environment, self.name, environment[self.source])
+
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values. It is updated in place.
+
+        """
+        environment[self.name] = environment[self.source]
+
+
+class AssignVariableConstant(Assign):
+
+    """Represents an assignment of arithmetic on a variable and constant."""
+
+    __slots__ = ("operator", "left", "right")
+
+    def __init__(self, name, expression):
+        """Constructor.
+
+        Args:
+            name: variable name of the variable on the left hand side of
+                the assignment.
+            expression: the Add, Subtract, Multiply or Divide of a
+                Variable and a Number on the right hand side of the
+                assignment.
+
+        """
+        super().__init__(name, expression)
+        self.operator = _OPERATORS[type(expression)]
+        self.left = expression.left.name
+        self.right = expression.right.value
+
+    def evaluate(self, environment):
+        """Execute the statement in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            The environment Assign.evaluate() would return.
+
+        """
+        return _assign(environment, self.name, number(self.operator(
+            environment[self.left].value, self.right)))
+
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values. It is updated in place.
+
+        """
+        environment[self.name] = number(self.operator(
+            environment[self.left].value, self.right))
+
+
+class AssignVariables(Assign):
+
+    """Represents an assignment of arithmetic on two variables."""
+
+    __slots__ = ("operator", "left", "right")
+
+    def __init__(self, name, expression):
+        """Constructor.
+
+        Args:
+            name: variable name of the variable on the left hand side of
+                the assignment.
+            expression: the Add, Subtract, Multiply or Divide of two
+                Variables on the right hand side of the assignment.
+
+        """
+        super().__init__(name, expression)
+        self.operator = _OPERATORS[type(expression)]
+        self.left = expression.left.name
+        self.right = expression.right.name
+
+    def evaluate(self, environment):
+        """Execute the statement in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            The environment Assign.evaluate() would return.
+
+        """
+        return _assign(environment, self.name, number(self.operator(
+            environment[self.left].value, environment[self.right].value)))
+
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values. It is updated in place.
+
+        """
+        environment[self.name] = number(self.operator(
+            environment[self.left].value, environment[self.right].value))
+
+
+def fuse(statement):
+    """Replace the common shapes of a program with fused nodes.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple()) to be fused. It is not changed.
+
+    Returns:
+        An equal statement, evaluated just as the original is, in which
+        the shapes listed in the module documentation are fused nodes.
+
+    """
+    return transform(statement, _fuse)
+
+
+def _assign(environment, name, value):
+    if isinstance(environment, PersistentEnvironment):
+        return environment.set(name, value)
+    new_environment = environment.copy()
+    new_environment[name] = value
+    return new_environment
+
+
+def _fuse(node):
+    cls = type(node)
+    if cls is Assign:
+        expression = node.expression
+        kind = type(expression)
+        if kind is Variable:
+            return AssignCopy(node.name, expression)
+        if kind in _OPERATORS and type(expression.left) is Variable:
+            if type(expression.right) is Variable:
+                return AssignVariables(node.name, expression)
+            if type(expression.right) is Number:
+                return AssignVariableConstant(node.name, expression)
+        return node
+    comparisons = _COMPARISONS.get(cls)
+    if comparisons is not None and type(node.left) is Variable:
+        if type(node.right) is Variable:
+            return comparisons[0](node.left, node.right)
+        if type(node.right) is Number:
+            return comparisons[1](node.left, node.right)
+    return node
+
+
+# The comparison nodes for a variable with a variable and with a constant
+#
+_COMPARISONS = {
+    GreaterThan: (GreaterThanVariables, GreaterThanVariableConstant),
+    LessThan: (LessThanVariables, LessThanVariableConstant),
+}
+
+# The operation on plain values performed by each arithmetic node
+#
+_OPERATORS = {
+    Add: add,
+    Divide: truediv,
+    Multiply: mul,
+    Subtract: sub,
+}
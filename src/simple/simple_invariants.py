@@ -0,0 +1,177 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_invariants.
+
+Loop-invariant code motion. hoist_invariants() finds the operations in
+each while loop whose operands the loop never assigns, and which so
+have the same value in every iteration, and computes each once, into a
+temporary assigned before the loop, rather than once per iteration:
+
+    while (i < n * m) { x = x + a * b; i = i + 1; }
+
+becomes
+
+    _cse0 = n * m;
+    if (i < _cse0) {
+        _cse1 = a * b;
+        while (i < _cse0) { x = x + _cse1; i = i + 1; }
+        delete _cse1;
+    } else { do-nothing }
+    delete _cse0;
+
+An operation is hoisted only if the loop certainly computes it when it
+first runs its condition or body, so that computing it earlier raises
+an error, such as a ZeroDivisionError or a KeyError for a variable
+without a value, only when the loop would have raised one. Operations
+from the condition are computed just before the loop, where the
+condition would have been tested; operations from the body are computed
+inside an if statement that tests the condition, so that they are not
+computed if the loop never runs. Operations from the body are taken from
+the statements it runs first, up to the first that contains a loop,
+which might not finish; those in a branch of an if statement, or in the
+right operand of an and or an or, are not always computed and are not
+hoisted, but are replaced wherever a hoisted operation is.
+
+Inner loops are processed first, so that an operation hoisted from the
+condition of an inner loop into the body of an outer one is hoisted
+again if the outer loop does not change it either. As with
+simple_subexpressions, a Delete after the loop removes the temporaries
+again, so the program produces the same environment as before, and
+since an error may be raised earlier than before, when more than one
+error could be raised a different one of them may be.
+
+"""
+
+from .simple_elimination import assigned_names, read_names
+from .simple_expressions import And, Boolean, Number, Or, Variable
+from .simple_statements import Assign, Block, Delete, DoNothing, If, \
+    Sequence, While
+from .simple_subexpressions import temporaries
+from .simple_trees import base_class, children, rebuild, transform, walk
+
+_DO_NOTHING = DoNothing()
+
+
+def hoist_invariants(statement):
+    """Move the loop-invariant operations of a program out of its loops.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple()) to be optimized. It is not changed.
+
+    Returns:
+        An equivalent statement, as described in the module
+        documentation. Nodes the pass does not change are shared with
+        the original.
+
+    """
+    names = temporaries(read_names(statement) | assigned_names(statement))
+
+    def hoist(node):
+        if base_class(node) is While:
+            return _hoist(node, names)
+        return node
+
+    return transform(statement, hoist)
+
+
+def _hoist(loop, names):
+    """Hoist the invariant operations of a loop whose inner loops are done."""
+    assigned = assigned_names(loop.body)
+    hoisted = {}
+    before = []
+    _collect(loop.condition, assigned, hoisted, before, names)
+    inside = []
+    for statement in _flatten(loop.body):
+        cls = base_class(statement)
+        if cls is Assign:
+            _collect(statement.expression, assigned, hoisted, inside, names)
+        elif cls is If or cls is While:
+            _collect(statement.condition, assigned, hoisted, inside, names)
+            if any(base_class(node) is While for node in walk(statement)):
+                break
+    if not hoisted:
+        return loop
+
+    loop = _replace(loop, hoisted)
+    if inside:
+        loop = If(loop.condition, Block(inside + [loop, _delete(inside)]),
+                  _DO_NOTHING)
+    if before:
+        return Block(before + [loop, _delete(before)])
+    return loop
+
+
+def _collect(node, assigned, hoisted, statements, names):
+    """Find the invariant operations an expression certainly computes.
+
+    Each operation found, the outermost where they nest, is given a
+    temporary in hoisted, keyed by its structure, and an assignment to
+    the temporary in statements.
+
+    """
+    if base_class(node) in (Boolean, Number, Variable):
+        return
+    key = _key(node)
+    if key in hoisted:
+        return
+    if not read_names(node) & assigned:
+        name = next(names)
+        statements.append(Assign(name, _replace(node, hoisted)))
+        hoisted[key] = Variable(name)
+        return
+    operands = children(node)
+    if base_class(node) in (And, Or):
+        operands = operands[:1]
+    for child in operands:
+        _collect(child, assigned, hoisted, statements, names)
+
+
+def _delete(assignments):
+    """Produce the deletion of the temporaries of some assignments."""
+    return Delete(assignment.name for assignment in assignments)
+
+
+def _flatten(node):
+    """Produce the top-level statements of nested blocks and sequences."""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        cls = base_class(node)
+        if cls is Block:
+            pending.extend(reversed(node.statements))
+        elif cls is Sequence:
+            pending.extend((node.second, node.first))
+        else:
+            yield node
+
+
+def _key(node):
+    """Produce a key identifying an expression by its exact structure.
+
+    Constants are keyed by their exact type and representation, so that
+    1, 1.0 and True, which are equal as expressions, are told apart.
+
+    """
+    cls = base_class(node)
+    if cls is Variable:
+        return (cls, node.name)
+    if cls is Boolean or cls is Number:
+        return (cls, type(node.value), repr(node.value))
+    return (cls,) + tuple(_key(child) for child in children(node))
+
+
+def _replace(node, hoisted):
+    """Replace the hoisted operations of a node by their temporaries."""
+    cls = base_class(node)
+    if cls in (Boolean, Number, Variable, DoNothing):
+        return node
+    if cls not in (Assign, Block, If, Sequence, While):
+        temporary = hoisted.get(_key(node))
+        if temporary is not None:
+            return temporary
+    return rebuild(node, [_replace(child, hoisted)
+                          for child in children(node)])
@@ -0,0 +1,410 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_limits.
+
+Bounds the resources a program may use. A Limits object sets any of:
+
+- iterations: the number of while loop iterations run, across all
+  loops. Between iterations a program runs each of its statements at
+  most once, so this also bounds the statements executed;
+- variables: the number of variables in the environment, checked as a
+  run starts and ends. A run can add only the variables its program
+  assigns, a fixed set, so the environment cannot grow without bound in
+  between;
+- bits: the bit length of any int produced by a multiplication;
+- seconds: the wall-clock time a run may take.
+
+govern() instruments a program with Check statements that enforce the
+limits through a Governor: one at the top of each loop body, counting
+the iteration, and one after each assignment whose expression
+multiplies, measuring the product. Only multiplication can grow an int
+by more than one bit per statement, so sums and differences stay within
+a few bits per iteration of their inputs. Check is a kind of DoNothing,
+and every engine translates it to a call on the governor, so the limits
+hold however the program is run; compiled loops count their iterations
+in a local, leased from the governor a run at a time, which keeps the
+checks cheap. When a limit is exceeded, the run stops with a
+LimitExceeded error carrying the environment as it was.
+
+"""
+
+import time
+
+from .simple_expressions import Multiply
+from .simple_statements import Assign, DoNothing, Sequence, While
+from .simple_trees import transform, walk
+
+# The number of iterations between checks of the clock
+#
+CLOCK_INTERVAL = 256
+
+
+class Check(DoNothing):
+
+    """Represents a statement that enforces limits on a running program."""
+
+    __slots__ = ("governor", "name")
+
+    def __init__(self, governor, name=None):
+        """Constructor.
+
+        Args:
+            governor: the Governor that enforces the limits.
+            name: the variable whose value is to be measured, or None
+                to count a loop iteration.
+
+        """
+        self.governor = governor
+        self.name = name
+
+    def __str__(self):
+        """A string representation of the statement."""
+        if self.name is None:
+            return "check;"
+        return "check {0};".format(self.name)
+
+    def evaluate(self, environment):
+        """Execute the statement in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            The environment, unchanged.
+
+        Raises:
+            LimitExceeded: a limit has been exceeded. The error carries
+                the environment.
+
+        """
+        try:
+            if self.name is None:
+                self.governor.iterate()
+            else:
+                self.governor.measure(environment[self.name].value)
+        except LimitExceeded as error:
+            if error.environment is None:
+                error.environment = environment
+            raise
+        return environment
+
+    def execute(self, environment):
+        """Execute the statement, leaving the environment unchanged.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values.
+
+        Raises:
+            LimitExceeded: a limit has been exceeded. The error carries
+                a copy of the environment.
+
+        """
+        self.evaluate(environment)
+
+
+class GovernedProgram:
+
+    """Represents a program whose runs are bounded by limits."""
+
+    def __init__(self, program, governor):
+        """Constructor.
+
+        Args:
+            program: an object with an evaluate(environment) method, as
+                produced by an engine from a statement instrumented by
+                govern() with the same governor.
+            governor: the Governor that enforces the limits.
+
+        """
+        self.program = program
+        self.governor = governor
+
+    def __repr__(self):
+        """A guillemet-delimited string representation of the program."""
+        return "«{0}»".format(self)
+
+    def __str__(self):
+        """A string representation of the program."""
+        return "{0}".format(self.program)
+
+    def evaluate(self, environment):
+        """Execute the program in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            The environment the program returns.
+
+        Raises:
+            LimitExceeded: a limit has been exceeded. The error carries
+                the environment as it was when the run stopped.
+
+        """
+        governor = self.governor
+        governor.start(environment)
+        try:
+            result = self.program.evaluate(environment)
+        except LimitExceeded as error:
+            if error.environment is None:
+                error.environment = environment
+            raise
+        governor.finish(result)
+        return result
+
+
+class Governor:
+
+    """Enforces Limits on one run of a program at a time."""
+
+    def __init__(self, limits):
+        """Constructor.
+
+        Args:
+            limits: the Limits to be enforced.
+
+        """
+        self.limits = limits
+        self.iterations = 0
+        self._deadline = None
+
+    def finish(self, environment):
+        """Check the limits on the environment a run produced.
+
+        Args:
+            environment: the environment produced.
+
+        Raises:
+            LimitExceeded: the environment has too many variables.
+
+        """
+        variables = self.limits.variables
+        if variables is not None and len(environment) > variables:
+            raise LimitExceeded("variables", variables, environment)
+
+    @property
+    def iterations(self):
+        """The number of loop iterations the current run has taken."""
+        return self._counted - self._countdown
+
+    @iterations.setter
+    def iterations(self, iterations):
+        self._counted = iterations
+        self._countdown = 0
+
+    def iterate(self):
+        """Count a loop iteration.
+
+        Raises:
+            LimitExceeded: the run has exceeded its iterations or,
+                checked every CLOCK_INTERVAL iterations, its time.
+
+        """
+        # Count down to the next checkpoint, so that most iterations
+        # cost one subtraction and comparison
+        #
+        self._countdown -= 1
+        if self._countdown < 0:
+            self._checkpoint()
+
+    def lease(self):
+        """Count a loop iteration, leasing the count of those that follow.
+
+        Compiled code counts the leased iterations itself, in a local
+        variable, which costs less than a call of iterate() for each.
+        It calls lease() again once they are used up, and hands back
+        those it has not used with settle() before it returns.
+
+        Returns:
+            The number of further iterations the caller may take before
+            it calls lease() again.
+
+        Raises:
+            LimitExceeded: as iterate() does.
+
+        """
+        self.iterate()
+        leased = self._countdown
+        self._countdown = 0
+        return leased
+
+    def measure(self, value):
+        """Check the size of a value.
+
+        Args:
+            value: the plain Python value just produced.
+
+        Raises:
+            LimitExceeded: the value is an int longer than the bits
+                limit, or the run has taken too long.
+
+        """
+        bits = self.limits.bits
+        if (bits is not None and type(value) is int
+                and value.bit_length() > bits):
+            raise LimitExceeded("bits", bits)
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise LimitExceeded("seconds", self.limits.seconds)
+
+    def settle(self, unused):
+        """Hand back the unused iterations of a lease.
+
+        Args:
+            unused: the number of leased iterations not taken. A
+                negative number, left in the caller's countdown by a
+                lease() that raised LimitExceeded, hands back none.
+
+        """
+        if unused > 0:
+            self._countdown += unused
+
+    def start(self, environment):
+        """Prepare for a run.
+
+        Args:
+            environment: the environment the run starts from.
+
+        Raises:
+            LimitExceeded: the environment already has too many
+                variables.
+
+        """
+        self.iterations = 0
+        seconds = self.limits.seconds
+        if seconds is None:
+            self._deadline = None
+        else:
+            self._deadline = time.perf_counter() + seconds
+        self.finish(environment)
+
+    def _checkpoint(self):
+        """Check the limits; count down to the next checkpoint."""
+        limits = self.limits
+        self._counted = iterations = self._counted + 1
+        self._countdown = 0
+        if limits.iterations is not None and iterations > limits.iterations:
+            raise LimitExceeded("iterations", limits.iterations)
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise LimitExceeded("seconds", limits.seconds)
+        interval = CLOCK_INTERVAL
+        if limits.iterations is not None:
+            interval = min(interval, limits.iterations - iterations)
+        self._counted = iterations + interval
+        self._countdown = interval
+
+
+class LimitExceeded(Exception):
+
+    """Raised when a program exceeds one of its limits.
+
+    Attributes:
+        limit: the name of the limit exceeded: "iterations",
+            "variables", "bits" or "seconds".
+        maximum: the value of that limit.
+        environment: the environment as it was when the run stopped, of
+            the same kind as the one the run started from, or None if
+            not yet known.
+
+    """
+
+    def __init__(self, limit, maximum, environment=None):
+        """Constructor.
+
+        Args:
+            limit: the name of the limit exceeded.
+            maximum: the value of that limit.
+            environment: the environment when the run stopped, if known.
+
+        """
+        super().__init__(limit, maximum)
+        self.limit = limit
+        self.maximum = maximum
+        self.environment = environment
+
+    def __str__(self):
+        """A string representation of the error."""
+        return "{0} limit of {1} exceeded".format(self.limit, self.maximum)
+
+
+class Limits:
+
+    """Represents bounds on the resources a program may use."""
+
+    def __init__(self, iterations=None, variables=None, bits=None,
+                 seconds=None):
+        """Constructor.
+
+        Args:
+            iterations: the most while loop iterations a run may take,
+                or None for no limit.
+            variables: the most variables the environment may hold, or
+                None for no limit.
+            bits: the longest int, in bits, a multiplication may
+                produce, or None for no limit.
+            seconds: the most wall-clock time a run may take, or None
+                for no limit.
+
+        """
+        self.iterations = iterations
+        self.variables = variables
+        self.bits = bits
+        self.seconds = seconds
+
+    def __repr__(self):
+        """A string representation of the limits."""
+        return "Limits(iterations={0!r}, variables={1!r}, bits={2!r}, " \
+            "seconds={3!r})".format(
+                self.iterations, self.variables, self.bits, self.seconds)
+
+
+def govern(statement, governor):
+    """Instrument a program to enforce limits.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple()) to be instrumented. It is not changed.
+        governor: the Governor to enforce the limits.
+
+    Returns:
+        A copy of the statement with a Check at the top of each loop
+        body and after each assignment whose expression multiplies.
+
+    """
+    def instrument(node):
+        if isinstance(node, While):
+            return While(
+                node.condition, Sequence(Check(governor), node.body))
+        if isinstance(node, Assign) and any(
+                isinstance(child, Multiply)
+                for child in walk(node.expression)):
+            return Sequence(node, Check(governor, node.name))
+        return node
+
+    return transform(statement, instrument)
+
+
+def hooks(statement):
+    """Produce the names compiled code uses to call a program's governor.
+
+    Args:
+        statement: a statement, possibly instrumented by govern().
+
+    Returns:
+        A dictionary mapping "iterate", "lease", "measure" and "settle"
+        to the methods of the governor of the first Check in the
+        statement, or an empty dictionary if there is none.
+
+    """
+    for node in walk(statement):
+        if isinstance(node, Check):
+            governor = node.governor
+            return dict(
+                iterate=governor.iterate, lease=governor.lease,
+                measure=governor.measure, settle=governor.settle)
+    return {}
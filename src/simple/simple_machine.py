@@ -0,0 +1,276 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_machine.
+
+Small-step semantics for simple programs, after the reduction machine
+of Understanding Computation. Where evaluate() runs a program to the
+end in one call, a Machine reduces it one small step at a time, so a
+caller can run a program for a budget of steps, put it aside and
+resume it later. A Machine that has run to completion holds the
+environment evaluate() would have returned.
+
+Each step does a bounded amount of work: it reduces the leftmost
+reducible expression of the current statement by one step, stores a
+value, chooses a branch, unrolls a while loop by one iteration, or
+moves on to the next statement of a sequence or block. A Check placed
+by simple_limits.govern() takes a step of its own, as does a Delete.
+
+"""
+
+from .simple_environments import PersistentEnvironment
+from .simple_expressions import Add, And, Boolean, Divide, GreaterThan, \
+    LessThan, Multiply, Not, Number, Or, Subtract, Variable, FALSE, TRUE, \
+    number
+from .simple_limits import Check
+from .simple_statements import Assign, Block, Delete, DoNothing, If, \
+    Sequence, While
+from .simple_trees import base_class, dispatch
+
+_DO_NOTHING = DoNothing()
+
+
+class Machine:
+
+    """Represents a program part way through small-step reduction."""
+
+    def __init__(self, statement, environment):
+        """Constructor.
+
+        Args:
+            statement: the statement (usually the product of
+                Program.to_simple()) to be reduced.
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment. It is not changed.
+
+        """
+        self.statement = statement
+        if isinstance(environment, PersistentEnvironment):
+            self.environment = environment
+        else:
+            self.environment = dict(environment)
+        self.pending = []
+        self.steps = 0
+
+    def __repr__(self):
+        """A guillemet-delimited string representation of the machine."""
+        return "«{0}»".format(self)
+
+    def __str__(self):
+        """A string representation of the machine."""
+        return "{0} {1}".format(self.statement, self.environment)
+
+    @property
+    def finished(self):
+        """Whether the program has been reduced to completion."""
+        return type(self.statement) is DoNothing and not self.pending
+
+    def run(self, budget=None):
+        """Reduce the program until it finishes or the budget runs out.
+
+        Args:
+            budget: the most steps to take, or None to run the program
+                to completion.
+
+        Returns:
+            True if the program has finished, in which case environment
+            holds its result; False if the budget ran out first, in
+            which case another call of run() resumes the program where
+            it stopped.
+
+        Raises:
+            KeyError: the program reads a variable that has no value.
+                The machine stays at the step that read it.
+            LimitExceeded: a Check found a limit exceeded. The machine
+                stays at the Check.
+
+        """
+        step = self.step
+        if budget is None:
+            while step():
+                pass
+        else:
+            while budget > 0 and step():
+                budget -= 1
+        return self.finished
+
+    def step(self):
+        """Reduce the program by one small step.
+
+        Returns:
+            False if the program had already finished, so that no step
+            was taken; otherwise, True.
+
+        Raises:
+            KeyError: the program reads a variable that has no value.
+            LimitExceeded: a Check found a limit exceeded.
+
+        """
+        statement = self.statement
+        if type(statement) is DoNothing:
+            if not self.pending:
+                return False
+            self.statement = self.pending.pop()
+        else:
+            dispatch(_STATEMENTS, statement)(self, statement)
+        self.steps += 1
+        return True
+
+
+def reduce(expression, environment):
+    """Reduce an expression by one small step.
+
+    Args:
+        expression: a reducible expression; that is, one that is not a
+            Number or Boolean.
+        environment: a dictionary of variable names (keys) and their
+            values, or a PersistentEnvironment.
+
+    Returns:
+        The expression with its leftmost reducible part reduced by one
+        step. Reducing it repeatedly until it is a Number or Boolean
+        yields the value evaluate() would produce.
+
+    Raises:
+        KeyError: the reduced part reads a variable that has no value.
+
+    """
+    return dispatch(_EXPRESSIONS, expression)(expression, environment)
+
+
+def reducible(expression):
+    """Determine whether an expression can be reduced further.
+
+    Args:
+        expression: the expression to be checked.
+
+    Returns:
+        False if the expression is a Number or Boolean value; otherwise,
+        True.
+
+    """
+    return not isinstance(expression, (Boolean, Number))
+
+
+def _arithmetic(operate):
+    def reduce_arithmetic(node, environment):
+        left = node.left
+        if reducible(left):
+            return base_class(node)(reduce(left, environment), node.right)
+        right = node.right
+        if reducible(right):
+            return base_class(node)(left, reduce(right, environment))
+        return operate(left.value, right.value)
+    return reduce_arithmetic
+
+
+def _logical(value_of_left_that_decides):
+    # And is decided by a falsy left operand, Or by a truthy one; the
+    # right operand is then never reduced, as evaluate() never reads it
+    #
+    def reduce_logical(node, environment):
+        left = node.left
+        if reducible(left):
+            return base_class(node)(reduce(left, environment), node.right)
+        if bool(left.value) is value_of_left_that_decides:
+            return TRUE if value_of_left_that_decides else FALSE
+        right = node.right
+        if reducible(right):
+            return base_class(node)(left, reduce(right, environment))
+        return TRUE if right.value else FALSE
+    return reduce_logical
+
+
+def _not(node, environment):
+    value = node.value
+    if reducible(value):
+        return Not(reduce(value, environment))
+    return FALSE if value.value else TRUE
+
+
+def _assign(machine, node):
+    expression = node.expression
+    if reducible(expression):
+        machine.statement = Assign(
+            node.name, reduce(expression, machine.environment))
+        return
+    environment = machine.environment
+    if isinstance(environment, PersistentEnvironment):
+        machine.environment = environment.set(node.name, expression)
+    else:
+        environment[node.name] = expression
+    machine.statement = _DO_NOTHING
+
+
+def _block(machine, node):
+    machine.pending.extend(reversed(node.statements))
+    machine.statement = _DO_NOTHING
+
+
+def _check(machine, node):
+    node.evaluate(machine.environment)
+    machine.statement = _DO_NOTHING
+
+
+def _delete(machine, node):
+    environment = machine.environment
+    if isinstance(environment, PersistentEnvironment):
+        machine.environment = node.evaluate(environment)
+    else:
+        node.execute(environment)
+    machine.statement = _DO_NOTHING
+
+
+def _do_nothing(machine, node):
+    machine.statement = _DO_NOTHING
+
+
+def _if(machine, node):
+    condition = node.condition
+    if reducible(condition):
+        machine.statement = If(
+            reduce(condition, machine.environment), node.consequence,
+            node.alternative)
+    elif condition is TRUE:
+        machine.statement = node.consequence
+    else:
+        machine.statement = node.alternative
+
+
+def _sequence(machine, node):
+    machine.pending.append(node.second)
+    machine.statement = node.first
+
+
+def _while(machine, node):
+    machine.statement = If(
+        node.condition, Sequence(node.body, node), _DO_NOTHING)
+
+
+_EXPRESSIONS = {
+    Add: _arithmetic(lambda left, right: number(left + right)),
+    And: _logical(False),
+    Divide: _arithmetic(lambda left, right: Number(left / right)),
+    GreaterThan: _arithmetic(
+        lambda left, right: TRUE if left > right else FALSE),
+    LessThan: _arithmetic(
+        lambda left, right: TRUE if left < right else FALSE),
+    Multiply: _arithmetic(lambda left, right: number(left * right)),
+    Not: _not,
+    Or: _logical(True),
+    Subtract: _arithmetic(lambda left, right: number(left - right)),
+    Variable: lambda node, environment: environment[node.name],
+}
+
+_STATEMENTS = {
+    Assign: _assign,
+    Block: _block,
+    Check: _check,
+    Delete: _delete,
+    DoNothing: _do_nothing,
+    If: _if,
+    Sequence: _sequence,
+    While: _while,
+}
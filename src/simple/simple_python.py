@@ -0,0 +1,482 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_python.
+
+Runs a program by translating it to Python source with to_python(),
+compiling that source once, and calling the resulting function. Program
+variables become Python locals of the function rather than subscripts
+of an environment dictionary, so loops run at CPython bytecode speed.
+
+The translation swaps in subclasses of the nodes whose to_python()
+output would otherwise differ from evaluate(): variables and
+assignments use locals, And and Or produce bools, and If and While
+test their conditions for identity with True (so a Number condition is
+always false, as it is for evaluate()). A condition that reads no
+variables is folded to its value first, so that no literal is tested.
+
+A Delete sets the locals of its variables to None, which the function
+hands back as having no value.
+
+A Check placed by simple_limits.govern() becomes a call of the
+governor, which the function finds among its globals; loop iterations
+are counted down in a local leased from the governor. If a limit is
+exceeded, the values of the locals are recovered from the traceback, so
+the error still carries the environment as it was.
+
+"""
+
+from .simple_bytecode import exposed_reads
+from .simple_expressions import And, Boolean, GreaterThan, LessThan, Not, \
+    Number, Or, Variable
+from .simple_folding import fold_expression
+from .simple_limits import Check, hooks, LimitExceeded
+from .simple_slots import assign_slots, box_frame, deleted_names, \
+    unbox_frame
+from .simple_statements import Assign, Delete, DoNothing, If, While
+from .simple_trees import base_class, transform
+
+
+class PythonProgram:
+
+    """Represents a program compiled to a Python function."""
+
+    def __init__(self, statement):
+        """Constructor.
+
+        Args:
+            statement: the statement (usually the product of
+                Program.to_simple()) to be compiled.
+
+        """
+        self.statement = statement
+        self.names = tuple(assign_slots(statement))
+        slots = {name: slot for slot, name in enumerate(self.names)}
+        self.exposed = tuple(
+            slots[name] for name in exposed_reads(statement))
+        self.deleted = deleted_names(statement)
+        namespace = hooks(statement)
+        exec(self._compile(), namespace)
+        self._run = namespace["run"]
+
+    def __repr__(self):
+        """A guillemet-delimited string representation of the program."""
+        return "«{0}»".format(self)
+
+    def __str__(self):
+        """A string representation of the program."""
+        return "{0}".format(self.statement)
+
+    def _compile(self):
+        """Produce the code object that defines the run() function."""
+        self.source = _function_source(
+            localize(self.statement), self.names,
+            bool(hooks(self.statement)))
+        return compile(self.source, "<simple>", "exec")
+
+    def evaluate(self, environment):
+        """Execute the program in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            Always returns a new environment, updated to reflect the
+            evaluation of the program, as the statement's evaluate()
+            would.
+
+        Raises:
+            KeyError: the program reads a variable that has no value.
+            LimitExceeded: a Check found a limit exceeded. The error
+                carries the environment as it was.
+
+        """
+        frame = unbox_frame(environment, self.names)
+        for slot in self.exposed:
+            if frame[slot] is None:
+                # The program may read a variable that has no value;
+                # let the tree walker run it instead, from the start,
+                # and name the variable if it does
+                #
+                return self.statement.evaluate(environment)
+        try:
+            frame = self._run(frame)
+        except LimitExceeded as error:
+            frame = traced_frame(error, self._run.__code__, self.names)
+            error.environment = box_frame(
+                environment, self.names, frame, self.deleted)
+            raise
+        return box_frame(environment, self.names, frame, self.deleted)
+
+
+class LocalAnd(And):
+
+    """Represents a logical and that translates to a Python bool."""
+
+    __slots__ = ()
+
+    def to_python(self, indentation):
+        """Produce the expression translated to Python.
+
+        Args:
+            indentation: The current indentation level (in count of
+                4-character chunks).
+
+        Returns:
+            A string containing Python code representing the
+            expression.
+
+        """
+        return _as_bool(self, super().to_python(indentation))
+
+
+class LocalAssign(Assign):
+
+    """Represents an assignment statement to a Python local."""
+
+    __slots__ = ()
+
+    def to_python(self, indentation):
+        """Produce the statement translated to Python.
+
+        Args:
+            indentation: The current indentation level (in count of
+                4-character chunks).
+
+        Returns:
+            A string containing Python code representing the
+            statement.
+
+        """
+        return "{0}{1} = {2}".format(
+            "    " * indentation, local_name(self.name),
+            self.expression.to_python(indentation))
+
+
+class LocalCheck(Check):
+
+    """Represents a limits check that translates to a governor call."""
+
+    __slots__ = ()
+
+    def to_python(self, indentation):
+        """Produce the statement translated to Python.
+
+        Args:
+            indentation: The current indentation level (in count of
+                4-character chunks).
+
+        Returns:
+            A string containing Python code representing the
+            statement: a count down of the local countdown, which
+            calls lease() once the lease runs out, or a call of
+            measure(), as named by hooks(). The function must start
+            countdown at 0 and pass it to settle() before it returns.
+
+        """
+        if self.name is None:
+            return "{0}countdown -= 1\n{0}if countdown < 0:\n" \
+                "{0}    countdown = lease()".format("    " * indentation)
+        return "{0}measure({1})".format(
+            "    " * indentation, local_name(self.name))
+
+
+class LocalDelete(Delete):
+
+    """Represents a deletion of Python locals, by setting them to None."""
+
+    __slots__ = ()
+
+    def to_python(self, indentation):
+        """Produce the statement translated to Python.
+
+        Args:
+            indentation: The current indentation level (in count of
+                4-character chunks).
+
+        Returns:
+            A string containing Python code representing the
+            statement.
+
+        """
+        if not self.names:
+            return DoNothing.to_python(self, indentation)
+        return "{0}{1} = None".format(
+            "    " * indentation,
+            " = ".join(local_name(name) for name in self.names))
+
+
+class LocalIf(If):
+
+    """Represents an if statement that tests its condition by identity."""
+
+    __slots__ = ()
+
+    def to_python(self, indentation):
+        """Produce the statement translated to Python.
+
+        Args:
+            indentation: The current indentation level (in count of
+                4-character chunks).
+
+        Returns:
+            A string containing Python code representing the
+            statement.
+
+        """
+        return "{0}if {1}:\n{2}\n{0}else:\n{3}".format(
+            "    " * indentation,
+            _condition(self.condition, indentation),
+            self.consequence.to_python(indentation + 1),
+            self.alternative.to_python(indentation + 1))
+
+
+class LocalOr(Or):
+
+    """Represents a logical or that translates to a Python bool."""
+
+    __slots__ = ()
+
+    def to_python(self, indentation):
+        """Produce the expression translated to Python.
+
+        Args:
+            indentation: The current indentation level (in count of
+                4-character chunks).
+
+        Returns:
+            A string containing Python code representing the
+            expression.
+
+        """
+        return _as_bool(self, super().to_python(indentation))
+
+
+class LocalVariable(Variable):
+
+    """Represents a variable expression held in a Python local."""
+
+    __slots__ = ()
+
+    def to_python(self, indentation):
+        """Produce the expression translated to Python.
+
+        Args:
+            indentation: The current indentation level (in count of
+                4-character chunks).
+
+        Returns:
+            A string containing Python code representing the
+            expression.
+
+        """
+        return local_name(self.name)
+
+
+class LocalWhile(While):
+
+    """Represents a while statement that tests its condition by identity."""
+
+    __slots__ = ()
+
+    def to_python(self, indentation):
+        """Produce the statement translated to Python.
+
+        Args:
+            indentation: The current indentation level (in count of
+                4-character chunks).
+
+        Returns:
+            A string containing Python code representing the
+            statement.
+
+        """
+        return "{0}while {1}:\n{2}".format(
+            "    " * indentation,
+            _condition(self.condition, indentation),
+            self.body.to_python(indentation + 1))
+
+
+def compile_python(statement):
+    """Compile a program to a Python function.
+
+    Args:
+        statement: the statement to be compiled.
+
+    Returns:
+        A PythonProgram.
+
+    """
+    return PythonProgram(statement)
+
+
+def fold_condition(expression):
+    """Fold the test of an if or while statement if it is a constant.
+
+    A test that reads no variables is decided before the program runs.
+    It translates to its value rather than to an identity test of a
+    literal with True, which CPython warns about when it compiles it.
+
+    Args:
+        expression: the test, possibly localized.
+
+    Returns:
+        The Boolean or Number the test folds to, or else the test
+        itself.
+
+    """
+    folded = fold_expression(expression)
+    if isinstance(folded, (Boolean, Number)):
+        return folded
+    return expression
+
+
+def is_boolean(expression):
+    """Determine whether an expression always produces a bool.
+
+    Args:
+        expression: the expression to be checked.
+
+    Returns:
+        True if the translated expression is known to produce a Python
+        bool, so that it needs no conversion to match evaluate().
+
+    """
+    if isinstance(expression, (Boolean, GreaterThan, LessThan, Not)):
+        return True
+    if isinstance(expression, (And, Or)):
+        return is_boolean(expression.left) and is_boolean(expression.right)
+    return False
+
+
+def local_name(name):
+    """Produce the name of the Python local holding a program variable.
+
+    Args:
+        name: the program variable name.
+
+    Returns:
+        The name prefixed so that it cannot collide with a Python
+        keyword or with the names used by the generated function.
+
+    """
+    return "v_{0}".format(name)
+
+
+def localize(statement):
+    """Prepare a program for translation to the body of a function.
+
+    Args:
+        statement: the statement to be prepared.
+
+    Returns:
+        A copy of the statement whose to_python() output keeps variables
+        in Python locals named by local_name() and otherwise behaves as
+        evaluate() does.
+
+    """
+    return transform(statement, _localize)
+
+
+def traced_frame(error, code, names):
+    """Recover the locals of a generated function from an error it raised.
+
+    Args:
+        error: the exception raised through the function.
+        code: the code object of the function.
+        names: a sequence of the variable names, indexed by slot.
+
+    Returns:
+        A frame of the plain values the variables held when the error
+        was raised, as box_frame() takes; a variable without a value,
+        or any variable if the function is not in the traceback, is
+        None.
+
+    """
+    traceback = error.__traceback__
+    while traceback is not None:
+        if traceback.tb_frame.f_code is code:
+            values = traceback.tb_frame.f_locals
+            return [values.get(local_name(name)) for name in names]
+        traceback = traceback.tb_next
+    return [None] * len(names)
+
+
+def _as_bool(expression, code):
+    if is_boolean(expression):
+        return code
+    return "bool({0})".format(code)
+
+
+def _condition(expression, indentation):
+    expression = fold_condition(expression)
+    if isinstance(expression, Number):
+        return "False"
+    code = expression.to_python(indentation)
+    if is_boolean(expression):
+        return code
+    return "({0}) is True".format(code)
+
+
+def _function_source(statement, names, governed=False):
+    """Produce the source of the function that runs a program.
+
+    The function takes a frame of plain values, as produced by
+    unbox_frame(), and returns the updated frame. Variables without a
+    value are deleted from the locals; PythonProgram.evaluate() runs the
+    function only if the program cannot read one. A governed function
+    keeps the countdown of its loop iterations, as LocalCheck requires.
+
+    """
+    lines = ["def run(frame):"]
+    if names:
+        lines.append("    {0}, = frame".format(
+            ", ".join(local_name(name) for name in names)))
+        for name in names:
+            lines.append("    if {0} is None:\n        del {0}".format(
+                local_name(name)))
+    if governed:
+        lines.append("    countdown = 0")
+    lines.append(statement.to_python(1))
+    if governed:
+        lines.append("    settle(countdown)")
+    lines.append("    values = locals()")
+    lines.append("    return [{0}]".format(", ".join(
+        "values.get('{0}')".format(local_name(name)) for name in names)))
+    return "\n".join(lines) + "\n"
+
+
+def _localize(node):
+    if isinstance(node, Check):
+        if isinstance(node, LocalCheck):
+            return node
+        return LocalCheck(node.governor, node.name)
+    if isinstance(node, Delete):
+        if isinstance(node, LocalDelete):
+            return node
+        return LocalDelete(node.names)
+    local_class = _LOCAL_CLASSES.get(base_class(node))
+    if local_class is None or isinstance(node, local_class):
+        return node
+    if local_class is LocalVariable:
+        return LocalVariable(node.name)
+    if local_class is LocalAssign:
+        return LocalAssign(node.name, node.expression)
+    if local_class is LocalIf:
+        return LocalIf(node.condition, node.consequence, node.alternative)
+    if local_class is LocalWhile:
+        return LocalWhile(node.condition, node.body)
+    return local_class(node.left, node.right)
+
+
+_LOCAL_CLASSES = {
+    And: LocalAnd,
+    Assign: LocalAssign,
+    If: LocalIf,
+    Or: LocalOr,
+    Variable: LocalVariable,
+    While: LocalWhile,
+}
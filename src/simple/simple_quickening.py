@@ -0,0 +1,441 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_quickening.
+
+Self-specializing ("quickening") expression nodes for the tree walker,
+after the adaptive interpreter of CPython. quicken() replaces the
+arithmetic and comparison nodes of a program with adaptive variants.
+The first time an adaptive node is evaluated it observes its operands,
+rewrites its own class to a specialized variant and evaluates by that:
+
+- Add, Subtract and Multiply of an int variable and an int variable or
+  constant read the operands directly from the environment and box the
+  int result without calling number(). If an operand later turns out
+  not to be an int, the node falls back to the generic class for good.
+- LessThan and GreaterThan of a variable and a variable or constant
+  read the operands directly, whatever their type.
+
+Nodes of any other shape fall back to the generic class at once. A
+class change never alters what a node evaluates to, only how quickly.
+
+"""
+
+from .simple_expressions import Add, GreaterThan, LessThan, Multiply, \
+    Number, Subtract, Variable, FALSE, TRUE, number, SMALL_NUMBER_MAX, \
+    SMALL_NUMBER_MIN
+from .simple_trees import base_class, children, rebuild
+
+# The shared small-int Numbers, indexed from SMALL_NUMBER_MIN
+#
+_SMALL_NUMBERS = tuple(
+    number(value) for value in range(SMALL_NUMBER_MIN, SMALL_NUMBER_MAX + 1))
+
+
+class _Adaptive:
+
+    """Specializes the node's class, then evaluates by the new class."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Execute the expression in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            The value the generic node would produce, computed by the
+            class the node has specialized itself to.
+
+        Raises:
+            KeyError: an operand variable has no value. The node stays
+                unspecialized.
+
+        """
+        self.__class__ = self.specialization(environment)
+        return self.evaluate(environment)
+
+    def evaluate_value(self, environment):
+        """Execute the expression, producing a plain Python value.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            The value the generic node would produce, computed by the
+            class the node has specialized itself to.
+
+        Raises:
+            KeyError: an operand variable has no value. The node stays
+                unspecialized.
+
+        """
+        self.__class__ = self.specialization(environment)
+        return self.evaluate_value(environment)
+
+
+class _AdaptiveArithmetic(_Adaptive):
+
+    """Specializes an arithmetic node whose operands are ints."""
+
+    __slots__ = ()
+
+    def specialization(self, environment):
+        """Choose the class for the node from its observed operands.
+
+        Args:
+            environment: the environment the node is to be evaluated in.
+
+        Returns:
+            The int_variables class if both operands are variables
+            holding ints, the int_variable_constant class if the left is
+            a variable holding an int and the right an int constant, or
+            else the generic class.
+
+        """
+        left = self.left
+        right = self.right
+        if (type(left) is Variable
+                and type(environment[left.name].value) is int):
+            if (type(right) is Variable
+                    and type(environment[right.name].value) is int):
+                return self.int_variables
+            if type(right) is Number and type(right.value) is int:
+                return self.int_variable_constant
+        return self.generic
+
+
+class _AdaptiveComparison(_Adaptive):
+
+    """Specializes a comparison node whose left operand is a variable."""
+
+    __slots__ = ()
+
+    def specialization(self, environment):
+        """Choose the class for the node from its operands.
+
+        Args:
+            environment: the environment the node is to be evaluated in.
+
+        Returns:
+            The variables class if both operands are variables, the
+            variable_constant class if the left is a variable and the
+            right a constant, or else the generic class.
+
+        """
+        if type(self.left) is Variable:
+            if type(self.right) is Variable:
+                return self.variables
+            if type(self.right) is Number:
+                return self.variable_constant
+        return self.generic
+
+
+class AdaptiveAdd(_AdaptiveArithmetic, Add):
+
+    """Represents an addition that specializes itself when evaluated."""
+
+    __slots__ = ()
+
+
+class AddIntVariables(AdaptiveAdd):
+
+    """Represents an addition of two variables holding ints."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Add the variables, falling back unless both are ints."""
+        left = environment[self.left.name].value
+        right = environment[self.right.name].value
+        if type(left) is int and type(right) is int:
+            value = left + right
+            if SMALL_NUMBER_MIN <= value <= SMALL_NUMBER_MAX:
+                return _SMALL_NUMBERS[value - SMALL_NUMBER_MIN]
+            return Number(value)
+        self.__class__ = Add
+        return number(left + right)
+
+    def evaluate_value(self, environment):
+        """Add the variables, producing a plain Python value."""
+        return (
+            environment[self.left.name].value
+            + environment[self.right.name].value)
+
+
+class AddIntVariableConstant(AdaptiveAdd):
+
+    """Represents an addition of a variable holding an int and an int."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Add the constant, falling back unless the variable is an int."""
+        left = environment[self.left.name].value
+        if type(left) is int:
+            value = left + self.right.value
+            if SMALL_NUMBER_MIN <= value <= SMALL_NUMBER_MAX:
+                return _SMALL_NUMBERS[value - SMALL_NUMBER_MIN]
+            return Number(value)
+        self.__class__ = Add
+        return number(left + self.right.value)
+
+    def evaluate_value(self, environment):
+        """Add the constant, producing a plain Python value."""
+        return environment[self.left.name].value + self.right.value
+
+
+class AdaptiveGreaterThan(_AdaptiveComparison, GreaterThan):
+
+    """Represents a greater-than that specializes itself when evaluated."""
+
+    __slots__ = ()
+
+
+class GreaterThanVariables(AdaptiveGreaterThan):
+
+    """Represents a greater-than comparison of two variables."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Compare the variables, producing TRUE or FALSE."""
+        if (environment[self.left.name].value
+                > environment[self.right.name].value):
+            return TRUE
+        return FALSE
+
+    def evaluate_value(self, environment):
+        """Compare the variables, producing a bool."""
+        return (
+            environment[self.left.name].value
+            > environment[self.right.name].value)
+
+
+class GreaterThanVariableConstant(AdaptiveGreaterThan):
+
+    """Represents a greater-than comparison of a variable and a constant."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Compare the variable and constant, producing TRUE or FALSE."""
+        if environment[self.left.name].value > self.right.value:
+            return TRUE
+        return FALSE
+
+    def evaluate_value(self, environment):
+        """Compare the variable and constant, producing a bool."""
+        return environment[self.left.name].value > self.right.value
+
+
+class AdaptiveLessThan(_AdaptiveComparison, LessThan):
+
+    """Represents a less-than that specializes itself when evaluated."""
+
+    __slots__ = ()
+
+
+class LessThanVariables(AdaptiveLessThan):
+
+    """Represents a less-than comparison of two variables."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Compare the variables, producing TRUE or FALSE."""
+        if (environment[self.left.name].value
+                < environment[self.right.name].value):
+            return TRUE
+        return FALSE
+
+    def evaluate_value(self, environment):
+        """Compare the variables, producing a bool."""
+        return (
+            environment[self.left.name].value
+            < environment[self.right.name].value)
+
+
+class LessThanVariableConstant(AdaptiveLessThan):
+
+    """Represents a less-than comparison of a variable and a constant."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Compare the variable and constant, producing TRUE or FALSE."""
+        if environment[self.left.name].value < self.right.value:
+            return TRUE
+        return FALSE
+
+    def evaluate_value(self, environment):
+        """Compare the variable and constant, producing a bool."""
+        return environment[self.left.name].value < self.right.value
+
+
+class AdaptiveMultiply(_AdaptiveArithmetic, Multiply):
+
+    """Represents a multiplication that specializes itself when evaluated."""
+
+    __slots__ = ()
+
+
+class MultiplyIntVariables(AdaptiveMultiply):
+
+    """Represents a multiplication of two variables holding ints."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Multiply the variables, falling back unless both are ints."""
+        left = environment[self.left.name].value
+        right = environment[self.right.name].value
+        if type(left) is int and type(right) is int:
+            value = left * right
+            if SMALL_NUMBER_MIN <= value <= SMALL_NUMBER_MAX:
+                return _SMALL_NUMBERS[value - SMALL_NUMBER_MIN]
+            return Number(value)
+        self.__class__ = Multiply
+        return number(left * right)
+
+    def evaluate_value(self, environment):
+        """Multiply the variables, producing a plain Python value."""
+        return (
+            environment[self.left.name].value
+            * environment[self.right.name].value)
+
+
+class MultiplyIntVariableConstant(AdaptiveMultiply):
+
+    """Represents a multiplication of a variable holding an int by an int."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Multiply by the constant, falling back unless an int variable."""
+        left = environment[self.left.name].value
+        if type(left) is int:
+            value = left * self.right.value
+            if SMALL_NUMBER_MIN <= value <= SMALL_NUMBER_MAX:
+                return _SMALL_NUMBERS[value - SMALL_NUMBER_MIN]
+            return Number(value)
+        self.__class__ = Multiply
+        return number(left * self.right.value)
+
+    def evaluate_value(self, environment):
+        """Multiply by the constant, producing a plain Python value."""
+        return environment[self.left.name].value * self.right.value
+
+
+class AdaptiveSubtract(_AdaptiveArithmetic, Subtract):
+
+    """Represents a subtraction that specializes itself when evaluated."""
+
+    __slots__ = ()
+
+
+class SubtractIntVariables(AdaptiveSubtract):
+
+    """Represents a subtraction of two variables holding ints."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Subtract the variables, falling back unless both are ints."""
+        left = environment[self.left.name].value
+        right = environment[self.right.name].value
+        if type(left) is int and type(right) is int:
+            value = left - right
+            if SMALL_NUMBER_MIN <= value <= SMALL_NUMBER_MAX:
+                return _SMALL_NUMBERS[value - SMALL_NUMBER_MIN]
+            return Number(value)
+        self.__class__ = Subtract
+        return number(left - right)
+
+    def evaluate_value(self, environment):
+        """Subtract the variables, producing a plain Python value."""
+        return (
+            environment[self.left.name].value
+            - environment[self.right.name].value)
+
+
+class SubtractIntVariableConstant(AdaptiveSubtract):
+
+    """Represents a subtraction of an int from a variable holding an int."""
+
+    __slots__ = ()
+
+    def evaluate(self, environment):
+        """Subtract the constant, falling back unless an int variable."""
+        left = environment[self.left.name].value
+        if type(left) is int:
+            value = left - self.right.value
+            if SMALL_NUMBER_MIN <= value <= SMALL_NUMBER_MAX:
+                return _SMALL_NUMBERS[value - SMALL_NUMBER_MIN]
+            return Number(value)
+        self.__class__ = Subtract
+        return number(left - self.right.value)
+
+    def evaluate_value(self, environment):
+        """Subtract the constant, producing a plain Python value."""
+        return environment[self.left.name].value - self.right.value
+
+
+def quicken(statement):
+    """Produce a program whose nodes specialize themselves as they run.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple()) to be quickened. It is not changed.
+
+    Returns:
+        An equal statement in which every Add, Subtract, Multiply,
+        LessThan and GreaterThan node is replaced by its adaptive
+        variant. Nodes of specialized classes, such as the fused nodes
+        of simple_fusion, are kept as they are, children and all. The
+        statement is evaluated just as the original is.
+
+    """
+    def to_adaptive(node):
+        if type(node) is not base_class(node):
+            # A specialized node evaluates in its own way; rebuilding it
+            # around adaptive children would make it its base class again
+            #
+            return node
+        node = rebuild(node, [to_adaptive(child) for child in children(node)])
+        adaptive = _ADAPTIVE.get(type(node))
+        if adaptive is None:
+            return node
+        return adaptive(node.left, node.right)
+
+    return to_adaptive(statement)
+
+
+AdaptiveAdd.generic = Add
+AdaptiveAdd.int_variables = AddIntVariables
+AdaptiveAdd.int_variable_constant = AddIntVariableConstant
+AdaptiveGreaterThan.generic = GreaterThan
+AdaptiveGreaterThan.variables = GreaterThanVariables
+AdaptiveGreaterThan.variable_constant = GreaterThanVariableConstant
+AdaptiveLessThan.generic = LessThan
+AdaptiveLessThan.variables = LessThanVariables
+AdaptiveLessThan.variable_constant = LessThanVariableConstant
+AdaptiveMultiply.generic = Multiply
+AdaptiveMultiply.int_variables = MultiplyIntVariables
+AdaptiveMultiply.int_variable_constant = MultiplyIntVariableConstant
+AdaptiveSubtract.generic = Subtract
+AdaptiveSubtract.int_variables = SubtractIntVariables
+AdaptiveSubtract.int_variable_constant = SubtractIntVariableConstant
+
+_ADAPTIVE = {
+    Add: AdaptiveAdd,
+    GreaterThan: AdaptiveGreaterThan,
+    LessThan: AdaptiveLessThan,
+    Multiply: AdaptiveMultiply,
+    Subtract: AdaptiveSubtract,
+}
@@ -0,0 +1,314 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_recurrences.
+
+Accelerates counted loops that update their variables linearly.
+accelerate_loops() finds while loops of the form
+
+    while (i < limit) { ...assignments... }
+
+whose body is a run of assignments, each an affine function of the
+variables, built from +, - and multiplication by int constants, and
+which counts i up by a positive int step, such as the body of the phi
+example once simple_elimination has moved phi = x2 / x1 after it:
+
+    while (i < limit) { i = i + 1; x0 = x1; x1 = x2; x2 = x1 + x0; }
+
+One iteration of such a body maps the values of its variables, and the
+constant 1, through a matrix, so n iterations map them through the
+matrix raised to the power n, which takes O(log n) matrix products.
+The loop is replaced by an AcceleratedWhile, which computes the number
+of iterations left from the counter, the step and the limit, and jumps
+straight to the values the variables hold after them.
+
+The jump is exact only for ints, so an AcceleratedWhile takes it only if
+the variables the body reads and the limit all hold ints, and otherwise
+(with floats or bools, say, or a variable without a value) runs as the
+while loop it is. It also runs loops of fewer than
+MIN_ACCELERATED_TRIPS iterations, for which the matrix products cost
+more than they save. Either way the program produces the same
+environment, or raises the same error, as before.
+
+An AcceleratedWhile is a kind of While, so engines other than the tree
+walker, which compile loops for themselves, run it as a while loop. A
+loop instrumented by simple_limits.govern() is not accelerated, so that
+each of its iterations is counted.
+
+"""
+
+from .simple_expressions import Add, LessThan, Multiply, Number, Subtract, \
+    Variable, box
+from .simple_slots import box_frame
+from .simple_statements import Assign, Block, DoNothing, Sequence, While
+from .simple_trees import base_class, transform
+
+# The fewest iterations for which a loop jumps rather than iterates
+#
+MIN_ACCELERATED_TRIPS = 16
+
+
+class AcceleratedWhile(While):
+
+    """Represents a counted while loop with an affine body."""
+
+    __slots__ = ("counter", "step", "names", "inputs", "matrix")
+
+    def __init__(self, condition, body, counter, step, names, inputs,
+                 matrix):
+        """Constructor.
+
+        Args:
+            condition: the i < limit expression to be evaluated for
+                truth before each potential execution of the body.
+            body: the statement to be evaluated if the condition is
+                true.
+            counter: the name of the variable i.
+            step: the int by which the body increases i.
+            names: a tuple of the names of the variables the body reads
+                or assigns, in the order of the matrix's rows.
+            inputs: a set of the names of the variables whose values
+                the body reads before assigning them.
+            matrix: a tuple of rows of ints, one for each name and a
+                last one for the constant 1, mapping the values before
+                an iteration to those after it.
+
+        """
+        super().__init__(condition, body)
+        self.counter = counter
+        self.step = step
+        self.names = names
+        self.inputs = inputs
+        self.matrix = matrix
+
+    def evaluate(self, environment):
+        """Execute the statement in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            Returns the environment produced by repeated evaluations
+            of the body statement, as While.evaluate() would.
+
+        """
+        frame = self._jump(environment)
+        if frame is None:
+            return super().evaluate(environment)
+        return box_frame(environment, self.names, frame)
+
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values, such as a dictionary or a
+                MutableEnvironment. It is updated in place.
+
+        """
+        frame = self._jump(environment)
+        if frame is None:
+            super().execute(environment)
+            return
+        for name, value in zip(self.names, frame):
+            if value is not None:
+                environment[name] = box(value)
+
+    def _jump(self, environment):
+        """Compute the values the loop leaves, or None to iterate."""
+        try:
+            limit = self.condition.right.evaluate_value(environment)
+        except KeyError:
+            return None
+        if type(limit) is not int:
+            return None
+        get = environment.get
+        vector = []
+        for name in self.names:
+            value = get(name)
+            if value is not None and type(value.value) is int:
+                vector.append(value.value)
+            elif name in self.inputs:
+                return None
+            else:
+                # The body assigns the variable before reading it, so
+                # its value does not matter
+                #
+                vector.append(0)
+        vector.append(1)
+        start = vector[self.names.index(self.counter)]
+        trips = max(0, -((start - limit) // self.step))
+        if trips < MIN_ACCELERATED_TRIPS:
+            return None
+
+        # Raise the matrix to the power trips, by repeated squaring,
+        # applying the powers of two that make it up to the vector
+        #
+        power = self.matrix
+        while True:
+            if trips & 1:
+                vector = _apply(power, vector)
+            trips >>= 1
+            if not trips:
+                break
+            power = _multiply(power, power)
+        return [None if _is_identity(row, index) else value
+                for index, (row, value) in enumerate(zip(self.matrix, vector))
+                if index < len(self.names)]
+
+
+def accelerate_loops(statement):
+    """Replace the counted affine loops of a program by AcceleratedWhiles.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple(), pruned by eliminate_dead_code()) to be
+            optimized. It is not changed.
+
+    Returns:
+        An equivalent statement in which every while loop of the form
+        described in the module documentation is an AcceleratedWhile.
+
+    """
+    def accelerate(node):
+        if base_class(node) is While and not isinstance(
+                node, AcceleratedWhile):
+            return _accelerated(node) or node
+        return node
+
+    return transform(statement, accelerate)
+
+
+def _accelerated(loop):
+    """Produce an AcceleratedWhile for a loop, or None if it has none."""
+    condition = loop.condition
+    if base_class(condition) is not LessThan:
+        return None
+    counter, limit = condition.left, condition.right
+    if base_class(counter) is not Variable:
+        return None
+    if base_class(limit) is Number:
+        if type(limit.value) is not int:
+            return None
+    elif base_class(limit) is not Variable or limit.name == counter.name:
+        return None
+
+    # Follow the body symbolically, keeping each variable's value as an
+    # affine form: a dictionary mapping the names of the variables, as
+    # they were before the iteration, and None, for the constant 1, to
+    # their coefficients
+    #
+    forms = {}
+    inputs = set()
+    for statement in _flatten(loop.body):
+        if type(statement) is DoNothing:
+            continue
+        if base_class(statement) is not Assign:
+            return None
+        form = _affine(statement.expression, forms, inputs)
+        if form is None:
+            return None
+        forms[statement.name] = form
+    step = forms.get(counter.name, {}).get(None, 0)
+    if forms.get(counter.name) != {counter.name: 1, None: step} or step <= 0:
+        return None
+    if base_class(limit) is Variable and limit.name in forms:
+        return None
+
+    names = tuple(sorted(inputs | set(forms)))
+    matrix = tuple(
+        tuple(form.get(name, 0) for name in names) + (form.get(None, 0),)
+        for form in (forms.get(name, {name: 1}) for name in names)
+    ) + ((0,) * len(names) + (1,),)
+    return AcceleratedWhile(
+        condition, loop.body, counter.name, step, names, inputs, matrix)
+
+
+def _affine(node, forms, inputs):
+    """Produce the affine form of an expression, or None if it has none.
+
+    The names of the variables read before the body assigns them are
+    added to inputs, even where their terms cancel out, since their
+    values must still be ints.
+
+    """
+    cls = base_class(node)
+    if cls is Variable:
+        if node.name in forms:
+            return forms[node.name]
+        inputs.add(node.name)
+        return {node.name: 1}
+    if cls is Number:
+        if type(node.value) is not int:
+            return None
+        return {None: node.value} if node.value else {}
+    if cls is Add or cls is Subtract or cls is Multiply:
+        left = _affine(node.left, forms, inputs)
+        right = _affine(node.right, forms, inputs)
+        if left is None or right is None:
+            return None
+        if cls is Add:
+            return _combine(left, right, 1)
+        if cls is Subtract:
+            return _combine(left, right, -1)
+        if set(left) <= {None}:
+            return _scale(right, left.get(None, 0))
+        if set(right) <= {None}:
+            return _scale(left, right.get(None, 0))
+    return None
+
+
+def _apply(matrix, vector):
+    """Multiply a vector by a matrix."""
+    return [sum(coefficient * value
+                for coefficient, value in zip(row, vector) if coefficient)
+            for row in matrix]
+
+
+def _combine(left, right, sign):
+    """Produce left + sign * right of two affine forms."""
+    form = dict(left)
+    for name, coefficient in right.items():
+        form[name] = form.get(name, 0) + sign * coefficient
+    return {name: coefficient for name, coefficient in form.items()
+            if coefficient}
+
+
+def _flatten(node):
+    """Produce the top-level statements of nested blocks and sequences."""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        cls = base_class(node)
+        if cls is Block:
+            pending.extend(reversed(node.statements))
+        elif cls is Sequence:
+            pending.extend((node.second, node.first))
+        else:
+            yield node
+
+
+def _is_identity(row, index):
+    """Tell whether a row of the matrix leaves its variable unchanged."""
+    return all(coefficient == (position == index)
+               for position, coefficient in enumerate(row))
+
+
+def _multiply(left, right):
+    """Multiply two matrices."""
+    columns = list(zip(*right))
+    return tuple(
+        tuple(sum(coefficient * value
+                  for coefficient, value in zip(row, column) if coefficient)
+              for column in columns)
+        for row in left)
+
+
+def _scale(form, factor):
+    """Produce factor times an affine form."""
+    if not factor:
+        return {}
+    return {name: coefficient * factor for name, coefficient in form.items()}
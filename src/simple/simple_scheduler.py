@@ -0,0 +1,121 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_scheduler.
+
+Runs many programs side by side on one thread. Each program submitted
+to a Scheduler is held as a generator from statement_steps() (see
+simple_async), which carries its own environment and its place in the
+program and evaluates each statement with the node's own evaluate().
+The scheduler gives the programs turns in round-robin order, each turn
+running one program for a quantum of steps, so every program makes
+steady progress however long the others run. A program's priority
+multiplies its quantum, and Limits (see simple_limits) bound the
+resources it may use.
+
+The final environment of each program is delivered through a
+concurrent.futures.Future, to which callbacks may be attached.
+
+"""
+
+from collections import deque
+from concurrent.futures import Future
+
+from .simple_async import statement_steps
+
+
+class Scheduler:
+
+    """Represents a set of programs run in turn on one thread."""
+
+    def __init__(self, quantum=100):
+        """Constructor.
+
+        Args:
+            quantum: the number of steps (statements and while tests)
+                a program of priority 1 takes in each turn.
+
+        """
+        self.quantum = quantum
+        self._ready = deque()
+
+    def __len__(self):
+        """The number of programs waiting for a turn."""
+        return len(self._ready)
+
+    def run(self):
+        """Give the programs turns until every one has finished."""
+        step = self.step
+        while step():
+            pass
+
+    def step(self):
+        """Give the next program its turn.
+
+        A program whose future has been cancelled is dropped without a
+        turn. A program that finishes has its final environment set as
+        the result of its future; one that raises an error has the error
+        set as its exception instead. Either way, it leaves the
+        scheduler; otherwise, it waits for its next turn behind the
+        other programs.
+
+        Returns:
+            True if programs remain to be run; otherwise, False.
+
+        """
+        ready = self._ready
+        if not ready:
+            return False
+        program = ready.popleft()
+        run, future, steps = program
+        if not future.cancelled():
+            try:
+                for _ in range(steps):
+                    next(run)
+            except StopIteration as stop:
+                future.set_result(stop.value)
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                ready.append(program)
+        return bool(ready)
+
+    def submit(self, statement, environment, priority=1, callback=None,
+               limits=None):
+        """Add a program to be run.
+
+        Args:
+            statement: the statement (usually the product of
+                Program.to_simple()) to be run.
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment. It is not changed.
+            priority: a positive int; the program takes priority times
+                the quantum of steps in each turn.
+            callback: if not None, a function called with the future
+                once the program finishes.
+            limits: if not None, the Limits the program must keep to.
+                A program that exceeds one has the LimitExceeded error,
+                carrying its environment, set as the exception of its
+                future.
+
+        Returns:
+            A Future whose result is the environment that
+            statement.evaluate(environment) would return. Cancelling
+            the future removes the program at its next turn.
+
+        Raises:
+            ValueError: the priority is not positive.
+
+        """
+        if priority < 1:
+            raise ValueError("priority must be positive: {0!r}".format(
+                priority))
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(callback)
+        self._ready.append(
+            (statement_steps(statement, environment, limits), future,
+             self.quantum * priority))
+        return future
@@ -0,0 +1,334 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_slots.
+
+Resolves the variable names of a program to integer slots so that the
+program can be evaluated against a list-backed frame rather than a
+dictionary keyed by name. Conversion between the dictionary environment
+and the frame happens only when a resolved program is evaluated.
+
+The frame helpers assign_slots(), unbox_frame() and box_frame() are
+shared by the compiling engines, whose frames hold plain Python values
+rather than Number and Boolean objects. A Delete statement empties the
+slots of its variables, and box_frame() removes the deleted variables
+that are left without a value from the environment it produces.
+
+"""
+
+from .simple_environments import PersistentEnvironment
+from .simple_expressions import box, Variable
+from .simple_statements import Assign, Delete
+from .simple_trees import transform, walk
+
+
+class ResolvedProgram:
+
+    """Represents a program whose variables have been resolved to slots."""
+
+    def __init__(self, statement, names):
+        """Constructor.
+
+        Args:
+            statement: the slot-resolved statement to be evaluated.
+            names: a sequence of the variable names of the program; the
+                name at index i is the variable held in slot i.
+
+        """
+        self.statement = statement
+        self.names = tuple(names)
+        self.deleted = deleted_names(statement)
+
+    def __repr__(self):
+        """A guillemet-delimited string representation of the program."""
+        return "«{0}»".format(self)
+
+    def __str__(self):
+        """A string representation of the program."""
+        return "{0}".format(self.statement)
+
+    def evaluate(self, environment):
+        """Execute the program in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Always returns a new environment, updated to reflect the
+            evaluation of the program, as Statement.evaluate() would.
+
+        """
+        get = environment.get
+        frame = [get(name) for name in self.names]
+        self.statement.evaluate(frame)
+        new_environment = dict(environment)
+        for name, value in zip(self.names, frame):
+            if value is not None:
+                new_environment[name] = value
+            elif name in self.deleted:
+                new_environment.pop(name, None)
+        return new_environment
+
+
+class SlotAssign(Assign):
+
+    """Represents an assignment statement to a frame slot."""
+
+    __slots__ = ("slot",)
+
+    def __init__(self, name, slot, expression):
+        """Constructor.
+
+        Args:
+            name: variable name of the variable on the left hand side of
+                the assignment.
+            slot: the index of the variable in the frame.
+            expression: right hand side of the assignment.
+
+        """
+        super().__init__(name, expression)
+        self.slot = slot
+
+    def evaluate(self, frame):
+        """Execute the statement in the context of the frame.
+
+        Args:
+            frame: a list of variable values, indexed by slot. Slots of
+                variables that have no value hold None.
+
+        Returns:
+            Always returns the frame, updated in place to reflect the
+            evaluation of the statement. The frame is private to one
+            evaluation of a ResolvedProgram, so the update is not visible
+            to the caller.
+
+        """
+        frame[self.slot] = self.expression.evaluate(frame)
+        return frame
+
+
+class SlotDelete(Delete):
+
+    """Represents a statement that empties frame slots."""
+
+    __slots__ = ("slots",)
+
+    def __init__(self, names, slots):
+        """Constructor.
+
+        Args:
+            names: a sequence of the names of the variables to be
+                removed.
+            slots: a sequence of the indexes of those variables in the
+                frame.
+
+        """
+        super().__init__(names)
+        self.slots = tuple(slots)
+
+    def evaluate(self, frame):
+        """Execute the statement in the context of the frame.
+
+        Args:
+            frame: a list of variable values, indexed by slot. Slots of
+                variables that have no value hold None.
+
+        Returns:
+            Always returns the frame, updated in place so that the
+            variables have no value.
+
+        """
+        for slot in self.slots:
+            frame[slot] = None
+        return frame
+
+
+class SlotVariable(Variable):
+
+    """Represents a variable expression resolved to a frame slot."""
+
+    __slots__ = ("slot",)
+
+    def __init__(self, name, slot):
+        """Constructor.
+
+        Args:
+            name: the variable name.
+            slot: the index of the variable in the frame.
+
+        """
+        super().__init__(name)
+        self.slot = slot
+
+    def evaluate(self, frame):
+        """Produce the value of the variable.
+
+        Args:
+            frame: a list of variable values, indexed by slot. Slots of
+                variables that have no value hold None.
+
+        Returns:
+            The Number or Boolean value of the variable.
+
+        Raises:
+            KeyError: the variable has no value, as it would be missing
+                from an environment dictionary.
+
+        """
+        value = frame[self.slot]
+        if value is None:
+            raise KeyError(self.name)
+        return value
+
+    def evaluate_value(self, frame):
+        """Produce the plain Python value of the variable.
+
+        Args:
+            frame: a list of variable values, indexed by slot. Slots of
+                variables that have no value hold None.
+
+        Returns:
+            The int, float or bool value of the variable.
+
+        Raises:
+            KeyError: the variable has no value.
+
+        """
+        value = frame[self.slot]
+        if value is None:
+            raise KeyError(self.name)
+        return value.value
+
+
+def assign_slots(statement):
+    """Number the variables of a program.
+
+    Args:
+        statement: the statement whose variables are to be numbered.
+
+    Returns:
+        A dictionary mapping each variable name that appears in the
+        statement to its slot, numbered from zero in order of first
+        appearance.
+
+    """
+    slots = {}
+    for node in walk(statement):
+        if isinstance(node, (Assign, Variable)):
+            slots.setdefault(node.name, len(slots))
+        elif isinstance(node, Delete):
+            for name in node.names:
+                slots.setdefault(name, len(slots))
+    return slots
+
+
+def box_frame(environment, names, frame, deleted=()):
+    """Produce an environment updated from a frame of plain values.
+
+    Args:
+        environment: the dictionary or PersistentEnvironment that the
+            frame was loaded from by unbox_frame().
+        names: a sequence of the variable names, indexed by slot.
+        frame: a list of plain Python values, indexed by slot. Slots of
+            variables that have no value hold None.
+        deleted: a collection of the names of the variables the
+            program may delete, as produced by deleted_names(). Those
+            whose slots hold None are removed from the environment;
+            any other variable whose slot holds None is left as it was.
+
+    Returns:
+        A new environment of the same kind as environment. Values that
+        are unchanged keep their original Number or Boolean objects;
+        others are wrapped by box().
+
+    """
+    get = environment.get
+    updates = []
+    removals = []
+    for name, value in zip(names, frame):
+        if value is not None:
+            original = get(name)
+            if original is None or original.value is not value:
+                updates.append((name, box(value)))
+        elif name in deleted and name in environment:
+            removals.append(name)
+    if isinstance(environment, PersistentEnvironment):
+        for name, value in updates:
+            environment = environment.set(name, value)
+        for name in removals:
+            environment = environment.delete(name)
+        return environment
+    new_environment = dict(environment)
+    new_environment.update(updates)
+    for name in removals:
+        del new_environment[name]
+    return new_environment
+
+
+def deleted_names(statement):
+    """Find the variables a program may delete.
+
+    Args:
+        statement: the statement to be searched.
+
+    Returns:
+        A frozenset of the names of the variables of the Delete
+        statements in the statement.
+
+    """
+    return frozenset(
+        name for node in walk(statement) if isinstance(node, Delete)
+        for name in node.names)
+
+
+def resolve(statement):
+    """Resolve the variables of a program to frame slots.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple()) to be resolved.
+
+    Returns:
+        A ResolvedProgram holding a copy of the statement in which every
+        Variable, Assign and Delete refers to slots, numbered in order
+        of first appearance of each variable name.
+
+    """
+    slots = assign_slots(statement)
+
+    def to_slot(node):
+        if isinstance(node, Variable):
+            return SlotVariable(node.name, slots[node.name])
+        if isinstance(node, Assign):
+            return SlotAssign(node.name, slots[node.name], node.expression)
+        if isinstance(node, Delete):
+            return SlotDelete(
+                node.names, [slots[name] for name in node.names])
+        return node
+
+    return ResolvedProgram(transform(statement, to_slot), slots)
+
+
+def unbox_frame(environment, names):
+    """Produce a frame of plain values from an environment.
+
+    Args:
+        environment: a dictionary or PersistentEnvironment of variable
+            names (keys) and their Number or Boolean values.
+        names: a sequence of the variable names, indexed by slot.
+
+    Returns:
+        A list of the plain Python values of the named variables,
+        indexed by slot. Slots of variables missing from the environment
+        hold None.
+
+    """
+    get = environment.get
+    frame = []
+    for name in names:
+        value = get(name)
+        frame.append(None if value is None else value.value)
+    return frame
@@ -5,13 +5,16 @@
 
 """Module simple.simple_expressions."""
 
-from .simple_expressions import Boolean
+from .simple_environments import PersistentEnvironment
+from .simple_expressions import TRUE
 
 
 class Assign:
 
     """Represents an assignment statement."""
 
+    __slots__ = ("name", "expression")
+
     def __init__(self, name, expression):
         """Constructor.
 
@@ -68,18 +71,32 @@ class Assign:
 
         Args:
             environment: a dictionary of variable names (keys) and their
-                values.
+                values, or a PersistentEnvironment.
 
         Returns:
             Always returns an environment, updated to reflect the evaluation
-            of the statement.
+            of the statement. A dictionary environment is copied; a
+            PersistentEnvironment shares structure with its update.
 
         """
+        value = self.expression.evaluate(environment)
+        if isinstance(environment, PersistentEnvironment):
+            return environment.set(self.name, value)
         new_environment = environment.copy()
-        new_environment.update(
-            dict([(self.name, self.expression.evaluate(environment))]))
+        new_environment[self.name] = value
         return new_environment
 
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values, such as a dictionary or a
+                MutableEnvironment. It is updated in place.
+
+        """
+        environment[self.name] = self.expression.evaluate(environment)
+
     def to_python(self, indentation):
         """Produce the statement translated to Python.
 
@@ -97,10 +114,112 @@ class Assign:
             self.name, self.expression.to_python(indentation))
 
 
+class Block:
+
+    """Represents a block of any number of statements."""
+
+    __slots__ = ("statements",)
+
+    def __init__(self, statements):
+        """Constructor.
+
+        Args:
+            statements: an iterable of the statements to be evaluated,
+                in order.
+
+        """
+        self.statements = tuple(statements)
+
+    def __eq__(self, other_statement):
+        """Equality relation.
+
+        Args:
+            other_statement: A statement to be compared against.
+
+        Returns:
+            True if other_statement is also a Block object and has the
+            same statements as this object.
+
+        """
+        if not isinstance(other_statement, Block):
+            return False
+        if self.statements != other_statement.statements:
+            return False
+        return True
+
+    def __ne__(self, other_statement):
+        """Inequality relation.
+
+        Args:
+            other_statement: A statement to be compared against.
+
+        Returns:
+            True if other_statement is not the same as this object.
+
+        """
+        return not self.__eq__(other_statement)
+
+    def __repr__(self):
+        """A guillemet-delimited string representation of the statement."""
+        return "«{0}»".format(self)
+
+    def __str__(self):
+        """A string representation of the statement."""
+        return " ".join(str(statement) for statement in self.statements)
+
+    def evaluate(self, environment):
+        """Execute the expression in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values.
+
+        Returns:
+            Returns the environment produced by evaluating each of the
+            statements in turn.
+
+        """
+        for statement in self.statements:
+            environment = statement.evaluate(environment)
+        return environment
+
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values, such as a dictionary or a
+                MutableEnvironment. It is updated in place.
+
+        """
+        for statement in self.statements:
+            statement.execute(environment)
+
+    def to_python(self, indentation):
+        """Produce the statement translated to Python.
+
+        Args:
+            indentation: The current indentation level (in count of
+                4-character chunks).
+
+        Returns:
+            A string containing Python code representing the
+            statement.
+
+        """
+        if not self.statements:
+            return "{0}pass".format("    " * indentation)
+        return "\n".join(
+            statement.to_python(indentation)
+            for statement in self.statements)
+
+
 class DoNothing:
 
     """Represents an null statement."""
 
+    __slots__ = ()
+
     def __eq__(self, other_statement):
         """Equality relation.
 
@@ -146,6 +265,16 @@ class DoNothing:
         """
         return environment
 
+    def execute(self, environment):
+        """Execute the statement, leaving the environment unmodified.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values, such as a dictionary or a
+                MutableEnvironment. It is updated in place.
+
+        """
+
     def to_python(self, indentation):
         """Produce the statement translated to Python.
 
@@ -161,10 +290,110 @@ class DoNothing:
         return "{0}pass".format("    " * indentation)
 
 
+class Delete(DoNothing):
+
+    """Represents a statement that removes variables from the environment.
+
+    The language has no such statement; rewrite passes place one after
+    the last use of the temporaries they introduce. It is a kind of
+    DoNothing, as the Check of simple_limits is, so that passes which
+    do not know it leave it in place. The compiling engines assume that
+    a deleted variable is not read again until it is next assigned.
+
+    """
+
+    __slots__ = ("names",)
+
+    def __init__(self, names):
+        """Constructor.
+
+        Args:
+            names: a sequence of the names of the variables to be
+                removed.
+
+        """
+        self.names = tuple(names)
+
+    def __eq__(self, other_statement):
+        """Equality relation.
+
+        Args:
+            other_statement: A statement to be compared against.
+
+        Returns:
+            True if other_statement is also a Delete object and removes
+            the same variables as this object.
+
+        """
+        if not isinstance(other_statement, Delete):
+            return False
+        return self.names == other_statement.names
+
+    def __str__(self):
+        """A string representation of the statement."""
+        return "delete {0};".format(", ".join(self.names))
+
+    def evaluate(self, environment):
+        """Execute the statement in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            Always returns an environment without the variables. A
+            dictionary environment is copied; a PersistentEnvironment
+            shares structure with its update. Variables that have no
+            value are ignored.
+
+        """
+        if isinstance(environment, PersistentEnvironment):
+            for name in self.names:
+                if name in environment:
+                    environment = environment.delete(name)
+            return environment
+        new_environment = environment.copy()
+        for name in self.names:
+            new_environment.pop(name, None)
+        return new_environment
+
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values, such as a dictionary or a
+                MutableEnvironment. It is updated in place.
+
+        """
+        for name in self.names:
+            environment.pop(name, None)
+
+    def to_python(self, indentation):
+        """Produce the statement translated to Python.
+
+        Args:
+            indentation: The current indentation level (in count of
+                4-character chunks).
+
+        Returns:
+            A string containing Python code representing the
+            statement.
+
+        """
+        if not self.names:
+            return super().to_python(indentation)
+        return "\n".join(
+            "{0}e.pop('{1}', None)".format("    " * indentation, name)
+            for name in self.names)
+
+
 class If:
 
     """Represents an if statement."""
 
+    __slots__ = ("condition", "consequence", "alternative")
+
     def __init__(self, condition, consequence, alternative):
         """Constructor.
 
@@ -235,12 +464,25 @@ class If:
             from the evaluated alternative.
 
         """
-        c = self.condition.evaluate(environment)
-        if c == Boolean(True):
+        if self.condition.evaluate(environment) is TRUE:
             return self.consequence.evaluate(environment)
         else:
             return self.alternative.evaluate(environment)
 
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values, such as a dictionary or a
+                MutableEnvironment. It is updated in place.
+
+        """
+        if self.condition.evaluate(environment) is TRUE:
+            self.consequence.execute(environment)
+        else:
+            self.alternative.execute(environment)
+
     def to_python(self, indentation):
         """Produce the statement translated to Python.
 
@@ -264,6 +506,8 @@ class Sequence:
 
     """Represents a sequence of two statements."""
 
+    __slots__ = ("first", "second")
+
     def __init__(self, first, second):
         """Constructor.
 
@@ -325,8 +569,31 @@ class Sequence:
             Returns the environment produced by evaluated the first statement
             and then the second statement.
 
+        Right-nested chains of Sequence objects (as produced by the parser)
+        are walked in a loop rather than by recursion, so the Python stack
+        depth does not grow with the length of the chain.
+
+        """
+        statement = self
+        while isinstance(statement, Sequence):
+            environment = statement.first.evaluate(environment)
+            statement = statement.second
+        return statement.evaluate(environment)
+
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values, such as a dictionary or a
+                MutableEnvironment. It is updated in place.
+
         """
-        return self.second.evaluate(self.first.evaluate(environment))
+        statement = self
+        while isinstance(statement, Sequence):
+            statement.first.execute(environment)
+            statement = statement.second
+        statement.execute(environment)
 
     def to_python(self, indentation):
         """Produce the statement translated to Python.
@@ -349,6 +616,8 @@ class While:
 
     """Represents a while statement."""
 
+    __slots__ = ("condition", "body")
+
     def __init__(self, condition, body):
         """Constructor.
 
@@ -412,12 +681,29 @@ class While:
             Returns the environment produced by repeated evaluations
             of the body statement.
 
+        The body is evaluated in a loop, so the Python stack depth does
+        not grow with the number of iterations.
+
         """
-        c = self.condition.evaluate(environment)
-        if c == Boolean(True):
-            return self.evaluate(self.body.evaluate(environment))
-        else:
-            return environment
+        condition = self.condition
+        body = self.body
+        while condition.evaluate(environment) is TRUE:
+            environment = body.evaluate(environment)
+        return environment
+
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values, such as a dictionary or a
+                MutableEnvironment. It is updated in place.
+
+        """
+        condition = self.condition
+        body = self.body
+        while condition.evaluate(environment) is TRUE:
+            body.execute(environment)
 
     def to_python(self, indentation):
         """Produce the statement translated to Python.
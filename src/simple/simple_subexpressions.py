@@ -0,0 +1,300 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_subexpressions.
+
+Common subexpression elimination. eliminate_common_subexpressions()
+finds the operations a basic block, a run of consecutive assignments,
+computes more than once with the same operands, and computes each only
+once:
+
+- an operation whose value a variable still holds, because it was the
+  whole expression of an earlier assignment, is replaced by a read of
+  that variable, so that a = x1 + x0; b = x1 + x0 becomes a = x1 + x0;
+  b = a;
+- any other operation computed more than once is assigned to a
+  temporary just before the first assignment that needs it, and every
+  computation of it is replaced by a read of the temporary.
+
+Expressions are hash-consed: each operation is numbered by its class and
+the numbers of its operands, and each variable by its name and the
+number of assignments to it so far, so that an operation on a variable
+is a different one after the variable is reassigned. Constants are
+numbered by their exact type and representation, so that 1, 1.0 and
+True are never confused, as they would be by the expressions' own
+equality. The right operand of an and or an or, which is not always
+evaluated, may read a value computed earlier, but is never itself
+computed ahead of time.
+
+Temporaries are variables named TEMPORARY_PREFIX followed by a number,
+avoiding the names the program uses, and the numbers start again in
+each basic block. A Delete at the end of the block removes them, so
+that they neither appear in the environment the program produces nor
+count against a limit on its variables. A temporary may still share its
+name with a variable of the environment that the program does not use,
+which it then removes, so names with the prefix should be kept for the
+pass's use. Otherwise a program produces the same environment as
+before. It raises an error if and only if the original does, but since
+a temporary is computed before the assignment that needs it, an
+assignment that could raise more than one error, such as KeyErrors for
+two variables without values, may raise a different one of them.
+
+"""
+
+from .simple_elimination import assigned_names, read_names
+from .simple_expressions import And, Boolean, Number, Or, Variable
+from .simple_statements import Assign, Block, Delete, DoNothing, If, \
+    Sequence, While
+from .simple_trees import base_class, children, dispatch, rebuild
+
+# The prefix of the names of the temporaries
+#
+TEMPORARY_PREFIX = "_cse"
+
+
+def eliminate_common_subexpressions(statement):
+    """Compute the repeated operations of a program once.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple()) to be optimized. It is not changed.
+
+    Returns:
+        An equivalent statement, as described in the module
+        documentation. Nodes the pass does not change are shared with
+        the original.
+
+    """
+    return _statement(statement, read_names(statement) |
+                      assigned_names(statement))
+
+
+def temporaries(used):
+    """Produce names for temporaries.
+
+    Args:
+        used: a collection of the names a program uses.
+
+    Returns:
+        A generator of the names TEMPORARY_PREFIX followed by 0, 1, 2
+        and so on, skipping the used names.
+
+    """
+    number = 0
+    while True:
+        name = "{0}{1}".format(TEMPORARY_PREFIX, number)
+        number += 1
+        if name not in used:
+            yield name
+
+
+def _statement(node, used):
+    """Optimize a statement, avoiding the used names for temporaries."""
+    return dispatch(_STATEMENTS, node)(node, used)
+
+
+def _if(node, used):
+    return rebuild(node, [
+        node.condition,
+        _statement(node.consequence, used),
+        _statement(node.alternative, used)])
+
+
+def _statements(node, used):
+    original = list(_flatten(node))
+    statements = []
+    run = []
+    for statement in original:
+        if base_class(statement) is Assign:
+            run.append(statement)
+            continue
+        statements.extend(_BasicBlock(run, used).statements)
+        run = []
+        statements.append(_statement(statement, used))
+    statements.extend(_BasicBlock(run, used).statements)
+    if len(statements) == len(original) and all(
+            new is old for new, old in zip(statements, original)):
+        return node
+    if len(statements) == 1:
+        return statements[0]
+    return Block(statements)
+
+
+def _while(node, used):
+    return rebuild(node, [node.condition, _statement(node.body, used)])
+
+
+class _BasicBlock:
+
+    """Eliminates the common subexpressions of a run of assignments.
+
+    The statements produced end with a Delete of the temporaries they
+    assign, if any.
+
+    """
+
+    def __init__(self, assignments, used):
+        """Constructor.
+
+        Args:
+            assignments: the assignments to be optimized, in order.
+            used: the names the program uses, which temporaries avoid.
+
+        """
+        self.counts = {}
+        self.created = []
+        self.held = {}
+        self.numbering = None
+        self.statements = []
+        self.temporaries = temporaries(used)
+        self.versions = {}
+
+        # Number every node of every expression, then count how often
+        # each operation is computed unconditionally. A repeat of an
+        # operation already counted repeats its operands too, which are
+        # not counted again, so that only the outermost repeated
+        # operation is kept.
+        #
+        table = {}
+        numberings = []
+        for assignment in assignments:
+            numbering = {}
+            _number(assignment.expression, self.versions, table, numbering)
+            numberings.append(numbering)
+            self._assigned(assignment.name)
+        for assignment, numbering in zip(assignments, numberings):
+            self._count(assignment.expression, numbering)
+
+        self.versions = {}
+        for assignment, numbering in zip(assignments, numberings):
+            self.numbering = numbering
+            self._assign(assignment)
+        if self.created:
+            self.statements.append(Delete(self.created))
+
+    def _assign(self, assignment):
+        """Rewrite an assignment, after any temporaries it needs."""
+        expression = assignment.expression
+        number = self.numbering[id(expression)]
+        if _is_operation(expression) and self._holder(number) is None:
+            # The whole expression is computed here, and the variable
+            # assigned holds it afterwards, so it needs no temporary
+            #
+            cls = base_class(expression)
+            expression = rebuild(expression, [
+                self._rewrite(child, cls, index)
+                for index, child in enumerate(children(expression))])
+        else:
+            expression = self._rewrite(expression)
+        self._assigned(assignment.name)
+        if (_is_operation(assignment.expression)
+                and self._holder(number) is None):
+            self._hold(number, assignment.name)
+        self.statements.append(rebuild(assignment, [expression]))
+
+    def _assigned(self, name):
+        """Count an assignment to a variable."""
+        self.versions[name] = self.versions.get(name, 0) + 1
+
+    def _count(self, node, numbering):
+        """Count the unconditional computations of a node's operations."""
+        if not _is_operation(node):
+            return
+        number = numbering[id(node)]
+        self.counts[number] = self.counts.get(number, 0) + 1
+        if self.counts[number] > 1:
+            return
+        operands = children(node)
+        if base_class(node) in (And, Or):
+            operands = operands[:1]
+        for child in operands:
+            self._count(child, numbering)
+
+    def _hold(self, number, name):
+        """Record that a variable, as last assigned, holds an operation."""
+        self.held[number] = (name, self.versions[name])
+
+    def _holder(self, number):
+        """Produce a read of the variable holding an operation, if any."""
+        if number in self.held:
+            name, version = self.held[number]
+            if self.versions.get(name, 0) == version:
+                return Variable(name)
+        return None
+
+    def _rewrite(self, node, parent=None, index=0):
+        """Replace the computations of a node's operations by reads.
+
+        The node is the index-th operand of an operation of the parent
+        class, or a whole expression if the parent is None.
+
+        """
+        if not _is_operation(node):
+            return node
+        number = self.numbering[id(node)]
+        holder = self._holder(number)
+        if holder is not None:
+            return holder
+        if index == 1 and parent in (And, Or):
+            # A conditional operand may only read values, and so may
+            # its own operands
+            #
+            return rebuild(node, [
+                self._rewrite(child, And, 1) for child in children(node)])
+        cls = base_class(node)
+        node = rebuild(node, [
+            self._rewrite(child, cls, position)
+            for position, child in enumerate(children(node))])
+        if self.counts.get(number, 0) < 2:
+            return node
+        name = next(self.temporaries)
+        self.created.append(name)
+        self.statements.append(Assign(name, node))
+        self._assigned(name)
+        self._hold(number, name)
+        return Variable(name)
+
+
+def _flatten(node):
+    """Produce the top-level statements of nested blocks and sequences."""
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        cls = base_class(node)
+        if cls is Block:
+            pending.extend(reversed(node.statements))
+        elif cls is Sequence:
+            pending.extend((node.second, node.first))
+        else:
+            yield node
+
+
+def _is_operation(node):
+    return base_class(node) not in (Boolean, Number, Variable)
+
+
+def _number(node, versions, table, numbering):
+    """Number a node and its children by their hash-consed structure."""
+    cls = base_class(node)
+    if cls is Variable:
+        key = (Variable, node.name, versions.get(node.name, 0))
+    elif cls is Boolean or cls is Number:
+        key = (cls, type(node.value), repr(node.value))
+    else:
+        key = (cls,) + tuple(
+            _number(child, versions, table, numbering)
+            for child in children(node))
+    number = numbering[id(node)] = table.setdefault(key, len(table))
+    return number
+
+
+_STATEMENTS = {
+    Assign: _statements,
+    Block: _statements,
+    DoNothing: lambda node, used: node,
+    If: _if,
+    Sequence: _statements,
+    While: _while,
+}
@@ -0,0 +1,314 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_tracing.
+
+Compiles hot while loops as the tree walker runs them. trace_loops()
+replaces the while statements of a program with TracingWhile nodes,
+which count the iterations they interpret. Once a loop has run
+HOT_LOOP iterations, it records the types of the values its variables
+hold and translates itself, as simple_python does, to a Python function
+specialized for those types. The function runs the remaining iterations
+with the variables in Python locals.
+
+At the top of every compiled iteration a guard checks that the
+variables still hold values of the recorded types. When a guard fails,
+the function hands its variables back and the loop carries on in the
+interpreter, where it may turn hot again and be compiled for the new
+types. Each loop keeps at most MAX_TRACES compiled functions.
+
+A loop is not compiled for types under which a variable it may read
+before assigning it has no value. Those types are remembered, and the
+loop runs in the interpreter for the rest of the run, which raises a
+KeyError naming the variable if the loop does read it. Whenever no
+compiled function can be run, the loop stays in the interpreter for
+the rest of the run rather than turning hot again.
+
+Short loops are never compiled and cost only the iteration count.
+Checks placed by simple_limits.govern() are compiled to calls of the
+governor, so a compiled loop is held to the same limits.
+
+"""
+
+from .simple_bytecode import exposed_reads
+from .simple_expressions import box, Number, TRUE, Variable
+from .simple_limits import hooks, LimitExceeded
+from .simple_python import fold_condition, is_boolean, local_name, \
+    localize, traced_frame
+from .simple_slots import assign_slots, box_frame, deleted_names, \
+    unbox_frame
+from .simple_statements import While
+from .simple_trees import transform
+
+# The number of interpreted iterations after which a loop is compiled
+#
+HOT_LOOP = 100
+
+# The number of type-specialized functions kept for each loop
+#
+MAX_TRACES = 4
+
+
+class TracingWhile(While):
+
+    """Represents a while statement that compiles itself once hot."""
+
+    __slots__ = (
+        "deleted", "exposed", "failed", "iterations", "names", "traces")
+
+    def __init__(self, condition, body):
+        """Constructor.
+
+        Args:
+            condition: the expression to be evaluated for truth before
+                each potential execution of the body.
+            body: the statement to be evaluated if the condition
+                is true.
+
+        """
+        super().__init__(condition, body)
+        self.iterations = 0
+        self.names = tuple(assign_slots(self))
+        slots = {name: slot for slot, name in enumerate(self.names)}
+        self.exposed = tuple(
+            slots[name] for name in exposed_reads(self))
+        self.deleted = deleted_names(self)
+        self.failed = set()
+        self.traces = {}
+
+    def evaluate(self, environment):
+        """Execute the statement in the context of the environment.
+
+        Args:
+            environment: a dictionary of variable names (keys) and their
+                values, or a PersistentEnvironment.
+
+        Returns:
+            Returns the environment produced by repeated evaluations
+            of the body statement, as While.evaluate() would.
+
+        """
+        condition = self.condition
+        body = self.body
+        tracing = True
+        while condition.evaluate(environment) is TRUE:
+            environment = body.evaluate(environment)
+            if not tracing:
+                continue
+            self.iterations += 1
+            if self.iterations >= HOT_LOOP:
+                frame, finished = self._run_trace(environment)
+                if frame is None:
+                    tracing = False
+                    continue
+                environment = box_frame(
+                    environment, self.names, frame, self.deleted)
+                if finished:
+                    break
+        return environment
+
+    def execute(self, environment):
+        """Execute the statement, updating the environment in place.
+
+        Args:
+            environment: a mutable mapping of variable names (keys) and
+                their values, such as a dictionary or a
+                MutableEnvironment. It is updated in place.
+
+        """
+        condition = self.condition
+        body = self.body
+        tracing = True
+        while condition.evaluate(environment) is TRUE:
+            body.execute(environment)
+            if not tracing:
+                continue
+            self.iterations += 1
+            if self.iterations >= HOT_LOOP:
+                frame, finished = self._run_trace(environment)
+                if frame is None:
+                    tracing = False
+                    continue
+                _store_frame(environment, self.names, frame, self.deleted)
+                if finished:
+                    break
+
+    def _run_trace(self, environment):
+        """Run the remaining iterations through a compiled function.
+
+        Args:
+            environment: the environment at the top of an iteration.
+
+        Returns:
+            A tuple of the updated frame and whether the loop has ended.
+            The frame is None if no function was run, in which case the
+            environment is unchanged and the interpreter runs the rest
+            of the loop. If the loop has not ended, a guard failed and
+            the interpreter resumes at the top of an iteration. Either
+            way, the iteration count starts over, so the loop must turn
+            hot again before the next attempt.
+
+        Raises:
+            LimitExceeded: a Check found a limit exceeded. The error
+                carries the environment as it was.
+
+        """
+        self.iterations = 0
+        frame = unbox_frame(environment, self.names)
+        types = tuple(None if value is None else type(value)
+                      for value in frame)
+        run = self.traces.get(types)
+        if run is None:
+            if types in self.failed or len(self.traces) >= MAX_TRACES:
+                return None, False
+            if any(types[slot] is None for slot in self.exposed):
+                # The loop may read a variable that has no value; leave
+                # it to the interpreter, which names the variable if so
+                #
+                self.failed.add(types)
+                return None, False
+            run = self.traces[types] = compile_trace(self, self.names, types)
+        try:
+            return run(frame)
+        except LimitExceeded as error:
+            frame = traced_frame(error, run.__code__, self.names)
+            error.environment = box_frame(
+                environment, self.names, frame, self.deleted)
+            raise
+
+
+def compile_trace(loop, names, types):
+    """Compile a while loop to a function specialized for some types.
+
+    Args:
+        loop: the while statement to be compiled.
+        names: a sequence of the variable names of the loop, indexed by
+            slot.
+        types: a sequence of the types of the values of the variables,
+            indexed by slot. A variable with no value has type None.
+
+    Returns:
+        A function that takes a frame of plain values, as produced by
+        unbox_frame(), and runs the loop from the top of an iteration.
+        It returns a tuple of the updated frame and True once the loop
+        ends, or False if a variable no longer holds a value of the
+        recorded type. It raises UnboundLocalError if the loop reads a
+        variable that has no value, so it is run only from frames in
+        which every variable the loop may read before assigning it has
+        one. A governed function settles its lease however it returns.
+
+    """
+    namespace = hooks(loop)
+    namespace.update(("T{0}".format(slot), kind)
+                     for slot, kind in enumerate(types))
+    exec(compile(
+        trace_source(loop, names, types), "<simple>", "exec"), namespace)
+    return namespace["run"]
+
+
+def trace_loops(statement):
+    """Prepare a program to compile its while loops once they are hot.
+
+    Args:
+        statement: the statement (usually the product of
+            Program.to_simple()) to be prepared.
+
+    Returns:
+        A copy of the statement in which every while statement is a
+        TracingWhile.
+
+    """
+    def to_tracing(node):
+        if isinstance(node, While) and not isinstance(node, TracingWhile):
+            return TracingWhile(node.condition, node.body)
+        return node
+
+    return transform(statement, to_tracing)
+
+
+def trace_source(loop, names, types):
+    """Produce the source of the function that runs a while loop.
+
+    Args:
+        loop: the while statement to be translated.
+        names: a sequence of the variable names of the loop, indexed by
+            slot.
+        types: a sequence of the types of the values of the variables,
+            indexed by slot. A variable with no value has type None.
+
+    Returns:
+        The source of run(frame), as described by compile_trace(). The
+        guards refer to the recorded type of the variable in slot i as
+        the global Ti, which compile_trace() defines.
+
+    """
+    governed = bool(hooks(loop))
+    loop = localize(loop)
+    lines = ["def run(frame):"]
+    locals_ = ", ".join(local_name(name) for name in names)
+    values = "[{0}]".format(", ".join(
+        "values.get('{0}')".format(local_name(name)) for name in names))
+    lines.append("    {0}, = frame".format(locals_))
+    for name, kind in zip(names, types):
+        if kind is None:
+            lines.append("    del {0}".format(local_name(name)))
+    guards = ["type({0}) is not T{1}".format(local_name(name), slot)
+              for slot, (name, kind) in enumerate(zip(names, types))
+              if kind is not None]
+
+    # A governed function settles its lease in a finally clause, so
+    # that the iterations it leased but did not take are handed back
+    # however it returns
+    #
+    indent = "    "
+    if governed:
+        lines.append("    countdown = 0")
+        lines.append("    try:")
+        indent = "        "
+    lines.append(indent + "while True:")
+    if guards:
+        lines.append(indent + "    if {0}:".format(" or ".join(guards)))
+        lines.append(indent + "        values = locals()")
+        lines.append(indent + "        return {0}, False".format(values))
+    lines.append(indent + "    if not {0}:".format(
+        _condition(loop.condition, dict(zip(names, types)))))
+    lines.append(indent + "        break")
+    lines.append(loop.body.to_python(len(indent) // 4 + 1))
+    if governed:
+        lines.append("    finally:")
+        lines.append("        settle(countdown)")
+    lines.append("    values = locals()")
+    lines.append("    return {0}, True".format(values))
+    return "\n".join(lines) + "\n"
+
+
+def _condition(expression, types):
+    # The guards have just checked the types, so a variable is known to
+    # be True only if it holds a bool
+    #
+    expression = fold_condition(expression)
+    if isinstance(expression, Number):
+        return "False"
+    code = expression.to_python(2)
+    if is_boolean(expression):
+        return "({0})".format(code)
+    if isinstance(expression, Variable):
+        kind = types[expression.name]
+        if kind is bool:
+            return code
+        if kind is not None:
+            return "False"
+    return "(({0}) is True)".format(code)
+
+
+def _store_frame(environment, names, frame, deleted):
+    get = environment.get
+    for name, value in zip(names, frame):
+        if value is not None:
+            original = get(name)
+            if original is None or original.value is not value:
+                environment[name] = box(value)
+        elif name in deleted:
+            environment.pop(name, None)
@@ -0,0 +1,177 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Module simple.simple_trees.
+
+Generic helpers for walking and rebuilding trees of simple expressions
+and statements. Passes that translate or rewrite a program use these
+rather than each knowing the attributes of every node class.
+
+"""
+
+from .simple_expressions import Add, And, Boolean, Divide, GreaterThan, \
+    LessThan, Multiply, Not, Number, Or, Subtract, Variable
+from .simple_statements import Assign, Block, DoNothing, If, Sequence, While
+
+BINARY_EXPRESSIONS = (
+    Add, And, Divide, GreaterThan, LessThan, Multiply, Or, Subtract)
+LEAVES = (Boolean, DoNothing, Number, Variable)
+
+
+def base_class(node):
+    """Produce the language-level class of a node.
+
+    Args:
+        node: an expression or statement object.
+
+    Returns:
+        The class from simple_expressions or simple_statements that the
+        node is an instance of. Specialized subclasses (such as nodes
+        produced by a rewrite pass) report the class they specialize.
+
+    """
+    for cls in type(node).__mro__:
+        if cls in _CHILDREN:
+            return cls
+    raise TypeError("not a simple node: {0!r}".format(node))
+
+
+def children(node):
+    """Produce the child nodes of a node.
+
+    Args:
+        node: an expression or statement object.
+
+    Returns:
+        A tuple of the expressions and statements directly contained
+        by the node, in evaluation order.
+
+    """
+    return _CHILDREN[base_class(node)](node)
+
+
+def dispatch(table, node):
+    """Look up the entry for a node in a table keyed by node class.
+
+    Args:
+        table: a dictionary whose keys are node classes.
+        node: an expression or statement object.
+
+    Returns:
+        The entry for the most specific class of the node that appears
+        in the table.
+
+    """
+    entry = table.get(type(node))
+    if entry is not None:
+        return entry
+    for cls in type(node).__mro__:
+        if cls in table:
+            return table[cls]
+    raise TypeError("no entry for node: {0!r}".format(node))
+
+
+def rebuild(node, new_children):
+    """Produce a node like the given one but with different children.
+
+    Args:
+        node: an expression or statement object.
+        new_children: a sequence of replacement children, in the
+            order produced by children().
+
+    Returns:
+        The node itself if every child is unchanged; otherwise, a new
+        node of the node's base class holding the new children.
+
+    """
+    old_children = children(node)
+    if len(old_children) == len(new_children) and all(
+            old is new for old, new in zip(old_children, new_children)):
+        return node
+    return _REBUILD[base_class(node)](node, new_children)
+
+
+def transform(node, function):
+    """Rebuild a tree from the bottom up.
+
+    Args:
+        node: the root expression or statement of the tree.
+        function: called with each node after its children have been
+            transformed; returns the node to use in its place.
+
+    Returns:
+        The transformed root node.
+
+    """
+    new_children = [transform(child, function) for child in children(node)]
+    return function(rebuild(node, new_children))
+
+
+def walk(node):
+    """Produce every node in a tree.
+
+    Args:
+        node: the root expression or statement of the tree.
+
+    Returns:
+        A generator of the nodes of the tree in pre-order (each node
+        before its children, children in evaluation order).
+
+    """
+    pending = [node]
+    while pending:
+        node = pending.pop()
+        yield node
+        pending.extend(reversed(children(node)))
+
+
+def _binary_children(node):
+    return (node.left, node.right)
+
+
+def _no_children(node):
+    return ()
+
+
+_CHILDREN = {
+    Add: _binary_children,
+    And: _binary_children,
+    Assign: lambda node: (node.expression,),
+    Block: lambda node: node.statements,
+    Boolean: _no_children,
+    Divide: _binary_children,
+    DoNothing: _no_children,
+    GreaterThan: _binary_children,
+    If: lambda node: (node.condition, node.consequence, node.alternative),
+    LessThan: _binary_children,
+    Multiply: _binary_children,
+    Not: lambda node: (node.value,),
+    Number: _no_children,
+    Or: _binary_children,
+    Sequence: lambda node: (node.first, node.second),
+    Subtract: _binary_children,
+    Variable: _no_children,
+    While: lambda node: (node.condition, node.body),
+}
+
+_REBUILD = {
+    Assign: lambda node, c: Assign(node.name, c[0]),
+    Block: lambda node, c: Block(c),
+    If: lambda node, c: If(c[0], c[1], c[2]),
+    Not: lambda node, c: Not(c[0]),
+    Sequence: lambda node, c: Sequence(c[0], c[1]),
+    While: lambda node, c: While(c[0], c[1]),
+}
+
+
+def _binary_rebuilder(cls):
+    return lambda node, c: cls(c[0], c[1])
+
+
+for _cls in BINARY_EXPRESSIONS:
+    _REBUILD[_cls] = _binary_rebuilder(_cls)
+for _cls in LEAVES:
+    _REBUILD[_cls] = lambda node, c: node
+del _cls
@@ -9,7 +9,7 @@ If ($VENV_RUNNING_ -eq $null)
 {
   echo "ERROR: Python virtual environment not running"
   echo ""
-  echo "Try 'venv34\Scripts\Activate.ps1' to start the virtual environment, and"
+  echo "Try 'venv38\Scripts\Activate.ps1' to start the virtual environment, and"
   echo "then try '$SCRIPTNAME_' again."
   echo ""
   return False
@@ -27,7 +27,7 @@ if ($vsn -NotLike "Python 3.*")
   echo "ERROR: Python 3.4 or later is required. Found '$vsn'."
   echo ""
   echo "Deactivate the current virtual environment."
-  echo "Try 'venv34\Scripts\Activate.ps1' to start the virtual environment, and"
+  echo "Try 'venv38\Scripts\Activate.ps1' to start the virtual environment, and"
   echo "then try '$SCRIPTNAME_' again."
   echo ""
   return False
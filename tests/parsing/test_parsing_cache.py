@@ -0,0 +1,193 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module parsing.parsing_cache."""
+
+import unittest
+import os
+
+import subprocess
+import sys
+
+from parsing.parsing_cache import cache_path, load_program, \
+    source_digest, translate, translator_digest, CACHE_DIRECTORY
+from simple.simple_expressions import Add, Number, Variable
+from simple.simple_statements import Assign, Block
+
+
+class ParsingCacheTests(unittest.TestCase):
+
+    """Tests for module parsing.parsing_cache."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # load_program tests
+    # -------------------------------------------------------------------------+
+
+    def _write_source(self, text, name="example.simple"):
+        """Write a program source file; produce its path."""
+        path = os.path.join(self.tempDirPath.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_translate(self):
+        """Check translate() produces a tree with plain string names."""
+        s1 = translate("x = y + 1;")
+
+        self.assertEqual(Assign('x', Add(Variable('y'), Number(1))), s1)
+        self.assertIs(str, type(s1.name))
+        self.assertIs(str, type(s1.expression.left.name))
+
+    def test_cache_path(self):
+        """Check cache_path() names entries by source hash."""
+        source_path = os.path.join(self.tempDirPath.name, "a.simple")
+        p1 = cache_path(source_path, b"x = 1;")
+
+        self.assertEqual(
+            os.path.join(self.tempDirPath.name, CACHE_DIRECTORY),
+            os.path.dirname(p1))
+        self.assertTrue(p1.endswith(".simplec"))
+        self.assertEqual(p1, cache_path(source_path, b"x = 1;"))
+        self.assertNotEqual(p1, cache_path(source_path, b"x = 2;"))
+        self.assertEqual(
+            os.path.join("elsewhere", os.path.basename(p1)),
+            cache_path(source_path, b"x = 1;", "elsewhere"))
+
+    def test_load_program(self):
+        """Check load_program() writes an entry, then reads it."""
+        path = self._write_source("x = 1; y = x + z;")
+        expected = Block([
+            Assign('x', Number(1)),
+            Assign('y', Add(Number(1), Variable('z')))])
+        with open(path, "rb") as f:
+            entry = cache_path(path, f.read())
+
+        self.assertEqual(expected, load_program(path))
+        self.assertTrue(os.path.exists(entry))
+        self.assertEqual(expected, load_program(path))
+
+        # A stale entry is replaced
+        #
+        with open(entry, "wb") as f:
+            f.write(b"not a pickle")
+        self.assertEqual(expected, load_program(path))
+        self.assertEqual(expected, load_program(path))
+
+    def test_load_program_cache_dir(self):
+        """Check load_program() honours cache_dir and source edits."""
+        cache_dir = os.path.join(self.tempDirPath.name, "cache")
+        path = self._write_source("x = 1;")
+
+        self.assertEqual(
+            Assign('x', Number(1)), load_program(path, cache_dir))
+        self.assertEqual(1, len(os.listdir(cache_dir)))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.tempDirPath.name, CACHE_DIRECTORY)))
+
+        self._write_source("x = 2;")
+        self.assertEqual(
+            Assign('x', Number(2)), load_program(path, cache_dir))
+        self.assertEqual(2, len(os.listdir(cache_dir)))
+
+    def test_load_program_translator(self):
+        """Check an entry written by another translator is replaced."""
+        import pickle
+        import parsing.parsing_cache as pc
+
+        cache_dir = os.path.join(self.tempDirPath.name, "cache")
+        path = self._write_source("x = 1;")
+        load_program(path, cache_dir)
+        entry = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+        with open(entry, "rb") as f:
+            self.assertEqual(translator_digest(), pickle.load(f)[1])
+
+        translator = pc._translator
+        try:
+            pc._translator = "edited"
+            self.assertEqual(
+                Assign('x', Number(1)), load_program(path, cache_dir))
+        finally:
+            pc._translator = translator
+        with open(entry, "rb") as f:
+            self.assertEqual("edited", pickle.load(f)[1])
+
+    def test_source_digest(self):
+        """Check source_digest() follows .py file names and contents."""
+        directory = self.tempDirPath.name
+        d1 = source_digest([directory])
+        self._write_source("x = 1\n", name="a.py")
+        d2 = source_digest([directory])
+        self._write_source("not python", name="a.txt")
+        self.assertEqual(d2, source_digest([directory]))
+        self._write_source("x = 2\n", name="a.py")
+        d3 = source_digest([directory])
+        os.rename(
+            os.path.join(directory, "a.py"), os.path.join(directory, "b.py"))
+        d4 = source_digest([directory])
+
+        self.assertEqual(4, len({d1, d2, d3, d4}))
+        self.assertEqual(translator_digest(), translator_digest())
+
+    def test_load_program_unwritable(self):
+        """Check a cache that cannot be written is ignored."""
+        blocker = self._write_source("", name="blocker")
+        path = self._write_source("x = 1;")
+
+        self.assertEqual(
+            Assign('x', Number(1)),
+            load_program(path, os.path.join(blocker, "cache")))
+
+    def test_load_program_skips_pypeg2(self):
+        """Check a cache hit does not import pyPEG2."""
+        path = self._write_source("x = 1; while (x < 3) { x = x + 1; }")
+        load_program(path)
+        script = (
+            "import sys\n"
+            "from parsing.parsing_cache import load_program\n"
+            "load_program(sys.argv[1])\n"
+            "print('pypeg2' in sys.modules)\n")
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+        output = subprocess.check_output(
+            [sys.executable, "-c", script, path], env=env)
+        self.assertEqual(b"False", output.strip())
@@ -11,7 +11,10 @@ import os
 import parsing.parsing_simple as p
 from simple.simple_expressions import Boolean, Number, Variable, Add, \
     Divide, Multiply, Subtract, GreaterThan, LessThan, Not, And, Or
-from simple.simple_statements import Assign, If, Sequence, While
+from simple.simple_fusion import AssignCopy, AssignVariableConstant
+from simple.simple_quickening import LessThanVariableConstant, \
+    LessThanVariables
+from simple.simple_statements import Assign, Block, If, While
 from pypeg2 import parse, compose
 
 
@@ -764,12 +767,12 @@ class ParsingSimpleTests(unittest.TestCase):
         self.assertEqual(
             If(
                 GreaterThan(Variable('x'), Variable('y')),
-                Sequence(
+                Block([
                     Assign('x', Number(1)),
-                    Assign('y', Multiply(Variable('x'), Number(3)))),
-                Sequence(
+                    Assign('y', Multiply(Variable('x'), Number(3)))]),
+                Block([
                     Assign('x', Number(2)),
-                    Assign('y', Multiply(Number(3), Variable('x'))))),
+                    Assign('y', Multiply(Number(3), Variable('x')))])),
             e)
 
     # -------------------------------------------------------------------------+
@@ -805,9 +808,9 @@ class ParsingSimpleTests(unittest.TestCase):
         self.assertEqual(
             While(
                 GreaterThan(Variable('x'), Variable('y')),
-                Sequence(
+                Block([
                     Assign('x', Number(1)),
-                    Assign('y', Multiply(Variable('x'), Number(3))))),
+                    Assign('y', Multiply(Variable('x'), Number(3)))])),
             e)
 
     # -------------------------------------------------------------------------+
@@ -839,6 +842,48 @@ class ParsingSimpleTests(unittest.TestCase):
         for x in env_expected.keys():
             self.assertEqual(env_expected[x], env3[x])
 
+    def test_program_fused(self):
+        """Test a program is produced with fused nodes."""
+        simple_lines = \
+            """
+            while (i < n) {
+                i = i + 1;
+                j = i;
+            }
+            """
+        ast = parse(simple_lines, p.Program)
+        prog = ast.to_simple()
+
+        self.assertEqual(
+            While(LessThan(Variable('i'), Variable('n')), Block([
+                Assign('i', Add(Variable('i'), Number(1))),
+                Assign('j', Variable('i'))])),
+            prog)
+        self.assertIs(LessThanVariables, type(prog.condition))
+        self.assertIs(AssignVariableConstant, type(prog.body.statements[0]))
+        self.assertIs(AssignCopy, type(prog.body.statements[1]))
+
+    def test_program_folded(self):
+        """Test a program is produced with its constants folded."""
+        simple_lines = \
+            """
+            n = 2 * 3;
+            while (i < n) {
+                i = i + 1;
+            }
+            """
+        ast = parse(simple_lines, p.Program)
+        prog = ast.to_simple()
+
+        self.assertEqual(
+            Block([
+                Assign('n', Number(6)),
+                While(LessThan(Variable('i'), Number(6)),
+                      Assign('i', Add(Variable('i'), Number(1))))]),
+            prog)
+        self.assertIs(
+            LessThanVariableConstant, type(prog.statements[1].condition))
+
     def test_program_diff_env(self):
         """Test simple 2 line program with different initial conditions."""
         simple_lines = \
@@ -864,3 +909,18 @@ class ParsingSimpleTests(unittest.TestCase):
         self.assertEqual(len(env_expected), len(env3))
         for x in env_expected.keys():
             self.assertEqual(env_expected[x], env3[x])
+
+    def test_program_long_block(self):
+        """Test converting and running a block of 50000 statements."""
+        count = 50000
+        statement = parse("x = x + 1;", p.Assign)
+        block = p.Block([statement] * count)
+        prog = block.to_simple()
+
+        self.assertIsInstance(prog, Block)
+        self.assertEqual(count, len(prog.statements))
+
+        env = dict(x=Number(0))
+        env2 = prog.evaluate(env)
+        self.assertEqual(Number(count), env2['x'])
+        self.assertEqual(Number(0), env['x'])
@@ -0,0 +1,65 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Fixtures shared by the tests for the simple package.
+
+The programs are loaded from the examples directory, so the tests run
+the same programs as the examples do.
+"""
+
+import os
+
+from pypeg2 import parse
+import parsing.parsing_simple as p
+from simple.simple_expressions import Number
+
+_EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "..", "examples")
+
+
+def example(name):
+    """Produce the program of an example, as Program.to_simple() does.
+
+    Args:
+        name: the name of the example's directory, such as "phi".
+
+    Returns:
+        The folded and fused statement of the example.
+
+    """
+    return _parse(name).to_simple()
+
+
+def phi_env():
+    """Produce the loop from the phi-env example.
+
+    Returns:
+        The While statement of the example as the parser builds it,
+        neither folded nor fused, so that it holds only the node
+        classes of simple_expressions and simple_statements.
+
+    """
+    return _parse("phi-env")[0].to_simple()
+
+
+def phi_env_inputs(limit):
+    """Produce the inputs of the phi-env example.
+
+    Args:
+        limit: the number of iterations the loop is to run.
+
+    Returns:
+        A dictionary of the variables the loop reads.
+
+    """
+    return dict(
+        phi=Number(0), x0=Number(0), x1=Number(4567), x2=Number(7654),
+        i=Number(0), limit=Number(limit))
+
+
+def _parse(name):
+    """Parse the program of an example."""
+    fn = os.path.join(_EXAMPLES, name, "example.simple")
+    with open(fn, "r", encoding="utf-8") as f:
+        return parse(f.read(), p.Program)
@@ -0,0 +1,222 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_ast."""
+
+import ast
+import unittest
+import os
+import warnings
+
+from simple.simple_ast import AstProgram, compile_ast, function_tree
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_expressions import Add, And, Boolean, Divide, \
+    GreaterThan, LessThan, Multiply, Not, Number, Or, Subtract, Variable
+from simple.simple_statements import Assign, Block, DoNothing, If, \
+    Sequence, While
+from tests.simple.fixtures import phi_env, phi_env_inputs
+
+
+class AstTests(unittest.TestCase):
+
+    """Tests for module simple.simple_ast."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # compile_ast tests
+    # -------------------------------------------------------------------------+
+
+    def test_compile_ast(self):
+        """Check compile_ast() produces an AstProgram."""
+        s1 = phi_env()
+        ap = compile_ast(s1)
+
+        self.assertIsInstance(ap, AstProgram)
+        self.assertIs(s1, ap.statement)
+        self.assertEqual(('i', 'limit', 'x0', 'x1', 'x2', 'phi'), ap.names)
+        self.assertEqual(str(s1), str(ap))
+        self.assertEqual("«{0}»".format(s1), repr(ap))
+        self.assertFalse(hasattr(ap, 'source'))
+
+    def test_function_tree(self):
+        """Check function_tree() translates like simple_python."""
+        vt = Variable('t')
+        vf = Variable('f')
+        s1 = Block([
+            If(vt, Assign('a', And(vt, vf)), DoNothing()),
+            While(Or(LessThan(vt, vf), Not(vf)), Assign('t', Boolean(False))),
+            While(Number(1), DoNothing())])
+        source = ast.unparse(function_tree(s1, ('t', 'a', 'f')))
+
+        self.assertIn("    if v_t is True:\n", source)
+        self.assertIn("        v_a = bool(v_t and v_f)\n", source)
+        self.assertIn("    while v_t < v_f or not v_f:\n", source)
+        self.assertIn("    while False:\n        pass\n", source)
+
+        source = ast.unparse(function_tree(phi_env(), compile_ast(
+            phi_env()).names))
+        self.assertIn(
+            "    while v_i < v_limit:\n"
+            "        v_i = v_i + 1\n"
+            "        v_x0 = v_x1\n"
+            "        v_x1 = v_x2\n"
+            "        v_x2 = v_x1 + v_x0\n"
+            "        v_phi = v_x2 / v_x1\n", source)
+
+    def test_function_tree_shares_leaves(self):
+        """Check repeated variables and constants share one node."""
+        va = Variable('a')
+        s1 = Block([
+            Assign('a', Add(va, Number(1))),
+            Assign('a', Add(va, Number(1))),
+            Assign('b', Number(1.0))])
+        body = function_tree(s1, ('a', 'b')).body[0].body[3:6]
+
+        self.assertIs(body[0].targets[0], body[1].targets[0])
+        self.assertIs(body[0].value.left, body[1].value.left)
+        self.assertIs(body[0].value.right, body[1].value.right)
+        self.assertIsNot(body[0].value.right, body[2].value)
+        self.assertEqual(
+            dict(a=Number(2), b=Number(1.0)),
+            compile_ast(s1).evaluate(dict(a=Number(0))))
+
+    def test_ast_evaluate_phi(self):
+        """Check the phi loop matches tree evaluation."""
+        ap = compile_ast(phi_env())
+
+        for limit in (0, 1, 2, 50):
+            env = phi_env_inputs(limit)
+            ape = ap.evaluate(env)
+            self.assertEqual(phi_env().evaluate(env), ape)
+            self.assertEqual(phi_env_inputs(limit), env)
+
+        self.assertIsInstance(ape['i'].value, int)
+        self.assertIsInstance(ape['phi'].value, float)
+
+    def test_ast_evaluate_persistent(self):
+        """Check a PersistentEnvironment produces a PersistentEnvironment."""
+        ap = compile_ast(phi_env())
+        pe = PersistentEnvironment(phi_env_inputs(10))
+
+        ape = ap.evaluate(pe)
+        self.assertIsInstance(ape, PersistentEnvironment)
+        self.assertEqual(phi_env().evaluate(phi_env_inputs(10)), ape)
+        self.assertEqual(Number(0), pe['i'])
+
+    def test_ast_evaluate_expressions(self):
+        """Check every expression matches tree evaluation."""
+        va = Variable('a')
+        vb = Variable('b')
+        vt = Variable('t')
+        vf = Variable('f')
+        expressions = [
+            Add(va, vb), Add(va, Number(1)), Subtract(va, vb),
+            Multiply(va, Number(3)), Divide(va, vb), Divide(vb, Number(4)),
+            LessThan(va, vb), LessThan(vb, va), GreaterThan(va, vb),
+            GreaterThan(va, Number(2)), And(vt, vf), And(vt, vt),
+            And(vt, va), Or(vf, vf), Or(vf, vt), Or(vf, va), Not(vt),
+            Not(vf), Boolean(True), Number(2.5), Add(vt, va)]
+        env = dict(
+            a=Number(7), b=Number(2), t=Boolean(True), f=Boolean(False))
+
+        for e in expressions:
+            s1 = Assign('r', e)
+            expected = s1.evaluate(env)['r']
+            actual = compile_ast(s1).evaluate(env)['r']
+            self.assertEqual(expected, actual, str(e))
+            self.assertIs(type(expected.value), type(actual.value), str(e))
+            if isinstance(expected, Boolean):
+                self.assertIs(expected, actual, str(e))
+
+    def test_ast_evaluate_statements(self):
+        """Check every statement matches tree evaluation."""
+        va = Variable('a')
+        statements = [
+            DoNothing(),
+            Block([]),
+            Sequence(Assign('a', Number(1)), Assign('b', va)),
+            Block([Assign('a', Number(1)), Assign('b', Add(va, va))]),
+            If(Boolean(True), Assign('a', Number(1)), DoNothing()),
+            If(Boolean(False), DoNothing(), Assign('a', Number(2))),
+            If(Number(1), Assign('a', Number(1)), Assign('a', Number(2))),
+            If(Or(va, Number(1)), Assign('a', Number(1)), DoNothing()),
+            While(LessThan(va, Number(5)), Assign('a', Add(va, Number(1)))),
+            While(Number(1), Assign('a', Number(9)))]
+
+        for s1 in statements:
+            env = dict(a=Number(0))
+            self.assertEqual(
+                s1.evaluate(env), compile_ast(s1).evaluate(env), str(s1))
+
+    def test_ast_constant_conditions(self):
+        """Check constant conditions compile without warnings."""
+        conditions = [
+            Add(Number(1), Number(2)),
+            Divide(Number(4), Number(2)),
+            Multiply(Number(2 ** 100), Number(2 ** 100)),
+            And(Number(1), Boolean(True))]
+
+        for condition in conditions:
+            s1 = If(condition, Assign('b', Number(1)), Assign('b', Number(2)))
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                ap = compile_ast(s1)
+            self.assertEqual(s1.evaluate({}), ap.evaluate({}), str(s1))
+
+    def test_ast_evaluate_unbound(self):
+        """Check unassigned variables stay absent or raise KeyError."""
+        s1 = If(
+            Variable('c'),
+            Assign('a', Number(1)),
+            Assign('b', Number(2)))
+
+        ape = compile_ast(s1).evaluate(dict(c=Boolean(False)))
+        self.assertEqual(dict(b=Number(2), c=Boolean(False)), ape)
+
+        self.assertRaises(
+            KeyError, compile_ast(Assign('b', Variable('a'))).evaluate,
+            dict())
+        self.assertRaises(
+            KeyError,
+            compile_ast(Assign('b', Add(Variable('a'), Number(1)))
+                        ).evaluate,
+            dict())
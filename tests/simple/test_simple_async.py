@@ -0,0 +1,143 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_async."""
+
+import asyncio
+import unittest
+import os
+
+from simple.simple_async import evaluate_async
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_expressions import Add, LessThan, Number, Variable
+from simple.simple_fusion import fuse
+from simple.simple_statements import Assign, Block, DoNothing, If, \
+    Sequence, While
+from tests.simple.fixtures import phi_env, phi_env_inputs
+
+
+class AsyncTests(unittest.TestCase):
+
+    """Tests for module simple.simple_async."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # evaluate_async tests
+    # -------------------------------------------------------------------------+
+
+    def test_evaluate_async(self):
+        """Check the final environment matches evaluate()."""
+        va = Variable('a')
+        statements = [
+            phi_env(),
+            fuse(phi_env()),
+            Sequence(Assign('a', Number(1)), Assign('b', Add(va, va))),
+            If(LessThan(va, Number(1)), Assign('a', Number(1)), DoNothing()),
+            If(va, Assign('a', Number(1)), Assign('a', Number(2))),
+            Block([]),
+            DoNothing()]
+
+        for s1 in statements:
+            env = dict(phi_env_inputs(50), a=Number(0))
+            for env in (env, PersistentEnvironment(env)):
+                for statements, microseconds in ((1, None), (1000, 0)):
+                    result = asyncio.run(evaluate_async(
+                        s1, env, statements, microseconds))
+                    self.assertEqual(s1.evaluate(env), result, str(s1))
+                    self.assertIs(type(env), type(result), str(s1))
+                self.assertEqual(Number(0), env['i'])
+
+    def test_evaluate_async_interleaves(self):
+        """Check concurrent programs and other tasks take turns."""
+        turns = []
+
+        async def program(name, limit):
+            result = await evaluate_async(
+                phi_env(), phi_env_inputs(limit), statements=10)
+            turns.append(name)
+            return result
+
+        async def ticker():
+            for _ in range(5):
+                turns.append("tick")
+                await asyncio.sleep(0)
+
+        async def main():
+            return await asyncio.gather(
+                program("long", 1000), program("short", 10), ticker())
+
+        long_result, short_result, _ = asyncio.run(main())
+        self.assertEqual(phi_env().evaluate(phi_env_inputs(1000)),
+                         long_result)
+        self.assertEqual(phi_env().evaluate(phi_env_inputs(10)),
+                         short_result)
+        self.assertEqual(["tick"] * 5 + ["short", "long"],
+                         turns)
+
+    def test_evaluate_async_empty_loop(self):
+        """Check a loop with an empty body still yields."""
+        s1 = While(LessThan(Variable('i'), Number(1)), DoNothing())
+        ticks = []
+
+        async def ticker():
+            while len(ticks) < 3:
+                ticks.append(True)
+                await asyncio.sleep(0)
+
+        async def main():
+            task = asyncio.ensure_future(
+                evaluate_async(s1, dict(i=Number(0)), statements=100))
+            await ticker()
+            task.cancel()
+            return task
+
+        task = asyncio.run(main())
+        self.assertTrue(task.cancelled())
+        self.assertEqual(3, len(ticks))
+
+    def test_evaluate_async_unbound(self):
+        """Check reading an unassigned variable raises KeyError."""
+        s1 = Sequence(Assign('a', Number(1)), Assign('b', Variable('c')))
+
+        with self.assertRaises(KeyError) as context:
+            asyncio.run(evaluate_async(s1, {}))
+        self.assertEqual(('c',), context.exception.args)
@@ -0,0 +1,240 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_bytecode."""
+
+import unittest
+import os
+
+from simple.simple_bytecode import BytecodeProgram, compile_bytecode, \
+    exposed_reads, run, ADD, JUMP, JUMP_UNLESS_TRUE, LESS_THAN
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_expressions import Add, And, Boolean, Divide, \
+    GreaterThan, LessThan, Multiply, Not, Number, Or, Subtract, Variable
+from simple.simple_statements import Assign, Block, DoNothing, If, \
+    Sequence, While
+from tests.simple.fixtures import phi_env, phi_env_inputs
+
+
+class BytecodeTests(unittest.TestCase):
+
+    """Tests for module simple.simple_bytecode."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # compile_bytecode tests
+    # -------------------------------------------------------------------------+
+
+    def test_compile_bytecode(self):
+        """Check compile_bytecode() produces a BytecodeProgram."""
+        s1 = phi_env()
+        bp = compile_bytecode(s1)
+
+        self.assertIsInstance(bp, BytecodeProgram)
+        self.assertIs(s1, bp.statement)
+        self.assertEqual(('i', 'limit', 'x0', 'x1', 'x2', 'phi'), bp.names)
+        self.assertEqual((1,), bp.constants)
+        self.assertEqual(1, bp.temporaries)
+        self.assertEqual(str(s1), str(bp))
+        self.assertEqual("«{0}»".format(s1), repr(bp))
+        self.assertEqual([
+            "   0 LESS_THAN t0, i, limit",
+            "   1 JUMP_UNLESS_TRUE t0, 8",
+            "   2 ADD i, i, 1",
+            "   3 MOVE x0, x1",
+            "   4 MOVE x1, x2",
+            "   5 ADD x2, x1, x0",
+            "   6 DIVIDE phi, x2, x1",
+            "   7 JUMP 0"], bp.disassemble())
+
+    def test_bytecode_constants(self):
+        """Check equal constants of different types are pooled apart."""
+        s1 = Block([
+            Assign('a', Number(1)), Assign('b', Boolean(True)),
+            Assign('c', Number(1.0)), Assign('d', Number(1)),
+            Assign('e', Number(0.0)), Assign('f', Number(-0.0))])
+        bp = compile_bytecode(s1)
+
+        self.assertEqual(5, len(bp.constants))
+        bpe = bp.evaluate(dict())
+        self.assertEqual(s1.evaluate(dict()), bpe)
+        self.assertIs(Boolean(True), bpe['b'])
+        self.assertIsInstance(bpe['c'].value, float)
+        self.assertEqual('-0.0', str(bpe['f']))
+
+    def test_bytecode_run(self):
+        """Check run() executes hand-written code in place."""
+        from array import array
+        code = array('i', [
+            LESS_THAN, 3, 0, 1,
+            JUMP_UNLESS_TRUE, 3, 16, 0,
+            ADD, 0, 0, 2,
+            JUMP, 0, 0, 0])
+        registers = [0, 5, 1, None]
+
+        run(code, registers)
+        self.assertEqual([5, 5, 1, False], registers)
+        self.assertRaises(ValueError, run, array('i', [99, 0, 0, 0]), [])
+
+    def test_exposed_reads(self):
+        """Check exposed_reads() finds reads that may precede assignment."""
+        va = Variable('a')
+        vb = Variable('b')
+
+        self.assertEqual(
+            {'i', 'limit', 'x1', 'x2'}, exposed_reads(phi_env()))
+        self.assertEqual(
+            set(),
+            exposed_reads(Block([Assign('a', Number(1)), Assign('b', va)])))
+        self.assertEqual(
+            {'c', 'a'},
+            exposed_reads(Block([
+                If(Variable('c'), Assign('a', Number(1)), DoNothing()),
+                Assign('b', va)])))
+        self.assertEqual(
+            {'b'},
+            exposed_reads(Sequence(
+                If(vb, Assign('a', Number(1)), Assign('a', Number(2))),
+                Assign('b', va))))
+        self.assertEqual(
+            {'a', 'b'},
+            exposed_reads(Sequence(
+                While(va, Assign('b', Number(1))), Assign('c', vb))))
+
+    def test_bytecode_evaluate_phi(self):
+        """Check the phi loop matches tree evaluation."""
+        bp = compile_bytecode(phi_env())
+
+        for limit in (0, 1, 2, 50):
+            env = phi_env_inputs(limit)
+            bpe = bp.evaluate(env)
+            self.assertEqual(phi_env().evaluate(env), bpe)
+            self.assertEqual(phi_env_inputs(limit), env)
+
+        self.assertIsInstance(bpe['i'].value, int)
+        self.assertIsInstance(bpe['phi'].value, float)
+
+    def test_bytecode_evaluate_persistent(self):
+        """Check a PersistentEnvironment produces a PersistentEnvironment."""
+        bp = compile_bytecode(phi_env())
+        pe = PersistentEnvironment(phi_env_inputs(10))
+
+        bpe = bp.evaluate(pe)
+        self.assertIsInstance(bpe, PersistentEnvironment)
+        self.assertEqual(phi_env().evaluate(phi_env_inputs(10)), bpe)
+        self.assertEqual(Number(0), pe['i'])
+
+    def test_bytecode_evaluate_expressions(self):
+        """Check every expression matches tree evaluation."""
+        va = Variable('a')
+        vb = Variable('b')
+        vt = Variable('t')
+        vf = Variable('f')
+        expressions = [
+            Add(va, vb), Add(va, Number(1)), Subtract(va, vb),
+            Multiply(va, Number(3)), Divide(va, vb), Divide(vb, Number(4)),
+            LessThan(va, vb), LessThan(vb, va), GreaterThan(va, vb),
+            GreaterThan(va, Number(2)), And(vt, vf), And(vt, vt),
+            And(vt, va), Or(vf, vf), Or(vf, vt), Or(vf, va), Not(vt),
+            Not(vf), Boolean(True), Number(2.5), Add(vt, va),
+            Multiply(Add(va, vb), Subtract(va, Add(vb, Number(1)))),
+            And(Or(vf, LessThan(vb, va)), Not(And(vf, vt)))]
+        env = dict(
+            a=Number(7), b=Number(2), t=Boolean(True), f=Boolean(False))
+
+        for e in expressions:
+            for name in ('r', 'a', 't'):
+                s1 = Assign(name, e)
+                expected = s1.evaluate(env)[name]
+                actual = compile_bytecode(s1).evaluate(env)[name]
+                self.assertEqual(expected, actual, str(e))
+                self.assertIs(
+                    type(expected.value), type(actual.value), str(e))
+                if isinstance(expected, Boolean):
+                    self.assertIs(expected, actual, str(e))
+
+    def test_bytecode_evaluate_statements(self):
+        """Check every statement matches tree evaluation."""
+        va = Variable('a')
+        statements = [
+            DoNothing(),
+            Block([]),
+            Sequence(Assign('a', Number(1)), Assign('b', va)),
+            Block([Assign('a', Number(1)), Assign('b', Add(va, va))]),
+            If(Boolean(True), Assign('a', Number(1)), DoNothing()),
+            If(Boolean(False), DoNothing(), Assign('a', Number(2))),
+            If(Number(1), Assign('a', Number(1)), Assign('a', Number(2))),
+            If(Or(va, Number(1)), Assign('a', Number(1)), DoNothing()),
+            While(LessThan(va, Number(5)), Assign('a', Add(va, Number(1)))),
+            While(Number(1), Assign('a', Number(9))),
+            While(
+                LessThan(va, Number(10)),
+                If(LessThan(va, Number(5)),
+                   Assign('a', Add(va, Number(2))),
+                   Assign('a', Add(va, Number(1)))))]
+
+        for s1 in statements:
+            env = dict(a=Number(0))
+            self.assertEqual(
+                s1.evaluate(env), compile_bytecode(s1).evaluate(env), str(s1))
+
+    def test_bytecode_evaluate_unbound(self):
+        """Check unassigned variables stay absent or raise KeyError."""
+        s1 = If(
+            Variable('c'),
+            Assign('a', Number(1)),
+            Assign('b', Number(2)))
+
+        bpe = compile_bytecode(s1).evaluate(dict(c=Boolean(False)))
+        self.assertEqual(dict(b=Number(2), c=Boolean(False)), bpe)
+
+        s2 = If(Boolean(False), Assign('b', Variable('a')), DoNothing())
+        self.assertEqual(dict(), compile_bytecode(s2).evaluate(dict()))
+
+        self.assertRaises(
+            KeyError, compile_bytecode(Assign('b', Variable('a'))).evaluate,
+            dict())
+        self.assertRaises(
+            KeyError,
+            compile_bytecode(Assign('b', Add(Variable('a'), Number(1)))
+                             ).evaluate,
+            dict())
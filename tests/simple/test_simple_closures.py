@@ -0,0 +1,174 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_closures."""
+
+import unittest
+import os
+
+from simple.simple_closures import ClosureProgram, compile_closures
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_expressions import Add, And, Boolean, Divide, \
+    GreaterThan, LessThan, Multiply, Not, Number, Or, Subtract, Variable
+from simple.simple_statements import Assign, Block, DoNothing, If, \
+    Sequence, While
+from tests.simple.fixtures import phi_env, phi_env_inputs
+
+
+class ClosureTests(unittest.TestCase):
+
+    """Tests for module simple.simple_closures."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # compile_closures tests
+    # -------------------------------------------------------------------------+
+
+    def test_compile_closures(self):
+        """Check compile_closures() produces a ClosureProgram."""
+        s1 = phi_env()
+        cp = compile_closures(s1)
+
+        self.assertIsInstance(cp, ClosureProgram)
+        self.assertIs(s1, cp.statement)
+        self.assertEqual(('i', 'limit', 'x0', 'x1', 'x2', 'phi'), cp.names)
+        self.assertEqual(str(s1), str(cp))
+        self.assertEqual("«{0}»".format(s1), repr(cp))
+
+    def test_closures_evaluate_phi(self):
+        """Check the phi loop matches tree evaluation."""
+        cp = compile_closures(phi_env())
+
+        for limit in (0, 1, 2, 50):
+            env = phi_env_inputs(limit)
+            cpe = cp.evaluate(env)
+            self.assertEqual(phi_env().evaluate(env), cpe)
+            self.assertEqual(phi_env_inputs(limit), env)
+
+        self.assertIsInstance(cpe['i'].value, int)
+        self.assertIsInstance(cpe['phi'].value, float)
+
+    def test_closures_evaluate_persistent(self):
+        """Check a PersistentEnvironment produces a PersistentEnvironment."""
+        cp = compile_closures(phi_env())
+        pe = PersistentEnvironment(phi_env_inputs(10))
+
+        cpe = cp.evaluate(pe)
+        self.assertIsInstance(cpe, PersistentEnvironment)
+        self.assertEqual(phi_env().evaluate(phi_env_inputs(10)), cpe)
+        self.assertEqual(Number(0), pe['i'])
+
+    def test_closures_evaluate_expressions(self):
+        """Check every expression matches tree evaluation."""
+        va = Variable('a')
+        vb = Variable('b')
+        vt = Variable('t')
+        vf = Variable('f')
+        expressions = [
+            Add(va, vb), Add(va, Number(1)), Subtract(va, vb),
+            Multiply(va, Number(3)), Divide(va, vb), Divide(vb, Number(4)),
+            LessThan(va, vb), LessThan(vb, va), GreaterThan(va, vb),
+            GreaterThan(va, Number(2)), And(vt, vf), And(vt, vt),
+            Or(vf, vf), Or(vf, vt), Not(vt), Not(vf), Boolean(True),
+            Number(2.5), Add(vt, va)]
+        env = dict(
+            a=Number(7), b=Number(2), t=Boolean(True), f=Boolean(False))
+
+        for e in expressions:
+            s1 = Assign('r', e)
+            expected = s1.evaluate(env)['r']
+            actual = compile_closures(s1).evaluate(env)['r']
+            self.assertEqual(expected, actual, str(e))
+            self.assertIs(type(expected.value), type(actual.value), str(e))
+            if isinstance(expected, Boolean):
+                self.assertIs(expected, actual, str(e))
+
+    def test_closures_evaluate_statements(self):
+        """Check every statement matches tree evaluation."""
+        va = Variable('a')
+        statements = [
+            DoNothing(),
+            Sequence(Assign('a', Number(1)), Assign('b', va)),
+            Block([Assign('a', Number(1)), Assign('b', Add(va, va))]),
+            If(Boolean(True), Assign('a', Number(1)), DoNothing()),
+            If(Boolean(False), DoNothing(), Assign('a', Number(2))),
+            If(Number(1), Assign('a', Number(1)), Assign('a', Number(2))),
+            While(LessThan(va, Number(5)), Assign('a', Add(va, Number(1)))),
+            While(Number(1), Assign('a', Number(9)))]
+
+        for s1 in statements:
+            env = dict(a=Number(0))
+            self.assertEqual(
+                s1.evaluate(env), compile_closures(s1).evaluate(env), str(s1))
+
+    def test_closures_evaluate_unbound(self):
+        """Check unassigned variables stay absent or raise KeyError."""
+        s1 = If(
+            Variable('c'),
+            Assign('a', Number(1)),
+            Assign('b', Number(2)))
+
+        cpe = compile_closures(s1).evaluate(dict(c=Boolean(False)))
+        self.assertEqual(dict(b=Number(2), c=Boolean(False)), cpe)
+
+        self.assertRaises(
+            KeyError, compile_closures(Assign('b', Variable('a'))).evaluate,
+            dict())
+        self.assertRaises(
+            KeyError,
+            compile_closures(Assign('b', Add(Variable('a'), Number(1)))
+                             ).evaluate,
+            dict())
+
+    def test_closures_evaluate_long_block(self):
+        """Check a long flat block compiles without deep recursion."""
+        s1 = Block([Assign('a', Add(Variable('a'), Number(1)))] * 20000)
+        s2 = s1.statements[0]
+        for _ in range(20000 - 1):
+            s2 = Sequence(s1.statements[0], s2)
+
+        self.assertEqual(
+            dict(a=Number(20000)),
+            compile_closures(s1).evaluate(dict(a=Number(0))))
+        self.assertEqual(
+            dict(a=Number(20000)),
+            compile_closures(s2).evaluate(dict(a=Number(0))))
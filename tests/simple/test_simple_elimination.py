@@ -0,0 +1,189 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_elimination."""
+
+import unittest
+import os
+
+from simple.simple_elimination import assigned_names, eliminate_dead_code, \
+    read_names
+from simple.simple_expressions import Add, Boolean, Divide, LessThan, \
+    Number, Variable
+from simple.simple_statements import Assign, Block, DoNothing, If, \
+    Sequence, While
+from tests.simple.fixtures import example
+
+
+class EliminationTests(unittest.TestCase):
+
+    """Tests for module simple.simple_elimination."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # elimination tests
+    # -------------------------------------------------------------------------+
+
+    def test_names(self):
+        """Test finding the variables read and assigned."""
+        statement = Block([
+            Assign('x', Add(Variable('y'), Number(1))),
+            While(LessThan(Variable('i'), Variable('n')),
+                  Assign('i', Variable('x')))])
+        self.assertEqual({'x', 'i'}, assigned_names(statement))
+        self.assertEqual({'x', 'y', 'i', 'n'}, read_names(statement))
+
+    def test_dead_branch(self):
+        """Test removing the branch a constant condition never takes."""
+        statement = Block([
+            If(LessThan(Number(1), Number(2)),
+               Assign('x', Number(1)), Assign('x', Number(2))),
+            If(Number(1), Assign('y', Number(1)), Assign('y', Number(2)))])
+        self.assertEqual(
+            Block([Assign('x', Number(1)), Assign('y', Number(2))]),
+            eliminate_dead_code(statement))
+
+    def test_dead_branch_propagated(self):
+        """Test a condition constant from earlier assignments."""
+        statement = Block([
+            Assign('debug', Boolean(False)),
+            If(Variable('debug'),
+               Assign('x', Variable('y')), Assign('x', Number(2)))])
+        self.assertEqual(
+            Block([Assign('debug', Boolean(False)), Assign('x', Number(2))]),
+            eliminate_dead_code(statement))
+        self.assertEqual(
+            Assign('x', Number(2)), eliminate_dead_code(statement, ['x']))
+
+    def test_dead_loop(self):
+        """Test removing a loop that never runs."""
+        statement = Sequence(
+            Assign('x', Number(1)),
+            While(Boolean(False), Assign('x', Number(2))))
+        self.assertEqual(
+            Assign('x', Number(1)), eliminate_dead_code(statement))
+
+    def test_dead_store(self):
+        """Test removing assignments overwritten before being read."""
+        statement = Block([
+            Assign('x', Variable('a')),
+            Assign('y', Variable('x')),
+            Assign('x', Variable('b')),
+            Assign('z', Variable('x'))])
+        self.assertEqual(
+            Block([
+                Assign('x', Variable('a')),
+                Assign('y', Variable('x')),
+                Assign('x', Variable('b')),
+                Assign('z', Variable('x'))]),
+            eliminate_dead_code(statement))
+        self.assertEqual(
+            Block([Assign('x', Variable('b')), Assign('z', Variable('x'))]),
+            eliminate_dead_code(
+                Block([
+                    Assign('x', Variable('a')),
+                    Assign('x', Variable('b')),
+                    Assign('z', Variable('x'))]),
+                ['z']))
+
+    def test_outputs(self):
+        """Test pruning everything the outputs do not depend on."""
+        statement = Block([
+            Assign('a', Variable('p')),
+            Assign('b', Variable('q')),
+            While(LessThan(Variable('i'), Variable('n')),
+                  Block([
+                      Assign('i', Add(Variable('i'), Number(1))),
+                      Assign('c', Add(Variable('c'), Variable('b')))])),
+            Assign('d', Variable('a'))])
+        self.assertEqual(
+            Block([Assign('a', Variable('p')), Assign('d', Variable('a'))]),
+            eliminate_dead_code(statement, ['d']))
+        pruned = eliminate_dead_code(statement, ['c'])
+        self.assertNotIn('a', assigned_names(pruned))
+        self.assertIn('b', assigned_names(pruned))
+        self.assertEqual(DoNothing(), eliminate_dead_code(statement, []))
+
+    def test_if_both_dead(self):
+        """Test removing an if statement neither branch of is needed."""
+        statement = Block([
+            If(Variable('c'), Assign('x', Number(1)), Assign('y', Number(2))),
+            Assign('z', Number(3))])
+        self.assertEqual(
+            Assign('z', Number(3)), eliminate_dead_code(statement, ['z']))
+
+    def test_sink(self):
+        """Test making a loop result once, after the loop."""
+        statement = While(
+            LessThan(Variable('i'), Variable('n')),
+            Block([
+                Assign('i', Add(Variable('i'), Number(1))),
+                Assign('r', Divide(Variable('i'), Variable('n')))]))
+        pruned = eliminate_dead_code(statement)
+        self.assertEqual(
+            If(LessThan(Variable('i'), Variable('n')),
+               Block([
+                   While(LessThan(Variable('i'), Variable('n')),
+                         Assign('i', Add(Variable('i'), Number(1)))),
+                   Assign('r', Divide(Variable('i'), Variable('n')))]),
+               DoNothing()),
+            pruned)
+        for i in (0, 3, 5):
+            env = dict(i=Number(i), n=Number(4))
+            self.assertEqual(statement.evaluate(env), pruned.evaluate(env))
+
+    def test_phi(self):
+        """Test that only the final phi of the phi example is made."""
+        statement = example("phi")
+        pruned = eliminate_dead_code(statement, ['phi'])
+        self.assertEqual(
+            "x1 = 4567; x2 = 7654; i = 0; while (i < 24) { i = i + 1; "
+            "x0 = x1; x1 = x2; x2 = x1 + x0; } phi = x2 / x1;",
+            str(pruned))
+        self.assertEqual(
+            statement.evaluate({})['phi'], pruned.evaluate({})['phi'])
+
+    def test_all_outputs(self):
+        """Test that by default every variable keeps its final value."""
+        statement = example("phi")
+        pruned = eliminate_dead_code(statement)
+        self.assertEqual(statement.evaluate({}), pruned.evaluate({}))
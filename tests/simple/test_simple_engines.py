@@ -0,0 +1,122 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_engines."""
+
+import unittest
+import os
+
+from simple.simple_ast import AstProgram
+from simple.simple_bytecode import BytecodeProgram
+from simple.simple_closures import ClosureProgram
+from simple.simple_engines import compile_program, ENGINES
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_expressions import Add, LessThan, Multiply, Number, \
+    Variable
+from simple.simple_limits import Limits
+from simple.simple_python import PythonProgram
+from simple.simple_statements import Assign, Block, Delete, While
+from tests.simple.fixtures import phi_env
+
+
+class EngineTests(unittest.TestCase):
+
+    """Tests for module simple.simple_engines."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # compile_program tests
+    # -------------------------------------------------------------------------+
+
+    def test_compile_program(self):
+        """Check compile_program() selects an engine."""
+        s1 = phi_env()
+
+        self.assertIs(s1, compile_program(s1))
+        self.assertIs(s1, compile_program(s1, "tree"))
+        self.assertIsInstance(compile_program(s1, "ast"), AstProgram)
+        self.assertIsInstance(
+            compile_program(s1, "bytecode"), BytecodeProgram)
+        self.assertIsInstance(
+            compile_program(s1, "closures"), ClosureProgram)
+        self.assertIsInstance(compile_program(s1, "python"), PythonProgram)
+        self.assertRaises(ValueError, compile_program, s1, "nonesuch")
+
+    def test_engines_agree(self):
+        """Check every engine evaluates the phi loop the same way."""
+        for limit in (30, 300):
+            env = dict(
+                phi=Number(0), x0=Number(0), x1=Number(4567),
+                x2=Number(7654), i=Number(0), limit=Number(limit))
+            expected = phi_env().evaluate(env)
+
+            for engine in ENGINES:
+                self.assertEqual(
+                    expected,
+                    compile_program(phi_env(), engine).evaluate(env),
+                    engine)
+
+    def test_engines_delete(self):
+        """Check every engine removes the variables a Delete names."""
+        vi = Variable('i')
+        s1 = Block([
+            Assign('t', Multiply(Variable('n'), Number(2))),
+            While(LessThan(vi, Variable('t')), Block([
+                Assign('u', Multiply(vi, vi)),
+                Assign('s', Add(Variable('s'), Variable('u'))),
+                Delete(['u']),
+                Assign('i', Add(vi, Number(1)))])),
+            Delete(['t', 'a'])])
+        for n in (3, 300):
+            env = dict(a=Number(1), i=Number(0), n=Number(n), s=Number(0))
+            expected = s1.evaluate(env)
+            self.assertEqual({'i', 'n', 's'}, set(expected))
+
+            for engine in ENGINES:
+                self.assertEqual(
+                    expected, compile_program(s1, engine).evaluate(env),
+                    engine)
+                result = compile_program(s1, engine).evaluate(
+                    PersistentEnvironment(env))
+                self.assertEqual(expected, dict(result.items()), engine)
+                program = compile_program(s1, engine, Limits(variables=4))
+                self.assertEqual(expected, program.evaluate(env), engine)
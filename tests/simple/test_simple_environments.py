@@ -0,0 +1,225 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_environments."""
+
+import unittest
+import os
+
+from simple.simple_environments import MutableEnvironment, \
+    PersistentEnvironment, snapshot
+from simple.simple_expressions import Add, LessThan, Number, Variable
+from simple.simple_statements import Assign, Block, While
+
+
+class EnvironmentTests(unittest.TestCase):
+
+    """Tests for module simple.simple_environments."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # PersistentEnvironment tests
+    # -------------------------------------------------------------------------+
+
+    def test_persistent_collisions(self):
+        """Check keys whose hashes collide are kept apart."""
+        class CollidingName(str):
+            def __hash__(self):
+                return 7
+
+        names = [CollidingName("a{0}".format(i)) for i in range(20)]
+        pe1 = PersistentEnvironment()
+        for i, name in enumerate(names):
+            pe1 = pe1.set(name, i)
+        pe2 = pe1.set(names[3], 33).set('b', -1)
+
+        self.assertEqual(20, len(pe1))
+        self.assertEqual(21, len(pe2))
+        for i, name in enumerate(names):
+            self.assertEqual(i, pe1[name])
+        self.assertEqual(33, pe2[names[3]])
+        self.assertEqual(-1, pe2['b'])
+        self.assertRaises(KeyError, pe1.__getitem__, CollidingName('c'))
+
+    def test_persistent_copy(self):
+        """Check PersistentEnvironment.copy() returns the environment."""
+        pe1 = PersistentEnvironment(dict(a=Number(1)))
+        self.assertIs(pe1, pe1.copy())
+
+    def test_persistent_delete(self):
+        """Check PersistentEnvironment.delete()."""
+        env = dict(("v{0}".format(i), Number(i)) for i in range(3000))
+        pe1 = PersistentEnvironment(env)
+        pe2 = pe1
+        for i in range(0, 3000, 2):
+            pe2 = pe2.delete("v{0}".format(i))
+
+        self.assertEqual(3000, len(pe1))
+        self.assertEqual(1500, len(pe2))
+        self.assertEqual(env, pe1)
+        self.assertEqual(
+            dict((k, v) for k, v in env.items() if v.value % 2), pe2)
+        self.assertRaises(KeyError, pe2.delete, 'v0')
+        self.assertEqual(0, len(PersistentEnvironment(dict(a=1)).delete('a')))
+
+    def test_persistent_init(self):
+        """Check PersistentEnvironment.__init__()."""
+        env = dict(("v{0}".format(i), Number(i)) for i in range(3000))
+        pe1 = PersistentEnvironment(env)
+        pe2 = PersistentEnvironment(env.items())
+        pe3 = PersistentEnvironment()
+
+        self.assertEqual(3000, len(pe1))
+        self.assertEqual(env, pe1)
+        self.assertEqual(env, pe2)
+        self.assertEqual(env, dict(pe1))
+        for name, value in env.items():
+            self.assertIs(value, pe1[name])
+        self.assertEqual(0, len(pe3))
+        self.assertEqual([], list(pe3))
+
+    def test_persistent_mapping(self):
+        """Check PersistentEnvironment behaves as a read-only mapping."""
+        pe1 = PersistentEnvironment([('a', Number(1)), ('b', Number(2))])
+
+        self.assertIn('a', pe1)
+        self.assertNotIn('c', pe1)
+        self.assertEqual(Number(2), pe1.get('b'))
+        self.assertIsNone(pe1.get('c'))
+        self.assertEqual(['a', 'b'], sorted(pe1))
+        self.assertRaises(KeyError, pe1.__getitem__, 'c')
+        with self.assertRaises(TypeError):
+            pe1['c'] = Number(3)
+        self.assertEqual(
+            "PersistentEnvironment({'a': «1»})",
+            repr(PersistentEnvironment(dict(a=Number(1)))))
+
+    def test_persistent_set(self):
+        """Check PersistentEnvironment.set() leaves the original intact."""
+        env = dict(("v{0}".format(i), Number(i)) for i in range(3000))
+        pe1 = PersistentEnvironment(env)
+        pe2 = pe1.set('v7', Number(-7))
+        pe3 = pe2.set('w', Number(0))
+        pe4 = pe3.set('w', pe3['w'])
+
+        self.assertEqual(Number(7), pe1['v7'])
+        self.assertEqual(Number(-7), pe2['v7'])
+        self.assertEqual(3000, len(pe2))
+        self.assertNotIn('w', pe2)
+        self.assertEqual(3001, len(pe3))
+        self.assertEqual(Number(0), pe3['w'])
+        self.assertIs(pe3, pe4)
+        self.assertEqual(env, pe1)
+
+    def test_persistent_statements(self):
+        """Check statements evaluate against a PersistentEnvironment."""
+        va = Variable('a')
+        vb = Variable('b')
+        s1 = While(
+            LessThan(va, Number(50)),
+            Block([
+                Assign('a', Add(va, Number(1))),
+                Assign('b', Add(vb, va))]))
+
+        env = dict(("v{0}".format(i), Number(i)) for i in range(1000))
+        env.update(a=Number(0), b=Number(0))
+        pe1 = PersistentEnvironment(env)
+        pe1e = s1.evaluate(pe1)
+
+        self.assertIsInstance(pe1e, PersistentEnvironment)
+        self.assertEqual(s1.evaluate(env), pe1e)
+        self.assertEqual(Number(0), pe1['a'])
+        self.assertEqual(Number(50), pe1e['a'])
+
+    # -------------------------------------------------------------------------+
+    # MutableEnvironment tests
+    # -------------------------------------------------------------------------+
+
+    def test_mutable_environment(self):
+        """Check MutableEnvironment behaves as a mutable mapping."""
+        me1 = MutableEnvironment(dict(a=Number(1)))
+        me1['b'] = Number(2)
+        me1['a'] = Number(3)
+        me2 = me1.copy()
+        del me1['b']
+
+        self.assertEqual(dict(a=Number(3)), dict(me1))
+        self.assertEqual(dict(a=Number(3), b=Number(2)), dict(me2))
+        self.assertEqual(1, len(me1))
+        self.assertRaises(KeyError, me1.__getitem__, 'b')
+        self.assertEqual(
+            "MutableEnvironment({'a': «3»})", repr(me1))
+
+    def test_mutable_execute(self):
+        """Check statements execute in place on a MutableEnvironment."""
+        va = Variable('a')
+        vb = Variable('b')
+        s1 = While(
+            LessThan(va, Number(50)),
+            Block([
+                Assign('a', Add(va, Number(1))),
+                Assign('b', Add(vb, va))]))
+        env = dict(a=Number(0), b=Number(0))
+
+        me1 = MutableEnvironment(env)
+        s1.execute(me1)
+
+        self.assertEqual(s1.evaluate(env), me1)
+
+    def test_snapshot(self):
+        """Check snapshot() isolates later changes."""
+        me1 = MutableEnvironment(dict(a=Number(1)))
+        pe1 = PersistentEnvironment(dict(a=Number(1)))
+        env = dict(a=Number(1))
+
+        me1s = snapshot(me1)
+        pe1s = snapshot(pe1)
+        envs = snapshot(env)
+        Assign('a', Number(2)).execute(me1)
+        Assign('a', Number(2)).execute(env)
+
+        self.assertIsInstance(me1s, PersistentEnvironment)
+        self.assertIs(pe1, pe1s)
+        self.assertEqual(dict(a=Number(1)), me1s)
+        self.assertEqual(dict(a=Number(1)), envs)
+        self.assertEqual(Number(2), me1['a'])
+        self.assertEqual(Number(2), env['a'])
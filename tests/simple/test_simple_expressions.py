@@ -9,7 +9,8 @@ import unittest
 import os
 
 from simple.simple_expressions import Add, And, Boolean, Divide, \
-    GreaterThan, LessThan, Multiply, Number, Not, Or, Subtract, Variable
+    GreaterThan, LessThan, Multiply, Number, Not, Or, Subtract, Variable, \
+    box, FALSE, TRUE, number, SMALL_NUMBER_MAX, SMALL_NUMBER_MIN
 
 
 class ExpressionTests(unittest.TestCase):
@@ -140,6 +141,37 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(Number(5.2 + 3.4), a1ve)
         self.assertEqual(Number((1 + 2) + (5.2 + 3.4)), a1ee)
 
+    def test_add_evaluate_value(self):
+        """Check Add.evaluate_value()."""
+        # Initialize some numbers, bools, values
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        bt = Boolean(True)
+        bf = Boolean(False)
+        vx = Variable('x')
+        vy = Variable('y')
+
+        # Initialize some expressions
+        #
+        e1n = Add(n1, n2)
+        e1b = Add(bt, bf)
+        e1v = Add(vx, vy)
+        e1e = Add(e1n, e1v)
+
+        # Evaluate the expressions and check the plain values match
+        # those of the evaluate() results
+        #
+        env = dict([
+            ('x', Number(5.2)),
+            ('y', Number(3.4))])
+        expected = [
+            (1 + 2), (True + False), (5.2 + 3.4), (1 + 2) + (5.2 + 3.4)]
+        for e, value in zip([e1n, e1b, e1v, e1e], expected):
+            self.assertEqual(value, e.evaluate_value(env))
+            self.assertIs(type(value), type(e.evaluate_value(env)))
+            self.assertEqual(e.evaluate(env).value, e.evaluate_value(env))
+
     def test_add_init(self):
         """Check Add.__init__()."""
         # Initialize some numbers, bools, values
@@ -399,6 +431,36 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(Boolean(True and True), a1b2e)
         self.assertEqual(Boolean(False and False), a1b3e)
 
+    def test_and_evaluate_value(self):
+        """Check And.evaluate_value()."""
+        # Initialize some numbers, bools, values
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        bt = Boolean(True)
+        bf = Boolean(False)
+        vx = Variable('x')
+        vy = Variable('y')
+
+        # Initialize some expressions
+        #
+        e1n = And(n1, n2)
+        e1b = And(bt, bf)
+        e1v = And(vx, vy)
+        e1e = And(e1n, e1v)
+
+        # Evaluate the expressions and check the plain values match
+        # those of the evaluate() results
+        #
+        env = dict([
+            ('x', Number(5.2)),
+            ('y', Number(3.4))])
+        expected = [True, False, True, True]
+        for e, value in zip([e1n, e1b, e1v, e1e], expected):
+            self.assertEqual(value, e.evaluate_value(env))
+            self.assertIs(type(value), type(e.evaluate_value(env)))
+            self.assertEqual(e.evaluate(env).value, e.evaluate_value(env))
+
     def test_and_init(self):
         """Check And.__init__()."""
         # Initialize some numbers, bools, values
@@ -570,6 +632,38 @@ class ExpressionTests(unittest.TestCase):
     # Boolean tests
     # -------------------------------------------------------------------------+
 
+    def test_boolean_canonical(self):
+        """Check there is only one true and one false Boolean."""
+        import copy
+        import pickle
+
+        # Booleans of various values
+        #
+        b1t = Boolean(True)
+        b1f = Boolean(False)
+        b2t = Boolean(Number(0))
+        b2f = Boolean(0)
+
+        # Check the objects are shared
+        #
+        self.assertIs(TRUE, b1t)
+        self.assertIs(FALSE, b1f)
+        self.assertIs(TRUE, b2t)
+        self.assertIs(FALSE, b2f)
+        self.assertIs(TRUE, copy.copy(b1t))
+        self.assertIs(FALSE, copy.deepcopy(b1f))
+        self.assertIs(TRUE, pickle.loads(pickle.dumps(b1t)))
+
+        # Check comparisons and logic produce the shared objects
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        self.assertIs(TRUE, LessThan(n1, n2).evaluate({}))
+        self.assertIs(FALSE, GreaterThan(n1, n2).evaluate({}))
+        self.assertIs(TRUE, And(b1t, b2t).evaluate({}))
+        self.assertIs(FALSE, Or(b1f, b2f).evaluate({}))
+        self.assertIs(TRUE, Not(b1f).evaluate({}))
+
     def test_boolean_eq(self):
         """Check Boolean.__eq__()."""
         # Booleans of various values
@@ -612,6 +706,11 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(b1t, b1te)
         self.assertEqual(b1f, b1fe)
 
+    def test_boolean_evaluate_value(self):
+        """Check Boolean.evaluate_value()."""
+        self.assertIs(True, Boolean(True).evaluate_value({}))
+        self.assertIs(False, Boolean(False).evaluate_value({}))
+
     def test_boolean_init(self):
         """Check Boolean.__init__()."""
         # Booleans of various values
@@ -775,6 +874,36 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(Number(5.2 / 3.4), a1ve)
         self.assertEqual(Number((1 / 2) / (5.2 / 3.4)), a1ee)
 
+    def test_divide_evaluate_value(self):
+        """Check Divide.evaluate_value()."""
+        # Initialize some numbers, bools, values
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        bt = Boolean(True)
+        vx = Variable('x')
+        vy = Variable('y')
+
+        # Initialize some expressions
+        #
+        e1n = Divide(n1, n2)
+        e1b = Divide(bt, bt)
+        e1v = Divide(vx, vy)
+        e1e = Divide(e1n, e1v)
+
+        # Evaluate the expressions and check the plain values match
+        # those of the evaluate() results
+        #
+        env = dict([
+            ('x', Number(5.2)),
+            ('y', Number(3.4))])
+        expected = [
+            (1 / 2), (True / True), (5.2 / 3.4), (1 / 2) / (5.2 / 3.4)]
+        for e, value in zip([e1n, e1b, e1v, e1e], expected):
+            self.assertEqual(value, e.evaluate_value(env))
+            self.assertIs(type(value), type(e.evaluate_value(env)))
+            self.assertEqual(e.evaluate(env).value, e.evaluate_value(env))
+
     def test_divide_init(self):
         """Check Divide.__init__()."""
         # Initialize some numbers, bools, values
@@ -1049,6 +1178,36 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(Boolean(3.4 > 5.2), a2ve)
         self.assertEqual(Boolean((5.2 > 3.4) > (1 > 2)), a2ee)
 
+    def test_greaterthan_evaluate_value(self):
+        """Check GreaterThan.evaluate_value()."""
+        # Initialize some numbers, bools, values
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        bt = Boolean(True)
+        bf = Boolean(False)
+        vx = Variable('x')
+        vy = Variable('y')
+
+        # Initialize some expressions
+        #
+        e1n = GreaterThan(n1, n2)
+        e1b = GreaterThan(bt, bf)
+        e1v = GreaterThan(vx, vy)
+        e1e = GreaterThan(e1n, e1v)
+
+        # Evaluate the expressions and check the plain values match
+        # those of the evaluate() results
+        #
+        env = dict([
+            ('x', Number(5.2)),
+            ('y', Number(3.4))])
+        expected = [(1 > 2), (True > False), (5.2 > 3.4), False]
+        for e, value in zip([e1n, e1b, e1v, e1e], expected):
+            self.assertEqual(value, e.evaluate_value(env))
+            self.assertIs(type(value), type(e.evaluate_value(env)))
+            self.assertEqual(e.evaluate(env).value, e.evaluate_value(env))
+
     def test_greaterthan_init(self):
         """Check GreaterThan.__init__()."""
         # Initialize some numbers, bools, values
@@ -1330,6 +1489,36 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(Boolean(3.4 < 5.2), a2ve)
         self.assertEqual(Boolean((5.2 < 3.4) < (1 < 2)), a2ee)
 
+    def test_lessthan_evaluate_value(self):
+        """Check LessThan.evaluate_value()."""
+        # Initialize some numbers, bools, values
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        bt = Boolean(True)
+        bf = Boolean(False)
+        vx = Variable('x')
+        vy = Variable('y')
+
+        # Initialize some expressions
+        #
+        e1n = LessThan(n1, n2)
+        e1b = LessThan(bt, bf)
+        e1v = LessThan(vx, vy)
+        e1e = LessThan(e1n, e1v)
+
+        # Evaluate the expressions and check the plain values match
+        # those of the evaluate() results
+        #
+        env = dict([
+            ('x', Number(5.2)),
+            ('y', Number(3.4))])
+        expected = [(1 < 2), (True < False), (5.2 < 3.4), False]
+        for e, value in zip([e1n, e1b, e1v, e1e], expected):
+            self.assertEqual(value, e.evaluate_value(env))
+            self.assertIs(type(value), type(e.evaluate_value(env)))
+            self.assertEqual(e.evaluate(env).value, e.evaluate_value(env))
+
     def test_lessthan_init(self):
         """Check LessThan.__init__()."""
         # Initialize some numbers, bools, values
@@ -1590,6 +1779,37 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(Number(5.2 * 3.4), a1ve)
         self.assertEqual(Number((1 * 2) * (5.2 * 3.4)), a1ee)
 
+    def test_multiply_evaluate_value(self):
+        """Check Multiply.evaluate_value()."""
+        # Initialize some numbers, bools, values
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        bt = Boolean(True)
+        bf = Boolean(False)
+        vx = Variable('x')
+        vy = Variable('y')
+
+        # Initialize some expressions
+        #
+        e1n = Multiply(n1, n2)
+        e1b = Multiply(bt, bf)
+        e1v = Multiply(vx, vy)
+        e1e = Multiply(e1n, e1v)
+
+        # Evaluate the expressions and check the plain values match
+        # those of the evaluate() results
+        #
+        env = dict([
+            ('x', Number(5.2)),
+            ('y', Number(3.4))])
+        expected = [
+            (1 * 2), (True * False), (5.2 * 3.4), (1 * 2) * (5.2 * 3.4)]
+        for e, value in zip([e1n, e1b, e1v, e1e], expected):
+            self.assertEqual(value, e.evaluate_value(env))
+            self.assertIs(type(value), type(e.evaluate_value(env)))
+            self.assertEqual(e.evaluate(env).value, e.evaluate_value(env))
+
     def test_multiply_init(self):
         """Check Multiply.__init__()."""
         # Initialize some numbers, bools, values
@@ -1863,6 +2083,16 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(Boolean(not env['y']), a1vye)
         self.assertEqual(Boolean(not not env['x']), a1ee)
 
+    def test_not_evaluate_value(self):
+        """Check Not.evaluate_value()."""
+        env = dict([('x', Number(0)), ('y', Boolean(True))])
+        for e, value in [
+                (Not(Boolean(True)), False), (Not(Number(0)), True),
+                (Not(Variable('x')), True), (Not(Variable('y')), False),
+                (Not(Not(Number(2.5))), True)]:
+            self.assertIs(value, e.evaluate_value(env))
+            self.assertEqual(e.evaluate(env).value, e.evaluate_value(env))
+
     def test_not_init(self):
         """Check Not.__init__()."""
         # Initialize some numbers, bools, values
@@ -2063,6 +2293,42 @@ class ExpressionTests(unittest.TestCase):
     # Number tests
     # -------------------------------------------------------------------------+
 
+    def test_number_box(self):
+        """Check box() wraps plain values as Numbers and Booleans."""
+        self.assertIs(TRUE, box(True))
+        self.assertIs(FALSE, box(False))
+        self.assertIs(number(3), box(3))
+        self.assertEqual(Number(2.5), box(2.5))
+        self.assertEqual(Number(10 ** 9), box(10 ** 9))
+
+    def test_number_cache(self):
+        """Check number() shares small integer Numbers."""
+        # Check the cache bounds
+        #
+        self.assertIs(number(0), number(0))
+        self.assertIs(number(SMALL_NUMBER_MIN), number(SMALL_NUMBER_MIN))
+        self.assertIs(number(SMALL_NUMBER_MAX), number(SMALL_NUMBER_MAX))
+        self.assertIsNot(
+            number(SMALL_NUMBER_MIN - 1), number(SMALL_NUMBER_MIN - 1))
+        self.assertIsNot(
+            number(SMALL_NUMBER_MAX + 1), number(SMALL_NUMBER_MAX + 1))
+
+        # Check only int values are shared, and types are kept
+        #
+        self.assertIsNot(number(1.0), number(1.0))
+        self.assertIsInstance(number(1.0).value, float)
+        self.assertIs(True, number(True).value)
+        self.assertEqual(Number(3), number(3))
+
+        # Check arithmetic produces the shared objects
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        self.assertIs(number(3), Add(n1, n2).evaluate({}))
+        self.assertIs(number(-1), Subtract(n1, n2).evaluate({}))
+        self.assertIs(number(2), Multiply(n1, n2).evaluate({}))
+        self.assertEqual(Number(0.5), Divide(n1, n2).evaluate({}))
+
     def test_number_eq(self):
         """Check Number.__eq__()."""
         # Some numbers of various value
@@ -2148,6 +2414,13 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(n127, n127e)
         self.assertEqual(nm127, nm127e)
 
+    def test_number_evaluate_value(self):
+        """Check Number.evaluate_value()."""
+        self.assertIs(int, type(Number(3).evaluate_value({})))
+        self.assertEqual(3, Number(3).evaluate_value({}))
+        self.assertIs(float, type(Number(3.0).evaluate_value({})))
+        self.assertEqual(-2.5, Number(-2.5).evaluate_value({}))
+
     def test_number_init(self):
         """Check Number.__init__()."""
         # Some numbers of various value
@@ -2390,6 +2663,36 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(Boolean(True or True), a1b2e)
         self.assertEqual(Boolean(False or False), a1b3e)
 
+    def test_or_evaluate_value(self):
+        """Check Or.evaluate_value()."""
+        # Initialize some numbers, bools, values
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        bt = Boolean(True)
+        bf = Boolean(False)
+        vx = Variable('x')
+        vy = Variable('y')
+
+        # Initialize some expressions
+        #
+        e1n = Or(n1, n2)
+        e1b = Or(bt, bf)
+        e1v = Or(vx, vy)
+        e1e = Or(e1n, e1v)
+
+        # Evaluate the expressions and check the plain values match
+        # those of the evaluate() results
+        #
+        env = dict([
+            ('x', Number(5.2)),
+            ('y', Number(3.4))])
+        expected = [True, True, True, True]
+        for e, value in zip([e1n, e1b, e1v, e1e], expected):
+            self.assertEqual(value, e.evaluate_value(env))
+            self.assertIs(type(value), type(e.evaluate_value(env)))
+            self.assertEqual(e.evaluate(env).value, e.evaluate_value(env))
+
     def test_or_init(self):
         """Check Or.__init__()."""
         # Initialize some numbers, bools, values
@@ -2643,6 +2946,37 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(Number(5.2 - 3.4), a1ve)
         self.assertEqual(Number((1 - 2) - (5.2 - 3.4)), a1ee)
 
+    def test_subtract_evaluate_value(self):
+        """Check Subtract.evaluate_value()."""
+        # Initialize some numbers, bools, values
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        bt = Boolean(True)
+        bf = Boolean(False)
+        vx = Variable('x')
+        vy = Variable('y')
+
+        # Initialize some expressions
+        #
+        e1n = Subtract(n1, n2)
+        e1b = Subtract(bt, bf)
+        e1v = Subtract(vx, vy)
+        e1e = Subtract(e1n, e1v)
+
+        # Evaluate the expressions and check the plain values match
+        # those of the evaluate() results
+        #
+        env = dict([
+            ('x', Number(5.2)),
+            ('y', Number(3.4))])
+        expected = [
+            (1 - 2), (True - False), (5.2 - 3.4), (1 - 2) - (5.2 - 3.4)]
+        for e, value in zip([e1n, e1b, e1v, e1e], expected):
+            self.assertEqual(value, e.evaluate_value(env))
+            self.assertIs(type(value), type(e.evaluate_value(env)))
+            self.assertEqual(e.evaluate(env).value, e.evaluate_value(env))
+
     def test_subtract_init(self):
         """Check Subtract.__init__()."""
         # Initialize some numbers, bools, values
@@ -2903,6 +3237,18 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual(Number(10), vce)
         self.assertEqual(Number(3.0), vse)
 
+    def test_variable_evaluate_value(self):
+        """Check Variable.evaluate_value()."""
+        env = dict([
+            ('x', Boolean(True)),
+            ('abcde', Number(2.7)),
+            ('1two', Number(-12))])
+
+        self.assertIs(True, Variable('x').evaluate_value(env))
+        self.assertEqual(2.7, Variable('abcde').evaluate_value(env))
+        self.assertEqual(-12, Variable('1two').evaluate_value(env))
+        self.assertRaises(KeyError, Variable('y').evaluate_value, env)
+
     def test_variable_init(self):
         """Check Variable.__init__()."""
         # Some variables of various names
@@ -3038,3 +3384,42 @@ class ExpressionTests(unittest.TestCase):
         self.assertEqual("e['one_two']", vup)
         self.assertEqual("e['OneTwo']", vcp)
         self.assertEqual("e['one two']", vsp)
+
+    # -------------------------------------------------------------------------+
+    # Node layout tests
+    # -------------------------------------------------------------------------+
+
+    def test_slots(self):
+        """Check expression objects carry no per-instance dictionary."""
+        expressions = [
+            Add(Number(1), Number(2)), And(Boolean(True), Boolean(False)),
+            Boolean(True), Divide(Number(1), Number(2)),
+            GreaterThan(Number(1), Number(2)), LessThan(Number(1), Number(2)),
+            Multiply(Number(1), Number(2)), Not(Boolean(True)), Number(1),
+            Or(Boolean(True), Boolean(False)), Subtract(Number(1), Number(2)),
+            Variable('x')]
+        for expression in expressions:
+            self.assertFalse(hasattr(expression, '__dict__'))
+            with self.assertRaises(AttributeError):
+                expression.unknown = 1
+
+    def test_hash(self):
+        """Check equal expressions hash alike, so they can be deduplicated."""
+        def expressions():
+            x = Variable('x')
+            return [
+                Add(x, Number(1)), And(x, Boolean(True)), Boolean(True),
+                Divide(x, Number(2)), GreaterThan(x, Number(1)),
+                LessThan(x, Number(2)), Multiply(x, Number(1)), Not(x),
+                Number(1), Or(x, Boolean(False)), Subtract(x, Number(2)),
+                Variable('x'), Multiply(Add(x, Number(1)), Add(x, Number(1)))]
+
+        for first, second in zip(expressions(), expressions()):
+            self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len(expressions()), len(set(expressions())))
+        self.assertEqual(
+            len(expressions()), len(set(expressions() + expressions())))
+        self.assertEqual(hash(Number(1)), hash(Number(1.0)))
+        self.assertNotEqual(
+            hash(Add(Variable('x'), Variable('y'))),
+            hash(Add(Variable('y'), Variable('x'))))
@@ -0,0 +1,278 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_folding."""
+
+import unittest
+import os
+import time
+
+from simple.simple_expressions import Add, And, Boolean, Divide, \
+    LessThan, Multiply, Not, Number, Or, Subtract, Variable, FALSE, TRUE
+from simple.simple_folding import fold_constants, fold_expression, \
+    MAX_FOLDED_BITS
+from simple.simple_statements import Assign, Block, If, Sequence, While
+
+
+class FoldingTests(unittest.TestCase):
+
+    """Tests for module simple.simple_folding."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # folding tests
+    # -------------------------------------------------------------------------+
+
+    def _assert_value(self, expected, node):
+        """Assert a node is a constant of the expected value and type."""
+        self.assertIsInstance(node, (Boolean, Number))
+        self.assertIs(type(expected), type(node.value))
+        self.assertEqual(expected, node.value)
+
+    def test_fold_expression(self):
+        """Test folding the constant parts of expressions."""
+        x = Variable('x')
+        self.assertEqual(
+            Add(Number(6), x),
+            fold_expression(Add(Multiply(Number(2), Number(3)), x)))
+        self._assert_value(7, fold_expression(
+            Subtract(Number(10), Number(3))))
+        self._assert_value(True, fold_expression(
+            LessThan(Number(1), Number(2))))
+        self._assert_value(True, fold_expression(Not(Number(0))))
+
+        # Operands are not regrouped
+        #
+        expression = Add(Add(x, Number(2)), Number(3))
+        self.assertIs(expression, fold_expression(expression))
+
+    def test_fold_expression_types(self):
+        """Test folding keeps int, float and bool results apart."""
+        self._assert_value(3.0, fold_expression(
+            Add(Number(1), Number(2.0))))
+        self._assert_value(2.0, fold_expression(
+            Divide(Number(4), Number(2))))
+        self._assert_value(2, fold_expression(
+            Add(Boolean(True), Number(1))))
+        self._assert_value(-0.0, fold_expression(
+            Multiply(Number(-1), Number(0.0))))
+        self.assertEqual('-0.0', str(fold_expression(
+            Multiply(Number(-1), Number(0.0)))))
+
+    def test_fold_expression_logic(self):
+        """Test folding decided logical operations."""
+        y = Variable('y')
+        self.assertIs(FALSE, fold_expression(And(Boolean(False), y)))
+        self.assertIs(TRUE, fold_expression(Or(Number(1), y)))
+        self.assertIs(TRUE, fold_expression(And(Number(2), Number(3))))
+
+        # A left operand that does not decide leaves the right to be read
+        #
+        expression = And(Boolean(True), y)
+        self.assertIs(expression, fold_expression(expression))
+
+    def test_fold_expression_errors(self):
+        """Test operations that raise or grow large are left alone."""
+        expression = Divide(Number(1), Number(0))
+        self.assertIs(expression, fold_expression(expression))
+        with self.assertRaises(ZeroDivisionError):
+            Assign('x', fold_expression(expression)).evaluate({})
+
+        big = Number(2 ** MAX_FOLDED_BITS)
+        expression = Multiply(big, big)
+        self.assertIs(expression, fold_expression(expression))
+
+    def test_fold_expression_constants(self):
+        """Test substituting known variables."""
+        self.assertEqual(
+            Add(Number(5), Variable('y')),
+            fold_expression(
+                Add(Multiply(Variable('x'), Number(5)), Variable('y')),
+                dict(x=Number(1))))
+
+    def test_straight_line(self):
+        """Test propagating constants through straight-line code."""
+        program = Block([
+            Assign('x', Number(2)),
+            Assign('y', Multiply(Variable('x'), Number(3))),
+            Assign('z', Add(Variable('y'), Variable('w'))),
+            Assign('x', Variable('w')),
+            Assign('v', Variable('x'))])
+        self.assertEqual(
+            Block([
+                Assign('x', Number(2)),
+                Assign('y', Number(6)),
+                Assign('z', Add(Number(6), Variable('w'))),
+                Assign('x', Variable('w')),
+                Assign('v', Variable('x'))]),
+            fold_constants(program))
+
+    def test_loop_invariant(self):
+        """Test propagating constants into and past a loop."""
+        program = Sequence(
+            Block([Assign('i', Number(0)), Assign('limit', Number(24))]),
+            Sequence(
+                While(
+                    LessThan(Variable('i'), Variable('limit')),
+                    Assign('i', Add(Variable('i'), Number(1)))),
+                Assign('j', Variable('limit'))))
+        self.assertEqual(
+            Sequence(
+                Block([Assign('i', Number(0)), Assign('limit', Number(24))]),
+                Sequence(
+                    While(
+                        LessThan(Variable('i'), Number(24)),
+                        Assign('i', Add(Variable('i'), Number(1)))),
+                    Assign('j', Number(24)))),
+            fold_constants(program))
+
+    def test_loop_assigned(self):
+        """Test a variable the loop changes is not known in it."""
+        program = Block([
+            Assign('x', Number(1)),
+            Assign('y', Number(1)),
+            While(
+                LessThan(Variable('i'), Number(5)),
+                Block([
+                    Assign('z', Add(Variable('x'), Variable('y'))),
+                    Assign('y', Number(1)),
+                    Assign('x', Number(2)),
+                    Assign('i', Add(Variable('i'), Number(1)))])),
+            Assign('w', Variable('y'))])
+        folded = fold_constants(program)
+        self.assertEqual(
+            Assign('z', Add(Variable('x'), Number(1))),
+            folded.statements[2].body.statements[0])
+        self.assertEqual(Assign('w', Number(1)), folded.statements[3])
+
+    def test_if(self):
+        """Test propagating constants past an if statement."""
+        def program(consequence, alternative, condition=Variable('c')):
+            return Block([
+                If(condition, Assign('x', consequence),
+                   Assign('x', alternative)),
+                Assign('y', Variable('x'))])
+
+        folded = fold_constants(program(Number(1), Number(1)))
+        self.assertEqual(Assign('y', Number(1)), folded.statements[1])
+        for alternative in (Number(2), Number(1.0), Boolean(True)):
+            folded = fold_constants(program(Number(1), alternative))
+            self.assertEqual(
+                Assign('y', Variable('x')), folded.statements[1])
+
+        # A constant condition decides the branch taken
+        #
+        folded = fold_constants(program(Number(1), Number(2), Not(FALSE)))
+        self.assertIs(TRUE, folded.statements[0].condition)
+        self.assertEqual(Assign('y', Number(1)), folded.statements[1])
+        folded = fold_constants(program(Number(1), Number(2), Number(1)))
+        self.assertEqual(Assign('y', Number(2)), folded.statements[1])
+
+    def test_while_never_runs(self):
+        """Test a loop whose condition is constant and not true."""
+        program = Block([
+            Assign('x', Number(1)),
+            While(Boolean(False), Assign('x', Number(2))),
+            Assign('y', Variable('x'))])
+        self.assertEqual(
+            Assign('y', Number(1)), fold_constants(program).statements[2])
+
+    def test_unchanged(self):
+        """Test nodes with nothing to fold are shared."""
+        program = While(
+            LessThan(Variable('i'), Variable('n')),
+            Assign('i', Add(Variable('i'), Number(1))))
+        self.assertIs(program, fold_constants(program))
+
+    def test_same_results(self):
+        """Test folded programs leave the same environments."""
+        program = Block([
+            Assign('n', Add(Number(3), Number(4))),
+            Assign('half', Divide(Number(1), Number(2))),
+            Assign('x', Number(0)),
+            While(
+                LessThan(Variable('i'), Variable('n')),
+                Block([
+                    Assign('x', Add(Variable('x'), Variable('half'))),
+                    If(And(Variable('t'), LessThan(Number(1), Number(2))),
+                       Assign('i', Add(Variable('i'), Number(1))),
+                       Assign('i', Add(Variable('i'), Number(2))))]))])
+        folded = fold_constants(program)
+        self.assertNotEqual(program, folded)
+        for t in (Boolean(True), Boolean(False)):
+            env = dict(i=Number(0), t=t)
+            expected = program.evaluate(env)
+            actual = folded.evaluate(env)
+            self.assertEqual(expected, actual)
+            for name, value in expected.items():
+                self.assertIs(type(value.value), type(actual[name].value))
+
+    def test_long_block_linear(self):
+        """Test folding time grows linearly with a block's length."""
+        def block(count):
+            statements = []
+            for k in range(count // 2):
+                statements.append(Assign('c{0}'.format(k), Number(k)))
+                statements.append(Assign('v{0}'.format(k), Add(
+                    Variable('x'), Variable('c{0}'.format(k)))))
+            return Block(statements)
+
+        def seconds(program):
+            best = None
+            for _ in range(3):
+                started = time.perf_counter()
+                fold_constants(program)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            return best
+
+        small, large = block(8000), block(32000)
+        folded = fold_constants(large)
+        self.assertEqual(
+            Assign('v15999', Add(Variable('x'), Number(15999))),
+            folded.statements[-1])
+
+        # Four times the statements should take about four times as
+        # long; copying the known constants at every assignment made it
+        # more than thirteen times
+        #
+        self.assertLess(seconds(large), 9 * seconds(small))
@@ -0,0 +1,164 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_fusion."""
+
+import unittest
+import os
+
+from simple.simple_engines import compile_program, ENGINES
+from simple.simple_environments import MutableEnvironment, \
+    PersistentEnvironment
+from simple.simple_expressions import Add, Boolean, Divide, GreaterThan, \
+    LessThan, Multiply, Number, Subtract, Variable, number
+from simple.simple_fusion import AssignCopy, AssignVariableConstant, \
+    AssignVariables, fuse
+from simple.simple_quickening import GreaterThanVariableConstant, \
+    LessThanVariables
+from simple.simple_statements import Assign, If, Sequence
+from tests.simple.fixtures import phi_env, phi_env_inputs
+
+
+class FusionTests(unittest.TestCase):
+
+    """Tests for module simple.simple_fusion."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # fuse tests
+    # -------------------------------------------------------------------------+
+
+    def test_fuse(self):
+        """Check fuse() replaces each shape with its fused node."""
+        s1 = phi_env()
+        f1 = fuse(s1)
+
+        self.assertEqual(s1, f1)
+        self.assertEqual(str(s1), str(f1))
+        self.assertIs(LessThanVariables, type(f1.condition))
+        self.assertEqual(
+            [AssignVariableConstant, AssignCopy, AssignCopy, AssignVariables,
+             AssignVariables],
+            [type(s) for s in f1.body.statements])
+        self.assertIs(s1.body.statements[0].expression,
+                      f1.body.statements[0].expression)
+
+    def test_fuse_other_shapes(self):
+        """Check other shapes are left as they are."""
+        va = Variable('a')
+        cases = [
+            (Assign('r', Number(1)), Assign),
+            (Assign('r', Add(Number(1), va)), Assign),
+            (Assign('r', Add(va, Add(va, va))), Assign),
+            (Assign('r', Subtract(va, Number(2))), AssignVariableConstant),
+            (Assign('r', GreaterThan(va, Number(2))), Assign),
+            (If(GreaterThan(va, Number(2)), Assign('r', va), Assign('r', va)),
+             If)]
+
+        for s1, cls in cases:
+            self.assertIs(cls, type(fuse(s1)), str(s1))
+        self.assertIs(
+            GreaterThanVariableConstant, type(fuse(cases[4][0]).expression))
+        self.assertIs(LessThan, type(fuse(LessThan(Number(1), va))))
+
+    def test_fuse_evaluate(self):
+        """Check fused statements match tree evaluation."""
+        va = Variable('a')
+        vb = Variable('b')
+        envs = [
+            dict(a=Number(6), b=Number(3)),
+            dict(a=Number(2.5), b=Number(10 ** 20)),
+            dict(a=Boolean(True), b=Number(-2))]
+        cases = [(phi_env(), [phi_env_inputs(10)])] + [
+            (s1, envs) for s1 in (
+                Assign('r', va),
+                Sequence(Assign('a', Add(va, Number(1))), Assign('b', va)),
+                Assign('r', Subtract(va, vb)),
+                Assign('r', Multiply(va, Number(2.5))),
+                Assign('r', Divide(va, vb)),
+                Assign('r', Divide(va, Number(4))),
+                Assign('r', Add(va, vb)))]
+
+        for s1, envs in cases:
+            f1 = fuse(s1)
+            for env in envs:
+                for e in (env, PersistentEnvironment(env)):
+                    expected = s1.evaluate(e)
+                    result = f1.evaluate(e)
+                    self.assertEqual(expected, result, str(s1))
+                    self.assertIs(type(expected), type(result), str(s1))
+                for cls in (dict, MutableEnvironment):
+                    e1 = cls(env)
+                    e2 = cls(env)
+                    s1.execute(e1)
+                    f1.execute(e2)
+                    self.assertEqual(dict(e1), dict(e2), str(s1))
+
+        f2 = fuse(Assign('r', Add(va, Number(1))))
+        self.assertIs(number(5), f2.evaluate(dict(a=Number(4)))['r'])
+
+    def test_fuse_errors(self):
+        """Check fused statements raise the errors the tree walker does."""
+        va = Variable('a')
+        f1 = fuse(Assign('r', Divide(va, Number(0))))
+        f2 = fuse(Assign('r', Divide(va, Variable('b'))))
+
+        self.assertRaises(
+            ZeroDivisionError, f1.evaluate, dict(a=Number(1)))
+        self.assertRaises(
+            ZeroDivisionError, f2.evaluate, dict(a=Number(1), b=Number(0)))
+        for s1 in (Assign('r', va), Assign('r', Add(va, Number(1))),
+                   Assign('r', Add(Variable('b'), va))):
+            with self.assertRaises(KeyError) as context:
+                fuse(s1).evaluate(dict(b=Number(1)))
+            self.assertEqual(('a',), context.exception.args, str(s1))
+
+    def test_fuse_engines(self):
+        """Check every engine runs a fused program the same way."""
+        env = phi_env_inputs(300)
+        expected = phi_env().evaluate(env)
+
+        for engine in ENGINES:
+            self.assertEqual(
+                expected,
+                compile_program(fuse(phi_env()), engine).evaluate(env),
+                engine)
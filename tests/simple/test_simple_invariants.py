@@ -0,0 +1,241 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_invariants."""
+
+import unittest
+import os
+
+from simple.simple_engines import compile_program, ENGINES
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_expressions import Add, And, Divide, LessThan, Multiply, \
+    Number, Variable
+from simple.simple_invariants import hoist_invariants
+from simple.simple_limits import Limits
+from simple.simple_statements import Assign, Block, Delete, DoNothing, If, \
+    While
+from simple.simple_subexpressions import TEMPORARY_PREFIX
+from tests.simple.fixtures import example
+
+
+class InvariantTests(unittest.TestCase):
+
+    """Tests for module simple.simple_invariants."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+
+    # -------------------------------------------------------------------------+
+    # loop-invariant code motion tests
+    # -------------------------------------------------------------------------+
+
+    def _count(self, limit, body):
+        """Produce a loop running body with i counting up to limit."""
+        return While(
+            LessThan(Variable('i'), limit),
+            Block(body + [Assign('i', Add(Variable('i'), Number(1)))]))
+
+    def _temporary(self, number):
+        """Produce a read of a temporary."""
+        return Variable(TEMPORARY_PREFIX + str(number))
+
+    def test_hoist(self):
+        """Test hoisting from a loop's condition and body."""
+        t0 = self._temporary(0)
+        t1 = self._temporary(1)
+        nm = Multiply(Variable('n'), Variable('m'))
+        ab = Multiply(Variable('a'), Variable('b'))
+        statement = self._count(nm, [
+            Assign('x', Add(Variable('x'), ab))])
+        self.assertEqual(
+            Block([
+                Assign(t0.name, nm),
+                If(LessThan(Variable('i'), t0), Block([
+                    Assign(t1.name, ab),
+                    self._count(t0, [Assign('x', Add(Variable('x'), t1))]),
+                    Delete([t1.name])]),
+                   DoNothing()),
+                Delete([t0.name])]),
+            hoist_invariants(statement))
+
+    def test_variant(self):
+        """Test that operations on variables the loop assigns stay."""
+        statement = self._count(Number(10), [
+            Assign('x', Add(Variable('x'), Variable('a'))),
+            Assign('y', Multiply(Variable('x'), Variable('b'))),
+            Assign('z', Multiply(Variable('i'), Variable('b')))])
+        self.assertIs(statement, hoist_invariants(statement))
+
+    def test_outermost(self):
+        """Test hoisting the outermost of nested invariant operations."""
+        t0 = self._temporary(0)
+        abc = Add(Multiply(Variable('a'), Variable('b')), Variable('c'))
+        statement = self._count(Number(10), [
+            Assign('x', Multiply(Variable('x'), abc)),
+            Assign('y', abc)])
+        self.assertEqual(
+            If(LessThan(Variable('i'), Number(10)), Block([
+                Assign(t0.name, abc),
+                self._count(Number(10), [
+                    Assign('x', Multiply(Variable('x'), t0)),
+                    Assign('y', t0)]),
+                Delete([t0.name])]), DoNothing()),
+            hoist_invariants(statement))
+
+    def test_not_always_computed(self):
+        """Test operations the loop may not compute are not hoisted."""
+        ab = Divide(Variable('a'), Variable('b'))
+        unchanged = [
+            self._count(Number(10), [
+                If(Variable('p'), Assign('x', ab), DoNothing())]),
+            self._count(Number(10), [
+                Assign('x', And(
+                    LessThan(Variable('i'), Number(5)),
+                    LessThan(ab, Number(1))))]),
+            self._count(Number(10), [
+                While(Variable('p'), DoNothing()), Assign('x', ab)])]
+        for statement in unchanged:
+            self.assertIs(statement, hoist_invariants(statement))
+
+        # Where the operation is also computed unconditionally, every
+        # computation is replaced
+        #
+        t0 = self._temporary(0)
+        statement = self._count(Number(10), [
+            If(Variable('p'), Assign('x', ab), DoNothing()),
+            Assign('y', ab)])
+        self.assertEqual(
+            If(LessThan(Variable('i'), Number(10)), Block([
+                Assign(t0.name, ab),
+                self._count(Number(10), [
+                    If(Variable('p'), Assign('x', t0), DoNothing()),
+                    Assign('y', t0)]),
+                Delete([t0.name])]), DoNothing()),
+            hoist_invariants(statement))
+
+    def test_errors(self):
+        """Test that a loop that never runs raises nothing new."""
+        statement = self._count(Variable('n'), [
+            Assign('x', Add(Variable('x'), Divide(Variable('a'), Number(0)))),
+            Assign('y', Multiply(Variable('u'), Variable('v')))])
+        optimized = hoist_invariants(statement)
+        self.assertIsNot(statement, optimized)
+        env = dict(i=Number(5), n=Number(5), a=Number(1), x=Number(0))
+        for engine in sorted(ENGINES):
+            self.assertEqual(
+                env, compile_program(optimized, engine).evaluate(dict(env)))
+        env['n'] = Number(6)
+        with self.assertRaises(ZeroDivisionError):
+            optimized.evaluate(dict(env))
+
+        # Nor does a condition whose right operand may not be computed
+        #
+        statement = While(
+            And(Variable('p'), LessThan(
+                Variable('i'), Divide(Variable('a'), Number(0)))),
+            Assign('i', Add(Variable('i'), Number(1))))
+        self.assertIs(statement, hoist_invariants(statement))
+
+    def test_nested(self):
+        """Test hoisting out of an inner loop's condition, then the outer."""
+        t0 = self._temporary(0)
+        t1 = self._temporary(1)
+        nm = Multiply(Variable('n'), Variable('m'))
+
+        def inner(limit):
+            return While(
+                LessThan(Variable('j'), limit),
+                Assign('j', Add(Variable('j'), Number(1))))
+
+        statement = self._count(Number(3), [Assign('j', Number(0)), inner(nm)])
+        self.assertEqual(
+            If(LessThan(Variable('i'), Number(3)), Block([
+                Assign(t1.name, nm),
+                self._count(Number(3), [
+                    Assign('j', Number(0)),
+                    Block([
+                        Assign(t0.name, t1), inner(t0),
+                        Delete([t0.name])])]),
+                Delete([t1.name])]), DoNothing()),
+            hoist_invariants(statement))
+
+    def test_temporary_names(self):
+        """Test that temporaries avoid the names the program uses."""
+        t0 = self._temporary(0)
+        ab = Multiply(Variable('a'), Variable('b'))
+        statement = self._count(Number(10), [Assign(t0.name, ab)])
+        optimized = hoist_invariants(statement)
+        self.assertEqual(
+            Assign(TEMPORARY_PREFIX + '1', ab),
+            optimized.consequence.statements[0])
+
+    def test_phi(self):
+        """Test that the phi example, whose loop has no invariants, stays."""
+        statement = example("phi")
+        self.assertIs(statement, hoist_invariants(statement))
+
+    def test_engines(self):
+        """Test that every engine runs the optimized program alike."""
+        statement = self._count(Multiply(Variable('n'), Number(2)), [
+            Assign('x', Add(Variable('x'), Multiply(
+                Variable('a'), Variable('b'))))])
+        optimized = hoist_invariants(statement)
+        for n in (0, 3, 150):
+            env = dict(i=Number(0), n=Number(n), a=Number(2), b=Number(5),
+                       x=Number(0))
+            expected = statement.evaluate(dict(env))
+            for engine in sorted(ENGINES):
+                result = compile_program(optimized, engine).evaluate(env)
+                self.assertEqual(expected, result, engine)
+                result = compile_program(optimized, engine).evaluate(
+                    PersistentEnvironment(env))
+                self.assertEqual(expected, dict(result.items()), engine)
+
+    def test_temporaries_deleted(self):
+        """Test that temporaries are not left in the environment."""
+        statement = self._count(Multiply(Variable('n'), Number(2)), [
+            Assign('x', Add(Variable('x'), Multiply(
+                Variable('a'), Variable('b'))))])
+        optimized = hoist_invariants(statement)
+        env = dict(i=Number(0), n=Number(3), a=Number(2), b=Number(5),
+                   x=Number(0))
+        limits = Limits(variables=len(env))
+        for engine in sorted(ENGINES):
+            result = compile_program(optimized, engine, limits).evaluate(env)
+            self.assertEqual(set(env), set(result), engine)
@@ -0,0 +1,285 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_limits."""
+
+import unittest
+import os
+
+import asyncio
+
+from simple.simple_async import evaluate_async
+from simple.simple_engines import compile_program, ENGINES
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_expressions import Add, LessThan, Multiply, Number, \
+    Variable, number
+from simple.simple_limits import Check, govern, Governor, hooks, \
+    LimitExceeded, Limits
+from simple.simple_machine import Machine
+from simple.simple_scheduler import Scheduler
+from simple.simple_statements import Assign, Sequence, While
+
+
+class LimitsTests(unittest.TestCase):
+
+    """Tests for module simple.simple_limits."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # limits tests
+    # -------------------------------------------------------------------------+
+
+    def _powers(self):
+        """Produce a loop that multiplies x by 3, n times."""
+        vi = Variable('i')
+        return Sequence(
+            Assign('x', Number(1)),
+            While(
+                LessThan(vi, Variable('n')),
+                Sequence(
+                    Assign('x', Multiply(Variable('x'), Number(3))),
+                    Assign('i', Add(vi, Number(1))))))
+
+    def _env(self, n):
+        """Produce the inputs of the powers loop."""
+        return dict(i=number(0), n=number(n))
+
+    def test_govern(self):
+        """Test the placing of checks in a program."""
+        governor = Governor(Limits())
+        governed = govern(self._powers(), governor)
+        loop = governed.second
+        self.assertIsInstance(loop.body.first, Check)
+        self.assertIsNone(loop.body.first.name)
+        self.assertEqual('x', loop.body.second.first.second.name)
+        self.assertEqual(
+            'x = 1; while (i < n) { check; x = x * 3; check x; '
+            'i = i + 1; }',
+            str(governed))
+
+        # Additions are not measured
+        #
+        self.assertEqual(
+            Assign('i', Add(Variable('i'), Number(1))),
+            govern(Assign('i', Add(Variable('i'), Number(1))), governor))
+
+    def test_hooks(self):
+        """Test the governor methods offered to compiled code."""
+        governor = Governor(Limits())
+        self.assertEqual({}, hooks(self._powers()))
+        names = hooks(govern(self._powers(), governor))
+        self.assertEqual(
+            {'iterate', 'lease', 'measure', 'settle'}, set(names))
+
+    def test_governor(self):
+        """Test the counting of iterations, leased or not."""
+        governor = Governor(Limits(iterations=600))
+        governor.start({})
+        for _ in range(10):
+            governor.iterate()
+        leased = governor.lease()
+        self.assertEqual(11 + leased, governor.iterations)
+        governor.settle(leased - 5)
+        self.assertEqual(16, governor.iterations)
+        for _ in range(584):
+            governor.iterate()
+        self.assertEqual(600, governor.iterations)
+        with self.assertRaises(LimitExceeded):
+            governor.lease()
+
+        # A countdown left negative by the lease that raised hands back
+        # nothing
+        #
+        governor.settle(-1)
+        self.assertEqual(601, governor.iterations)
+
+        # Starting a run starts the count over
+        #
+        governor.start({})
+        self.assertEqual(0, governor.iterations)
+        governor.iterate()
+        self.assertEqual(1, governor.iterations)
+
+    def test_disassemble(self):
+        """Test the listing of checks in bytecode."""
+        program = compile_program(
+            self._powers(), 'bytecode', Limits()).program
+        listing = program.disassemble()
+        self.assertEqual(
+            ['CHECK', 'CHECK x'],
+            [line.split(None, 1)[1].strip() for line in listing
+             if 'CHECK' in line])
+
+    def test_unlimited(self):
+        """Test that programs without limits run as before."""
+        for engine in ENGINES:
+            program = compile_program(self._powers(), engine, Limits())
+            environment = program.evaluate(self._env(50))
+            self.assertEqual(Number(3 ** 50), environment['x'], engine)
+            self.assertEqual(Number(50), environment['i'], engine)
+
+    def test_iterations(self):
+        """Test the iterations limit in every engine."""
+        for engine in ENGINES:
+            program = compile_program(
+                self._powers(), engine, Limits(iterations=500))
+            program.evaluate(self._env(500))
+            with self.assertRaises(LimitExceeded) as context:
+                program.evaluate(self._env(1000))
+            error = context.exception
+            self.assertEqual('iterations', error.limit, engine)
+            self.assertEqual(500, error.maximum, engine)
+            self.assertEqual(Number(500), error.environment['i'], engine)
+            self.assertEqual(
+                Number(3 ** 500), error.environment['x'], engine)
+
+    def test_bits(self):
+        """Test the bit-length limit in every engine."""
+        for engine in ENGINES:
+            program = compile_program(
+                self._powers(), engine, Limits(bits=160))
+            with self.assertRaises(LimitExceeded) as context:
+                program.evaluate(self._env(1000))
+            error = context.exception
+            self.assertEqual('bits', error.limit, engine)
+
+            # 3 ** 101 is the first power longer than 160 bits; the
+            # check follows its assignment, before i is incremented
+            #
+            self.assertEqual(Number(100), error.environment['i'], engine)
+            self.assertEqual(
+                Number(3 ** 101), error.environment['x'], engine)
+
+    def test_variables(self):
+        """Test the environment-size limit in every engine."""
+        for engine in ENGINES:
+            program = compile_program(
+                self._powers(), engine, Limits(variables=3))
+            self.assertEqual(3, len(program.evaluate(self._env(10))))
+            with self.assertRaises(LimitExceeded) as context:
+                program.evaluate(dict(self._env(10), y=Number(0)))
+            error = context.exception
+            self.assertEqual('variables', error.limit, engine)
+            self.assertEqual(4, len(error.environment), engine)
+
+            # The program adds x
+            #
+            program = compile_program(
+                self._powers(), engine, Limits(variables=2))
+            with self.assertRaises(LimitExceeded) as context:
+                program.evaluate(self._env(10))
+            environment = context.exception.environment
+            self.assertEqual(Number(3 ** 10), environment['x'], engine)
+
+            # An environment too large from the start is rejected at once
+            #
+            with self.assertRaises(LimitExceeded) as context:
+                program.evaluate(dict(self._env(10), y=Number(0)))
+            self.assertNotIn('x', context.exception.environment)
+
+    def test_seconds(self):
+        """Test the wall-clock limit in every engine."""
+        forever = While(
+            LessThan(Variable('i'), Number(1)),
+            Assign('x', Add(Variable('x'), Number(1))))
+        for engine in ENGINES:
+            program = compile_program(forever, engine, Limits(seconds=0.01))
+            with self.assertRaises(LimitExceeded) as context:
+                program.evaluate(dict(i=number(0), x=number(0)))
+            error = context.exception
+            self.assertEqual('seconds', error.limit, engine)
+            self.assertGreater(error.environment['x'].value, 0, engine)
+
+    def test_persistent_environment(self):
+        """Test that the partial state is of the kind passed in."""
+        for engine in ENGINES:
+            program = compile_program(
+                self._powers(), engine, Limits(iterations=5))
+            with self.assertRaises(LimitExceeded) as context:
+                program.evaluate(PersistentEnvironment(self._env(10)))
+            environment = context.exception.environment
+            self.assertIsInstance(environment, PersistentEnvironment)
+            self.assertEqual(Number(5), environment['i'], engine)
+
+    def test_reuse(self):
+        """Test that each run starts its count afresh."""
+        program = compile_program(
+            self._powers(), 'bytecode', Limits(iterations=10))
+        for _ in range(3):
+            self.assertEqual(
+                Number(10), program.evaluate(self._env(10))['i'])
+
+    def test_machine(self):
+        """Test a governed program on the reduction machine."""
+        governor = Governor(Limits(iterations=5))
+        machine = Machine(govern(self._powers(), governor), self._env(10))
+        governor.start(machine.environment)
+        with self.assertRaises(LimitExceeded) as context:
+            machine.run()
+        self.assertEqual(Number(5), context.exception.environment['i'])
+        self.assertFalse(machine.finished)
+
+    def test_async(self):
+        """Test the limits of a program run in the event loop."""
+        with self.assertRaises(LimitExceeded) as context:
+            asyncio.run(evaluate_async(
+                self._powers(), self._env(10), statements=3,
+                limits=Limits(iterations=5)))
+        self.assertEqual(Number(5), context.exception.environment['i'])
+
+    def test_scheduler(self):
+        """Test that a program over its limits fails alone."""
+        scheduler = Scheduler(quantum=3)
+        limited = scheduler.submit(
+            self._powers(), self._env(10), limits=Limits(iterations=5))
+        free = scheduler.submit(self._powers(), self._env(10))
+        scheduler.run()
+        self.assertIsInstance(limited.exception(), LimitExceeded)
+        self.assertEqual(Number(3 ** 10), free.result()['x'])
+
+    def test_str(self):
+        """Test the string forms of limits and errors."""
+        self.assertEqual(
+            'Limits(iterations=5, variables=None, bits=64, seconds=None)',
+            repr(Limits(iterations=5, bits=64)))
+        self.assertEqual(
+            'bits limit of 64 exceeded', str(LimitExceeded('bits', 64)))
@@ -0,0 +1,191 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_machine."""
+
+import unittest
+import os
+
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_expressions import Add, And, Boolean, Divide, \
+    GreaterThan, LessThan, Multiply, Not, Number, Or, Subtract, Variable
+from simple.simple_fusion import fuse
+from simple.simple_machine import Machine, reduce, reducible
+from simple.simple_statements import Assign, Block, Delete, DoNothing, If, \
+    Sequence
+from tests.simple.fixtures import phi_env, phi_env_inputs
+
+
+class MachineTests(unittest.TestCase):
+
+    """Tests for module simple.simple_machine."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # machine tests
+    # -------------------------------------------------------------------------+
+
+    def test_reduce(self):
+        """Check reduce() takes one small step at a time."""
+        e1 = Multiply(Add(Variable('x'), Number(1)), Variable('y'))
+        env = dict(x=Number(2), y=Number(5))
+        steps = [e1]
+        while reducible(steps[-1]):
+            steps.append(reduce(steps[-1], env))
+
+        self.assertEqual([
+            "x + 1 * y", "2 + 1 * y", "3 * y", "3 * 5", "15"],
+            [str(e) for e in steps])
+        self.assertEqual(e1.evaluate(env), steps[-1])
+        self.assertFalse(reducible(Boolean(True)))
+        self.assertFalse(reducible(Number(1)))
+        self.assertTrue(reducible(Variable('x')))
+
+    def test_reduce_expressions(self):
+        """Check reduced expressions match evaluate()."""
+        va = Variable('a')
+        vb = Variable('b')
+        expressions = [
+            Add(va, vb), Subtract(va, vb), Multiply(va, Number(3)),
+            Divide(va, vb), LessThan(va, vb), GreaterThan(va, vb),
+            And(va, vb), Or(va, vb), Not(va), Not(LessThan(va, vb)),
+            And(Or(va, Boolean(False)), Not(vb))]
+
+        for env in (dict(a=Number(6), b=Number(4)),
+                    dict(a=Number(0), b=Number(2.5)),
+                    dict(a=Boolean(False), b=Boolean(True))):
+            for e1 in expressions:
+                e2 = e1
+                while reducible(e2):
+                    e2 = reduce(e2, env)
+                self.assertEqual(e1.evaluate(env), e2, str(e1))
+                self.assertIs(type(e1.evaluate(env)), type(e2), str(e1))
+
+    def test_reduce_short_circuit(self):
+        """Check And and Or do not reduce a right operand they skip."""
+        vm = Variable('missing')
+        for e1, value in ((And(Boolean(False), vm), False),
+                          (And(Number(0), vm), False),
+                          (Or(Boolean(True), vm), True),
+                          (Or(Number(1), vm), True)):
+            self.assertIs(Boolean(value), reduce(e1, {}), str(e1))
+
+    def test_machine(self):
+        """Check a machine run to completion matches evaluate()."""
+        va = Variable('a')
+        statements = [
+            phi_env(),
+            fuse(phi_env()),
+            Sequence(Assign('a', Number(1)), Assign('b', Add(va, va))),
+            If(LessThan(va, Number(1)), Assign('a', Number(1)), DoNothing()),
+            If(va, Assign('a', Number(1)), Assign('a', Number(2))),
+            Sequence(Assign('t', Number(1)), Delete(['t', 'a'])),
+            Block([]),
+            DoNothing()]
+
+        for s1 in statements:
+            env = dict(phi_env_inputs(20), a=Number(0))
+            for env in (env, PersistentEnvironment(env)):
+                m1 = Machine(s1, env)
+                self.assertTrue(m1.run(), str(s1))
+                self.assertTrue(m1.finished, str(s1))
+                self.assertEqual(s1.evaluate(env), m1.environment, str(s1))
+                self.assertIs(type(env), type(m1.environment), str(s1))
+                self.assertEqual(Number(0), env['i'])
+
+    def test_machine_budget(self):
+        """Check a machine pauses when its budget runs out and resumes."""
+        s1 = phi_env()
+        env = phi_env_inputs(10)
+        m1 = Machine(s1, env)
+        m1.run()
+        m2 = Machine(s1, env)
+
+        self.assertFalse(m2.run(7))
+        self.assertEqual(7, m2.steps)
+        self.assertFalse(m2.finished)
+        slices = 1
+        while not m2.run(7):
+            slices += 1
+            self.assertEqual(7 * slices, m2.steps)
+        self.assertEqual(m1.steps, m2.steps)
+        self.assertEqual(m1.environment, m2.environment)
+        self.assertTrue(m2.run(7))
+        self.assertFalse(m2.step())
+        self.assertEqual(m1.steps, m2.steps)
+        self.assertTrue(Machine(s1, env).run(m1.steps))
+        self.assertFalse(Machine(s1, env).run(m1.steps - 1))
+        self.assertFalse(Machine(s1, env).run(0))
+
+    def test_machine_steps(self):
+        """Check each step does a bounded amount of work."""
+        m1 = Machine(Assign('x', Add(Variable('x'), Number(1))),
+                     dict(x=Number(1)))
+
+        self.assertEqual("x = x + 1; {'x': «1»}", str(m1))
+        states = []
+        while m1.step():
+            states.append(str(m1.statement))
+        self.assertEqual(["x = 1 + 1;", "x = 2;", "do-nothing"], states)
+        self.assertEqual(Number(2), m1.environment['x'])
+
+    def test_machine_long_block(self):
+        """Check a block of many statements is run one step at a time."""
+        count = 50000
+        s1 = Block([Assign('x', Add(Variable('x'), Number(1)))] * count)
+        m1 = Machine(s1, dict(x=Number(0)))
+
+        self.assertFalse(m1.run(count))
+        self.assertTrue(m1.run())
+        self.assertEqual(Number(count), m1.environment['x'])
+
+    def test_machine_unbound(self):
+        """Check reading an unassigned variable raises KeyError."""
+        s1 = Sequence(Assign('a', Number(1)), Assign('b', Variable('c')))
+        m1 = Machine(s1, {})
+
+        with self.assertRaises(KeyError) as context:
+            m1.run()
+        self.assertEqual(('c',), context.exception.args)
+        self.assertEqual(Number(1), m1.environment['a'])
+        self.assertFalse(m1.finished)
+        self.assertRaises(KeyError, m1.run)
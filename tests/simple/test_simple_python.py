@@ -0,0 +1,226 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_python."""
+
+import unittest
+import os
+import warnings
+
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_engines import compile_program
+from simple.simple_expressions import Add, And, Boolean, Divide, \
+    GreaterThan, LessThan, Multiply, Not, Number, Or, Subtract, Variable
+from simple.simple_limits import Limits
+from simple.simple_python import compile_python, is_boolean, \
+    local_name, PythonProgram
+from simple.simple_statements import Assign, Block, DoNothing, If, \
+    Sequence, While
+from tests.simple.fixtures import phi_env, phi_env_inputs
+
+
+class PythonTests(unittest.TestCase):
+
+    """Tests for module simple.simple_python."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # compile_python tests
+    # -------------------------------------------------------------------------+
+
+    def test_compile_python(self):
+        """Check compile_python() produces a PythonProgram."""
+        s1 = phi_env()
+        pp = compile_python(s1)
+
+        self.assertIsInstance(pp, PythonProgram)
+        self.assertIs(s1, pp.statement)
+        self.assertEqual(('i', 'limit', 'x0', 'x1', 'x2', 'phi'), pp.names)
+        self.assertEqual(str(s1), str(pp))
+        self.assertEqual("«{0}»".format(s1), repr(pp))
+        self.assertIn("    while (v_i) < (v_limit):\n", pp.source)
+        self.assertIn("        v_phi = (v_x2) / (v_x1)\n", pp.source)
+        self.assertNotIn("e[", pp.source)
+
+    def test_python_source(self):
+        """Check conditions and logic translate to match evaluate()."""
+        vt = Variable('t')
+        vf = Variable('f')
+        s1 = Block([
+            If(vt, Assign('a', And(vt, vf)), DoNothing()),
+            While(Or(LessThan(vt, vf), Not(vf)), Assign('t', Boolean(False))),
+            While(Number(1), DoNothing())])
+        source = compile_python(s1).source
+
+        self.assertIn("    if (v_t) is True:\n", source)
+        self.assertIn("        v_a = bool((v_t) and (v_f))\n", source)
+        self.assertIn("    while ((v_t) < (v_f)) or (not (v_f)):\n", source)
+        self.assertIn("    while False:\n", source)
+
+    def test_python_helpers(self):
+        """Check is_boolean() and local_name()."""
+        vt = Variable('t')
+
+        self.assertTrue(is_boolean(Boolean(True)))
+        self.assertTrue(is_boolean(LessThan(vt, Number(1))))
+        self.assertTrue(is_boolean(And(Not(vt), GreaterThan(vt, vt))))
+        self.assertFalse(is_boolean(vt))
+        self.assertFalse(is_boolean(Or(Boolean(True), vt)))
+        self.assertFalse(is_boolean(Add(Number(1), Number(2))))
+        self.assertEqual("v_if", local_name('if'))
+
+    def test_python_evaluate_phi(self):
+        """Check the phi loop matches tree evaluation."""
+        pp = compile_python(phi_env())
+
+        for limit in (0, 1, 2, 50):
+            env = phi_env_inputs(limit)
+            ppe = pp.evaluate(env)
+            self.assertEqual(phi_env().evaluate(env), ppe)
+            self.assertEqual(phi_env_inputs(limit), env)
+
+        self.assertIsInstance(ppe['i'].value, int)
+        self.assertIsInstance(ppe['phi'].value, float)
+
+    def test_python_evaluate_persistent(self):
+        """Check a PersistentEnvironment produces a PersistentEnvironment."""
+        pp = compile_python(phi_env())
+        pe = PersistentEnvironment(phi_env_inputs(10))
+
+        ppe = pp.evaluate(pe)
+        self.assertIsInstance(ppe, PersistentEnvironment)
+        self.assertEqual(phi_env().evaluate(phi_env_inputs(10)), ppe)
+        self.assertEqual(Number(0), pe['i'])
+
+    def test_python_evaluate_expressions(self):
+        """Check every expression matches tree evaluation."""
+        va = Variable('a')
+        vb = Variable('b')
+        vt = Variable('t')
+        vf = Variable('f')
+        expressions = [
+            Add(va, vb), Add(va, Number(1)), Subtract(va, vb),
+            Multiply(va, Number(3)), Divide(va, vb), Divide(vb, Number(4)),
+            LessThan(va, vb), LessThan(vb, va), GreaterThan(va, vb),
+            GreaterThan(va, Number(2)), And(vt, vf), And(vt, vt),
+            And(vt, va), Or(vf, vf), Or(vf, vt), Or(vf, va), Not(vt),
+            Not(vf), Boolean(True), Number(2.5), Add(vt, va)]
+        env = dict(
+            a=Number(7), b=Number(2), t=Boolean(True), f=Boolean(False))
+
+        for e in expressions:
+            s1 = Assign('r', e)
+            expected = s1.evaluate(env)['r']
+            actual = compile_python(s1).evaluate(env)['r']
+            self.assertEqual(expected, actual, str(e))
+            self.assertIs(type(expected.value), type(actual.value), str(e))
+            if isinstance(expected, Boolean):
+                self.assertIs(expected, actual, str(e))
+
+    def test_python_evaluate_statements(self):
+        """Check every statement matches tree evaluation."""
+        va = Variable('a')
+        statements = [
+            DoNothing(),
+            Block([]),
+            Sequence(Assign('a', Number(1)), Assign('b', va)),
+            Block([Assign('a', Number(1)), Assign('b', Add(va, va))]),
+            If(Boolean(True), Assign('a', Number(1)), DoNothing()),
+            If(Boolean(False), DoNothing(), Assign('a', Number(2))),
+            If(Number(1), Assign('a', Number(1)), Assign('a', Number(2))),
+            If(Or(va, Number(1)), Assign('a', Number(1)), DoNothing()),
+            While(LessThan(va, Number(5)), Assign('a', Add(va, Number(1)))),
+            While(Number(1), Assign('a', Number(9)))]
+
+        for s1 in statements:
+            env = dict(a=Number(0))
+            self.assertEqual(
+                s1.evaluate(env), compile_python(s1).evaluate(env), str(s1))
+
+    def test_python_constant_conditions(self):
+        """Check constant conditions compile without warnings."""
+        conditions = [
+            Add(Number(1), Number(2)),
+            Divide(Number(4), Number(2)),
+            Multiply(Number(2 ** 100), Number(2 ** 100)),
+            And(Number(1), Boolean(True))]
+
+        for condition in conditions:
+            s1 = If(condition, Assign('b', Number(1)), Assign('b', Number(2)))
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")
+                p1 = compile_python(s1)
+            self.assertEqual(s1.evaluate({}), p1.evaluate({}), str(s1))
+        self.assertIn("    if True:\n", p1.source)
+
+    def test_python_evaluate_unbound(self):
+        """Check unassigned variables stay absent or raise KeyError."""
+        s1 = If(
+            Variable('c'),
+            Assign('a', Number(1)),
+            Assign('b', Number(2)))
+
+        ppe = compile_python(s1).evaluate(dict(c=Boolean(False)))
+        self.assertEqual(dict(b=Number(2), c=Boolean(False)), ppe)
+
+        self.assertRaises(
+            KeyError, compile_python(Assign('b', Variable('a'))).evaluate,
+            dict())
+        self.assertRaises(
+            KeyError,
+            compile_python(Assign('b', Add(Variable('a'), Number(1)))
+                           ).evaluate,
+            dict())
+
+    def test_python_evaluate_unbound_once(self):
+        """Check a program reading an unbound variable runs only once."""
+        i = Variable('i')
+        s1 = Sequence(
+            While(LessThan(i, Number(8)), Assign('i', Add(i, Number(1)))),
+            Assign('b', Variable('a')))
+
+        # Running the loop twice would exceed the limit
+        #
+        program = compile_program(s1, 'python', Limits(iterations=12))
+        with self.assertRaises(KeyError) as context:
+            program.evaluate(dict(i=Number(0)))
+        self.assertEqual('a', context.exception.args[0])
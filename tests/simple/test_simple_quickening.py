@@ -0,0 +1,211 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_quickening."""
+
+import unittest
+import os
+
+from simple.simple_expressions import Add, Boolean, Divide, GreaterThan, \
+    LessThan, Multiply, Number, Subtract, Variable, number
+from simple.simple_fusion import AssignCopy, AssignVariableConstant, \
+    AssignVariables, fuse
+from simple.simple_quickening import AdaptiveAdd, AdaptiveLessThan, \
+    AddIntVariableConstant, AddIntVariables, GreaterThanVariableConstant, \
+    LessThanVariables, MultiplyIntVariableConstant, quicken, \
+    SubtractIntVariables
+from simple.simple_statements import Assign, Block, DoNothing, If, \
+    Sequence, While
+from tests.simple.fixtures import phi_env, phi_env_inputs
+
+
+class QuickeningTests(unittest.TestCase):
+
+    """Tests for module simple.simple_quickening."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # quicken tests
+    # -------------------------------------------------------------------------+
+
+    def test_quicken(self):
+        """Check quicken() replaces nodes with adaptive variants."""
+        s1 = phi_env()
+        q1 = quicken(s1)
+
+        self.assertEqual(s1, q1)
+        self.assertEqual(str(s1), str(q1))
+        self.assertIs(LessThan, type(s1.condition))
+        self.assertIs(AdaptiveLessThan, type(q1.condition))
+        self.assertIs(AdaptiveAdd, type(q1.body.statements[0].expression))
+        self.assertIs(Divide, type(q1.body.statements[4].expression))
+        self.assertIs(s1.body.statements[1], q1.body.statements[1])
+
+    def test_quicken_specializes(self):
+        """Check evaluation rewrites the adaptive nodes' classes."""
+        q1 = quicken(phi_env())
+        q1.evaluate(phi_env_inputs(3))
+
+        self.assertIs(LessThanVariables, type(q1.condition))
+        self.assertIs(
+            AddIntVariableConstant, type(q1.body.statements[0].expression))
+        self.assertIs(
+            AddIntVariables, type(q1.body.statements[3].expression))
+        self.assertEqual(
+            phi_env().evaluate(phi_env_inputs(30)),
+            q1.evaluate(phi_env_inputs(30)))
+
+    def test_quicken_shapes(self):
+        """Check each operator specializes by its operands' shape."""
+        va = Variable('a')
+        vb = Variable('b')
+        env = dict(a=Number(7), b=Number(2), c=Number(2.5))
+        cases = [
+            (Subtract(va, vb), SubtractIntVariables),
+            (Multiply(va, Number(3)), MultiplyIntVariableConstant),
+            (GreaterThan(va, Number(2.5)), GreaterThanVariableConstant),
+            (Add(va, Variable('c')), Add),
+            (Add(va, Number(2.5)), Add),
+            (Add(Number(1), va), Add),
+            (LessThan(Number(1), va), LessThan)]
+
+        for e, cls in cases:
+            q1 = quicken(Assign('r', e))
+            self.assertEqual(
+                Assign('r', e).evaluate(env), q1.evaluate(env), str(e))
+            self.assertIs(cls, type(q1.expression), str(e))
+
+    def test_quicken_falls_back(self):
+        """Check a wrong int guess falls back to the generic node."""
+        va = Variable('a')
+        vb = Variable('b')
+        q1 = quicken(Assign('r', Add(va, vb)))
+        q2 = quicken(Assign('r', Multiply(va, Number(2))))
+        q3 = quicken(Assign('r', Add(va, Add(vb, Number(1)))))
+
+        for q in (q1, q2, q3):
+            q.evaluate(dict(a=Number(1), b=Number(2)))
+        self.assertIs(AddIntVariables, type(q1.expression))
+        self.assertIs(MultiplyIntVariableConstant, type(q2.expression))
+        self.assertIs(AddIntVariableConstant, type(q3.expression.right))
+
+        env = dict(a=Number(1.5), b=Boolean(True))
+        for q in (q1, q2, q3):
+            self.assertEqual(
+                Assign('r', q.expression).evaluate(env)['r'],
+                q.evaluate(env)['r'])
+        self.assertEqual(Number(2.5), q1.evaluate(env)['r'])
+        self.assertIs(Add, type(q1.expression))
+        self.assertIs(Multiply, type(q2.expression))
+        self.assertEqual(Number(3.5), q3.evaluate(env)['r'])
+        self.assertIs(AddIntVariableConstant, type(q3.expression.right))
+
+    def test_quicken_small_numbers(self):
+        """Check specialized nodes box small ints as shared Numbers."""
+        q1 = quicken(Assign('r', Add(Variable('a'), Number(1))))
+
+        q1.evaluate(dict(a=Number(1)))
+        self.assertIs(number(5), q1.evaluate(dict(a=Number(4)))['r'])
+        self.assertIs(number(-5), q1.evaluate(dict(a=Number(-6)))['r'])
+        self.assertEqual(
+            Number(10 ** 6), q1.evaluate(dict(a=Number(10 ** 6 - 1)))['r'])
+
+    def test_quicken_evaluate_statements(self):
+        """Check every statement matches tree evaluation."""
+        va = Variable('a')
+        statements = [
+            Sequence(Assign('a', Number(1)), Assign('b', Add(va, va))),
+            If(LessThan(va, Number(1)), Assign('a', Number(1)), DoNothing()),
+            While(LessThan(va, Number(5)), Assign('a', Add(va, Number(1)))),
+            While(
+                GreaterThan(Number(10), va),
+                Block([
+                    Assign('b', Multiply(va, va)),
+                    Assign('a', Subtract(Add(va, Number(3)), Number(1)))]))]
+
+        for s1 in statements:
+            env = dict(a=Number(0))
+            q1 = quicken(s1)
+            self.assertEqual(s1.evaluate(env), q1.evaluate(env), str(s1))
+            self.assertEqual(s1.evaluate(env), q1.evaluate(env), str(s1))
+            e1 = dict(env)
+            s1.execute(e1)
+            e2 = dict(env)
+            q1.execute(e2)
+            self.assertEqual(e1, e2, str(s1))
+
+    def test_quicken_unbound(self):
+        """Check unassigned variables raise KeyError."""
+        q1 = quicken(Assign('b', Add(Variable('a'), Number(1))))
+
+        self.assertRaises(KeyError, q1.evaluate, dict())
+        self.assertIs(AdaptiveAdd, type(q1.expression))
+        q1.evaluate(dict(a=Number(1)))
+        self.assertRaises(KeyError, q1.evaluate, dict())
+
+    def test_quicken_fused(self):
+        """Check quickening keeps the fused nodes of simple_fusion."""
+        va = Variable('a')
+        vi = Variable('i')
+        f1 = fuse(While(
+            LessThan(vi, Variable('n')),
+            Block([
+                Assign('i', Add(vi, Number(1))),
+                Assign('b', va),
+                Assign('a', Multiply(va, vi)),
+                Assign('c', Add(Multiply(va, Number(2)), vi))])))
+        q1 = quicken(f1)
+
+        self.assertIs(LessThanVariables, type(q1.condition))
+        self.assertEqual(
+            [AssignVariableConstant, AssignCopy, AssignVariables, Assign],
+            [type(statement) for statement in q1.body.statements])
+        self.assertIs(f1.body.statements[0], q1.body.statements[0])
+        self.assertIs(AdaptiveAdd, type(q1.body.statements[3].expression))
+
+        env = dict(a=Number(1), i=Number(0), n=Number(5))
+        self.assertEqual(f1.evaluate(env), q1.evaluate(env))
+
+        # A program with nothing left to quicken is shared
+        #
+        f2 = Block(f1.body.statements[:3])
+        self.assertIs(f2, quicken(f2))
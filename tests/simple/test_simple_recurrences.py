@@ -0,0 +1,193 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_recurrences."""
+
+import unittest
+import os
+
+from simple.simple_elimination import eliminate_dead_code
+from simple.simple_environments import MutableEnvironment, \
+    PersistentEnvironment
+from simple.simple_expressions import Add, Boolean, Divide, LessThan, \
+    Multiply, Number, Subtract, Variable
+from simple.simple_limits import govern, Governor, Limits
+from simple.simple_recurrences import accelerate_loops, AcceleratedWhile, \
+    MIN_ACCELERATED_TRIPS
+from simple.simple_statements import Assign, Block, If, While
+from tests.simple.fixtures import example, phi_env_inputs
+
+
+class RecurrenceTests(unittest.TestCase):
+
+    """Tests for module simple.simple_recurrences."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+
+    # -------------------------------------------------------------------------+
+    # loop acceleration tests
+    # -------------------------------------------------------------------------+
+
+    def _count(self, limit, body, step=1):
+        """Produce a loop running body with i counting up to limit."""
+        return While(
+            LessThan(Variable('i'), limit),
+            Block([Assign('i', Add(Variable('i'), Number(step)))] + body))
+
+    def _check(self, statement, environment):
+        """Check a statement runs alike before and after acceleration."""
+        accelerated = accelerate_loops(statement)
+        expected = statement.evaluate(dict(environment))
+        self.assertEqual(expected, accelerated.evaluate(dict(environment)))
+        mutable = dict(environment)
+        accelerated.execute(mutable)
+        self.assertEqual(expected, mutable)
+        return accelerated
+
+    def test_phi(self):
+        """Test the phi example, once phi is computed after its loop."""
+        statement = example("phi-env")
+        self.assertIs(statement, accelerate_loops(statement))
+        pruned = eliminate_dead_code(statement)
+        accelerated = accelerate_loops(pruned)
+        loop = accelerated.consequence.statements[0]
+        self.assertIsInstance(loop, AcceleratedWhile)
+        self.assertEqual(('i', 'x0', 'x1', 'x2'), loop.names)
+        for limit in (0, 24, 1000, 1001):
+            expected = statement.evaluate(phi_env_inputs(limit))
+            result = accelerated.evaluate(phi_env_inputs(limit))
+            self.assertEqual(expected, result)
+            self.assertIs(type(expected['x2'].value),
+                          type(result['x2'].value))
+
+    def test_affine(self):
+        """Test bodies built from +, - and products with constants."""
+        statement = self._count(Variable('n'), [
+            Assign('a', Add(Multiply(Variable('a'), Number(2)),
+                            Variable('b'))),
+            Assign('b', Subtract(Variable('c'), Multiply(
+                Number(-3), Variable('b')))),
+            Assign('s', Add(Variable('s'), Variable('i')))], step=3)
+        env = dict(i=Number(-5), n=Number(200), a=Number(1), b=Number(2),
+                   c=Number(7), s=Number(0))
+        accelerated = self._check(statement, env)
+        self.assertIsInstance(accelerated, AcceleratedWhile)
+        self.assertEqual(('a', 'b', 'c', 'i', 's'), accelerated.names)
+        self.assertEqual({'a', 'b', 'c', 'i', 's'}, accelerated.inputs)
+
+    def test_not_affine(self):
+        """Test loops that are left alone."""
+        i = Variable('i')
+        n = Variable('n')
+        unchanged = [
+            self._count(n, [Assign('a', Multiply(Variable('a'), i))]),
+            self._count(n, [Assign('a', Divide(Variable('a'), Number(2)))]),
+            self._count(n, [Assign('a', Add(Variable('a'), Number(0.5)))]),
+            self._count(n, [
+                If(Variable('a'), Assign('a', i), Assign('a', n))]),
+            self._count(n, [Assign('n', Add(n, Number(1)))]),
+            self._count(n, [], step=0),
+            self._count(Number(10.5), []),
+            While(LessThan(n, i), Assign('i', Add(i, Number(1)))),
+            While(LessThan(i, n), Assign('i', Add(i, i)))]
+        for statement in unchanged:
+            self.assertIs(statement, accelerate_loops(statement))
+
+        # A loop whose iterations are counted by a governor stays a loop
+        #
+        governed = govern(
+            self._count(n, [Assign('a', Add(Variable('a'), i))]),
+            Governor(Limits(iterations=10)))
+        self.assertNotIsInstance(accelerate_loops(governed), AcceleratedWhile)
+
+    def test_fall_back(self):
+        """Test running as a loop when the jump would not be exact."""
+        statement = self._count(Variable('n'), [
+            Assign('a', Add(Variable('a'), Variable('b'))),
+            Assign('c', Add(Subtract(Variable('d'), Variable('d')),
+                            Variable('a')))])
+        env = dict(i=Number(0), n=Number(100), a=Number(0), b=Number(3),
+                   d=Number(1))
+        self._check(statement, env)
+        for name, value in (('b', Number(0.5)), ('d', Number(2.0)),
+                            ('a', Boolean(True)), ('n', Number(100.0)),
+                            ('i', Number(0.0)),
+                            ('n', Number(MIN_ACCELERATED_TRIPS - 1))):
+            self._check(statement, dict(env, **{name: value}))
+
+        # A variable without a value raises the same error
+        #
+        accelerated = accelerate_loops(statement)
+        for name in ('d', 'n'):
+            without = dict(env)
+            del without[name]
+            with self.assertRaises(KeyError):
+                accelerated.evaluate(without)
+
+        # A variable assigned before it is read needs no value
+        #
+        self.assertNotIn('c', env)
+        self.assertEqual(Number(300), accelerated.evaluate(env)['c'])
+
+    def test_environments(self):
+        """Test persistent and mutable environments."""
+        accelerated = accelerate_loops(eliminate_dead_code(example("phi-env")))
+        expected = example("phi-env").evaluate(phi_env_inputs(100))
+        pe = PersistentEnvironment(phi_env_inputs(100))
+        result = accelerated.evaluate(pe)
+        self.assertIsInstance(result, PersistentEnvironment)
+        self.assertEqual(expected, result)
+        self.assertEqual(Number(0), pe['i'])
+        me = MutableEnvironment(phi_env_inputs(100))
+        accelerated.execute(me)
+        self.assertEqual(expected, dict(me))
+
+    def test_large(self):
+        """Test a trip count no loop could run in reasonable time."""
+        statement = self._count(Variable('n'), [
+            Assign('a', Add(Variable('a'), Number(2))),
+            Assign('b', Subtract(Variable('b'), Variable('a')))])
+        accelerated = accelerate_loops(statement)
+        n = 10 ** 30
+        result = accelerated.evaluate(
+            dict(i=Number(0), n=Number(n), a=Number(0), b=Number(0)))
+        self.assertEqual(Number(n), result['i'])
+        self.assertEqual(Number(2 * n), result['a'])
+        self.assertEqual(Number(-n * (n + 1)), result['b'])
@@ -0,0 +1,128 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_scheduler."""
+
+import unittest
+import os
+
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_expressions import Number, Variable
+from simple.simple_scheduler import Scheduler
+from simple.simple_statements import Assign, Sequence
+from tests.simple.fixtures import phi_env, phi_env_inputs
+
+
+class SchedulerTests(unittest.TestCase):
+
+    """Tests for module simple.simple_scheduler."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # scheduler tests
+    # -------------------------------------------------------------------------+
+
+    def test_scheduler(self):
+        """Check every program's future gets its final environment."""
+        scheduler = Scheduler(quantum=7)
+        s1 = phi_env()
+        envs = [phi_env_inputs(limit) for limit in range(0, 60, 3)]
+        envs.append(PersistentEnvironment(phi_env_inputs(10)))
+        futures = [scheduler.submit(s1, env) for env in envs]
+
+        self.assertEqual(len(envs), len(scheduler))
+        scheduler.run()
+        self.assertEqual(0, len(scheduler))
+        self.assertFalse(scheduler.step())
+        for env, future in zip(envs, futures):
+            self.assertEqual(s1.evaluate(env), future.result())
+            self.assertIs(type(env), type(future.result()))
+
+    def test_scheduler_turns(self):
+        """Check programs take turns in order, by priority."""
+        scheduler = Scheduler(quantum=6)
+        finished = []
+
+        def submit(name, limit, priority=1):
+            scheduler.submit(
+                phi_env(), phi_env_inputs(limit), priority,
+                lambda future: finished.append(name))
+
+        submit("a", 30)
+        submit("b", 10)
+        submit("c", 30, priority=3)
+        submit("d", 30)
+        submit("e", 20)
+
+        self.assertTrue(scheduler.step())
+        self.assertEqual(5, len(scheduler))
+        scheduler.run()
+        self.assertEqual(["b", "c", "e", "a", "d"], finished)
+
+    def test_scheduler_errors(self):
+        """Check errors and cancellations affect only their program."""
+        scheduler = Scheduler(quantum=1)
+        f1 = scheduler.submit(
+            Sequence(Assign('a', Number(1)), Assign('b', Variable('c'))), {})
+        f2 = scheduler.submit(phi_env(), phi_env_inputs(10))
+        f3 = scheduler.submit(phi_env(), phi_env_inputs(10))
+
+        self.assertTrue(f3.cancel())
+        scheduler.run()
+        self.assertIsInstance(f1.exception(), KeyError)
+        self.assertEqual(('c',), f1.exception().args)
+        self.assertEqual(
+            phi_env().evaluate(phi_env_inputs(10)), f2.result())
+        self.assertTrue(f3.cancelled())
+        self.assertRaises(
+            ValueError, scheduler.submit, phi_env(), {}, priority=0)
+
+    def test_scheduler_many(self):
+        """Check thousands of programs run side by side."""
+        scheduler = Scheduler(quantum=50)
+        s1 = phi_env()
+        futures = [scheduler.submit(s1, phi_env_inputs(i % 7))
+                   for i in range(2000)]
+
+        scheduler.run()
+        for i, future in enumerate(futures):
+            self.assertEqual(Number(i % 7), future.result()['i'])
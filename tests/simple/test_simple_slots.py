@@ -0,0 +1,186 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_slots."""
+
+import unittest
+import os
+
+from simple.simple_expressions import Boolean, Number, Variable
+from simple.simple_statements import Assign, Block, Delete, If
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_slots import assign_slots, box_frame, deleted_names, \
+    resolve, ResolvedProgram, SlotAssign, SlotDelete, SlotVariable, \
+    unbox_frame
+from tests.simple.fixtures import phi_env
+
+
+class SlotTests(unittest.TestCase):
+
+    """Tests for module simple.simple_slots."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # resolve tests
+    # -------------------------------------------------------------------------+
+
+    def test_resolve(self):
+        """Check resolve() numbers variables in order of appearance."""
+        rp = resolve(phi_env())
+
+        self.assertIsInstance(rp, ResolvedProgram)
+        self.assertEqual(('i', 'limit', 'x0', 'x1', 'x2', 'phi'), rp.names)
+        self.assertEqual(phi_env(), rp.statement)
+        self.assertEqual(str(phi_env()), str(rp))
+
+        first = rp.statement.body.statements[0]
+        self.assertIsInstance(first, SlotAssign)
+        self.assertEqual(0, first.slot)
+        self.assertIsInstance(first.expression.left, SlotVariable)
+        self.assertEqual(0, first.expression.left.slot)
+        self.assertEqual(5, rp.statement.body.statements[4].slot)
+
+    def test_resolved_evaluate(self):
+        """Check ResolvedProgram.evaluate() matches evaluate()."""
+        env = dict([
+            ('phi', Number(0)),
+            ('x0', Number(0)),
+            ('x1', Number(4567)),
+            ('x2', Number(7654)),
+            ('i', Number(0)),
+            ('limit', Number(24)),
+            ('unused', Boolean(True))])
+        rp = resolve(phi_env())
+
+        rpe = rp.evaluate(env)
+
+        self.assertEqual(phi_env().evaluate(env), rpe)
+        self.assertEqual(Number(0), env['i'])
+        self.assertEqual(Boolean(True), rpe['unused'])
+
+        # show that the program can be reused
+        #
+        env['limit'] = Number(3)
+        self.assertEqual(phi_env().evaluate(env), rp.evaluate(env))
+
+    def test_resolved_evaluate_unbound(self):
+        """Check unassigned variables stay absent or raise KeyError."""
+        va = Variable('a')
+        s1 = If(
+            Variable('c'),
+            Assign('a', Number(1)),
+            Assign('b', Number(2)))
+
+        rpe = resolve(s1).evaluate(dict(c=Boolean(False)))
+        self.assertEqual(dict(b=Number(2), c=Boolean(False)), rpe)
+
+        self.assertRaises(
+            KeyError, resolve(Assign('b', va)).evaluate, dict())
+
+    def test_resolved_evaluate_delete(self):
+        """Check deleted variables are removed from the environment."""
+        s1 = Block([Assign('t', Number(1)), Delete(['t', 'a', 'd'])])
+        rp = resolve(s1)
+
+        self.assertEqual(dict(t=0, a=1, d=2), assign_slots(s1))
+        self.assertEqual(SlotDelete(['t', 'a', 'd'], [0, 1, 2]),
+                         rp.statement.statements[1])
+        self.assertEqual((0, 1, 2), rp.statement.statements[1].slots)
+        self.assertEqual(frozenset(('t', 'a', 'd')), deleted_names(s1))
+        self.assertEqual(
+            dict(b=Number(2)), rp.evaluate(dict(a=Number(1), b=Number(2))))
+
+    def test_slot_variable_evaluate_value(self):
+        """Check SlotVariable.evaluate_value() reads the frame slot."""
+        sv = SlotVariable('b', 1)
+
+        self.assertEqual(2.5, sv.evaluate_value([None, Number(2.5)]))
+        self.assertIs(True, sv.evaluate_value([None, Boolean(True)]))
+        self.assertRaises(KeyError, sv.evaluate_value, [Number(1), None])
+
+    # -------------------------------------------------------------------------+
+    # frame helper tests
+    # -------------------------------------------------------------------------+
+
+    def test_assign_slots(self):
+        """Check assign_slots() numbers names in order of appearance."""
+        self.assertEqual(
+            dict(i=0, limit=1, x0=2, x1=3, x2=4, phi=5),
+            assign_slots(phi_env()))
+        self.assertEqual(dict(), assign_slots(Block([])))
+
+    def test_unbox_frame(self):
+        """Check unbox_frame() produces plain values and None."""
+        env = dict(a=Number(1), b=Boolean(True), c=Number(2.5))
+
+        self.assertEqual([1, True, None], unbox_frame(env, ('a', 'b', 'd')))
+        self.assertEqual(
+            [2.5, 1], unbox_frame(PersistentEnvironment(env), ('c', 'a')))
+
+    def test_box_frame(self):
+        """Check box_frame() produces a new environment of the same kind."""
+        n1 = Number(1000000)
+        env = dict(a=n1, b=Boolean(True))
+        names = ('a', 'b', 'c', 'd')
+
+        new_env = box_frame(env, names, [1000000, False, 2.5, None])
+        self.assertEqual(
+            dict(a=n1, b=Boolean(False), c=Number(2.5)), new_env)
+        self.assertIs(n1, new_env['a'])
+        self.assertIs(Boolean(False), new_env['b'])
+        self.assertEqual(dict(a=n1, b=Boolean(True)), env)
+
+        pe = PersistentEnvironment(env)
+        new_pe = box_frame(pe, names, [7, True, None, None])
+        self.assertIsInstance(new_pe, PersistentEnvironment)
+        self.assertEqual(dict(a=Number(7), b=Boolean(True)), new_pe)
+        self.assertIs(pe, box_frame(pe, names, [1000000, True, None, None]))
+
+        # Deleted variables without a value are removed
+        #
+        deleted = frozenset(('b', 'd'))
+        self.assertEqual(
+            dict(a=n1, c=Number(2.5)),
+            box_frame(env, names, [1000000, None, 2.5, None], deleted))
+        self.assertEqual(
+            dict(a=n1), box_frame(pe, names, [None, None, None, None],
+                                  deleted))
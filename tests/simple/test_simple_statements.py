@@ -8,7 +8,10 @@
 import unittest
 import os
 
-from simple.simple_statements import Assign, If, Sequence, While
+from simple.simple_environments import MutableEnvironment, \
+    PersistentEnvironment
+from simple.simple_statements import Assign, Block, Delete, DoNothing, If, \
+    Sequence, While
 from simple.simple_expressions import Add, Boolean, GreaterThan, LessThan, \
     Number, Subtract, Variable
 
@@ -141,6 +144,36 @@ class StatementTests(unittest.TestCase):
         self.assertEqual(Boolean(1 > 2), ae3e['c'])
         self.assertEqual(Boolean(5.2 > 3.4), ae4e['d'])
 
+    def test_assign_execute(self):
+        """Check Assign.execute()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+
+        statements = [s1, s2, s3, s4, Assign('x', vy)]
+
+        # Execute each statement in place and compare with evaluate()
+        #
+        for statement in statements:
+            env = dict([
+                ('x', Number(5.2)),
+                ('y', Number(3.4))])
+            expected = statement.evaluate(env)
+            self.assertIsNone(statement.execute(env))
+            self.assertEqual(expected, env)
+
     def test_assign_init(self):
         """Check Assign.__init__()."""
         # Initialize some numbers, bools, variables, expressions
@@ -305,6 +338,377 @@ class StatementTests(unittest.TestCase):
         self.assertEqual("e['c'] = (1) > (2)", ae3p)
         self.assertEqual("e['d'] = (e['x']) > (e['y'])", ae4p)
 
+    # -------------------------------------------------------------------------+
+    # Block statement tests
+    # -------------------------------------------------------------------------+
+
+    def test_block_eq(self):
+        """Check Block.__eq__()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+
+        # Initialize some statements
+        #
+        sa1 = Block([s1, s2])
+        sa2 = Block([s1, s2, s3])
+        sa3 = Block([s1, s2, s3, s4])
+        sb1 = Block([s1, s2])
+        sb2 = Block([s1, s2, s3])
+        sb3 = Block([s1, s2, s3, s4])
+
+        # Check equality with itself
+        #
+        self.assertTrue(sa1 == sa1)
+        self.assertTrue(sa2 == sa2)
+        self.assertTrue(sa3 == sa3)
+
+        # Check equality with same value but different objects
+        #
+        self.assertTrue(sa1 == sb1)
+        self.assertTrue(sa2 == sb2)
+        self.assertTrue(sa3 == sb3)
+
+        # Check equality with different value
+        #
+        self.assertFalse(sa1 == sa3)
+        self.assertFalse(sa2 == sa1)
+        self.assertFalse(sa3 == sa2)
+        self.assertFalse(sa1 == Sequence(s1, s2))
+
+    def test_block_evaluate(self):
+        """Check Block.evaluate()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+
+        # Initialize some statements
+        #
+        sa1 = Block([s1, s2])
+        sa2 = Block([s1, s2, s3])
+        sa3 = Block([s1, s2, s3, s4])
+
+        # Evaluate the statements
+        #
+        env = dict([
+            ('x', Number(5.2)),
+            ('y', Number(3.4))])
+        sa1e = sa1.evaluate(env)
+        sa2e = sa2.evaluate(env)
+        sa3e = sa3.evaluate(env)
+
+        # check the results
+        #
+        self.assertIn('a', sa1e)
+        self.assertIn('b', sa1e)
+        self.assertNotIn('c', sa1e)
+        self.assertNotIn('d', sa1e)
+        self.assertEqual(Number(1 + 2), sa1e['a'])
+        self.assertEqual(Number(5.2 + 3.4), sa1e['b'])
+
+        self.assertIn('a', sa2e)
+        self.assertIn('b', sa2e)
+        self.assertIn('c', sa2e)
+        self.assertNotIn('d', sa2e)
+        self.assertEqual(Boolean(1 > 2), sa2e['c'])
+
+        self.assertIn('a', sa3e)
+        self.assertIn('b', sa3e)
+        self.assertIn('c', sa3e)
+        self.assertIn('d', sa3e)
+        self.assertEqual(Boolean(5.2 > 3.4), sa3e['d'])
+
+        self.assertNotIn('a', env)
+
+    def test_block_evaluate_long(self):
+        """Check Block.evaluate() on more statements than the stack."""
+        count = 50000
+        increment = Assign('a', Add(Variable('a'), Number(1)))
+        sa1 = Block([increment] * count)
+
+        env = dict([('a', Number(0))])
+        sa1e = sa1.evaluate(env)
+
+        self.assertEqual(Number(count), sa1e['a'])
+        self.assertEqual(Number(0), env['a'])
+        self.assertTrue(sa1 == Block([increment] * count))
+
+    def test_block_execute(self):
+        """Check Block.execute()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+
+        statements = [Block([s1, s2]), Block([s1, s2, s3, s4]), Block([])]
+
+        # Execute each statement in place and compare with evaluate()
+        #
+        for statement in statements:
+            env = dict([
+                ('x', Number(5.2)),
+                ('y', Number(3.4))])
+            expected = statement.evaluate(env)
+            self.assertIsNone(statement.execute(env))
+            self.assertEqual(expected, env)
+
+    def test_block_init(self):
+        """Check Block.__init__()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+
+        # Initialize some statements
+        #
+        sa1 = Block([s1, s2])
+        sa2 = Block(s for s in [s1, s2, s3, s4])
+        sa3 = Block([])
+
+        # Check the initialization
+        #
+        self.assertEqual((s1, s2), sa1.statements)
+        self.assertEqual((s1, s2, s3, s4), sa2.statements)
+        self.assertEqual((), sa3.statements)
+
+    def test_block_ne(self):
+        """Check Block.__ne__()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+
+        # Initialize some statements
+        #
+        sa1 = Block([s1, s2])
+        sa2 = Block([s1, s2, s3])
+        sa3 = Block([s1, s2, s3, s4])
+        sb1 = Block([s1, s2])
+        sb2 = Block([s1, s2, s3])
+        sb3 = Block([s1, s2, s3, s4])
+
+        # Check inequality with itself
+        #
+        self.assertFalse(sa1 != sa1)
+        self.assertFalse(sa2 != sa2)
+        self.assertFalse(sa3 != sa3)
+
+        # Check equality with same value but different objects
+        #
+        self.assertFalse(sa1 != sb1)
+        self.assertFalse(sa2 != sb2)
+        self.assertFalse(sa3 != sb3)
+
+        # Check equality with different value
+        #
+        self.assertTrue(sa1 != sa3)
+        self.assertTrue(sa2 != sa1)
+        self.assertTrue(sa3 != sa2)
+
+    def test_block_repr(self):
+        """Check Block.__repr__()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+
+        # Initialize some statements
+        #
+        sa1 = Block([s1, s2])
+        sa2 = Block([s1, s2, s3, s4])
+
+        # Check representations
+        #
+        self.assertEqual("«a = 1 + 2; b = x + y;»", repr(sa1))
+        self.assertEqual(
+            "«a = 1 + 2; b = x + y; c = 1 > 2; d = x > y;»", repr(sa2))
+
+    def test_block_str(self):
+        """Check Block.__str__()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+
+        # Initialize some statements
+        #
+        sa1 = Block([s1, s2])
+        sa2 = Block([s1, s2, s3, s4])
+
+        # Check value strings
+        #
+        self.assertEqual("a = 1 + 2; b = x + y;", str(sa1))
+        self.assertEqual(
+            "a = 1 + 2; b = x + y; c = 1 > 2; d = x > y;", str(sa2))
+
+    def test_block_to_python(self):
+        """Check Block.to_python()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+
+        # Initialize some statements
+        #
+        sa1 = Block([s1, s2])
+        sa2 = Block([s1, s2, s3, s4])
+        sa3 = Block([])
+
+        # Produce python code strings
+        #
+        sa1p = sa1.to_python(0)
+        sa2p = sa2.to_python(1)
+        sa3p = sa3.to_python(1)
+
+        # Check representations
+        #
+        self.assertEqual(
+            "e['a'] = (1) + (2)\ne['b'] = (e['x']) + (e['y'])",
+            sa1p)
+        self.assertEqual(
+            "    e['a'] = (1) + (2)\n    e['b'] = (e['x']) + (e['y'])\n"
+            + "    e['c'] = (1) > (2)\n    e['d'] = (e['x']) > (e['y'])",
+            sa2p)
+        self.assertEqual("    pass", sa3p)
+
+    # -------------------------------------------------------------------------+
+    # Delete statement tests
+    # -------------------------------------------------------------------------+
+
+    def test_delete_eq(self):
+        """Check Delete.__eq__()."""
+        sd1 = Delete(['a', 'b'])
+
+        self.assertEqual(Delete(('a', 'b')), sd1)
+        self.assertNotEqual(Delete(['a']), sd1)
+        self.assertNotEqual(Delete(['b', 'a']), sd1)
+        self.assertNotEqual(sd1, DoNothing())
+        self.assertEqual(('a', 'b'), sd1.names)
+
+    def test_delete_evaluate(self):
+        """Check Delete.evaluate() and Delete.execute()."""
+        sd1 = Delete(['a', 'c'])
+        env = dict(a=Number(1), b=Number(2))
+
+        self.assertEqual(dict(b=Number(2)), sd1.evaluate(env))
+        self.assertEqual(dict(a=Number(1), b=Number(2)), env)
+
+        pe = PersistentEnvironment(env)
+        pe1 = sd1.evaluate(pe)
+        self.assertIsInstance(pe1, PersistentEnvironment)
+        self.assertEqual(dict(b=Number(2)), pe1)
+        self.assertEqual(env, pe)
+
+        me = MutableEnvironment(env)
+        self.assertIsNone(sd1.execute(me))
+        self.assertEqual(dict(b=Number(2)), me)
+        self.assertIsNone(sd1.execute(env))
+        self.assertEqual(dict(b=Number(2)), env)
+
+    def test_delete_str(self):
+        """Check Delete.__str__() and Delete.__repr__()."""
+        sd1 = Delete(['a', 'b'])
+
+        self.assertEqual("delete a, b;", str(sd1))
+        self.assertEqual("«delete a, b;»", repr(sd1))
+
+    def test_delete_to_python(self):
+        """Check Delete.to_python()."""
+        self.assertEqual(
+            "    e.pop('a', None)\n    e.pop('b', None)",
+            Delete(['a', 'b']).to_python(1))
+        self.assertEqual("    pass", Delete([]).to_python(1))
+
     # -------------------------------------------------------------------------+
     # If statement tests
     # -------------------------------------------------------------------------+
@@ -439,6 +843,53 @@ class StatementTests(unittest.TestCase):
         self.assertNotIn('d', sa6e)
         self.assertEqual(Number(5.2 + 3.4), sa6e['b'])
 
+    def test_if_evaluate_non_boolean(self):
+        """Check If.evaluate() treats only a true Boolean as true."""
+        s1 = Assign('a', Number(1))
+        s2 = Assign('a', Number(2))
+
+        for condition in [Number(1), Variable('t'), Variable('n')]:
+            env = dict(t=Boolean(1), n=Number(True))
+            expected = Number(1) if condition == Variable('t') else Number(2)
+            self.assertEqual(
+                expected, If(condition, s1, s2).evaluate(env)['a'])
+
+    def test_if_execute(self):
+        """Check If.execute()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+        s5 = Sequence(s1, s2)
+        s6 = Sequence(s3, s4)
+        sa1 = If(e3, s1, s2)
+        sa2 = If(e4, s3, s4)
+
+        statements = [
+            sa1, sa2, If(Boolean(True), s5, s6), If(Boolean(False), s5, s6),
+            If(e3, s5, s6), If(e4, sa1, sa2)]
+
+        # Execute each statement in place and compare with evaluate()
+        #
+        for statement in statements:
+            env = dict([
+                ('x', Number(5.2)),
+                ('y', Number(3.4))])
+            expected = statement.evaluate(env)
+            self.assertIsNone(statement.execute(env))
+            self.assertEqual(expected, env)
+
     def test_if_init(self):
         """Check If.__init__()."""
         # Initialize some numbers, bools, variables, expressions,
@@ -841,6 +1292,60 @@ class StatementTests(unittest.TestCase):
         self.assertEqual(Boolean(1 > 2), sa3e['c'])
         self.assertEqual(Boolean(5.2 > 3.4), sa3e['d'])
 
+    def test_sequence_evaluate_long_chain(self):
+        """Check Sequence.evaluate() on a chain deeper than the stack."""
+        # Build a right-nested chain of increments, longer than the
+        # default recursion limit
+        #
+        count = 5000
+        increment = Assign('a', Add(Variable('a'), Number(1)))
+        chain = increment
+        for _ in range(count - 1):
+            chain = Sequence(increment, chain)
+
+        # Evaluate the chain
+        #
+        env = dict([('a', Number(0))])
+        chaine = chain.evaluate(env)
+
+        # check the results
+        #
+        self.assertEqual(Number(count), chaine['a'])
+        self.assertEqual(Number(0), env['a'])
+
+    def test_sequence_execute(self):
+        """Check Sequence.execute()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n2 = Number(2)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(n1, n2)
+        e2 = Add(vx, vy)
+        e3 = GreaterThan(n1, n2)
+        e4 = GreaterThan(vx, vy)
+        s1 = Assign('a', e1)
+        s2 = Assign('b', e2)
+        s3 = Assign('c', e3)
+        s4 = Assign('d', e4)
+
+        statements = [
+            Sequence(s1, s2),
+            Sequence(Sequence(s1, s2), s3),
+            Sequence(s1, Sequence(s2, Sequence(s3, s4)))]
+
+        # Execute each statement in place and compare with evaluate()
+        #
+        for statement in statements:
+            env = dict([
+                ('x', Number(5.2)),
+                ('y', Number(3.4))])
+            expected = statement.evaluate(env)
+            self.assertIsNone(statement.execute(env))
+            self.assertEqual(expected, env)
+
     def test_sequence_init(self):
         """Check Sequence.__init__()."""
         # Initialize some numbers, bools, variables, expressions,
@@ -1133,6 +1638,61 @@ class StatementTests(unittest.TestCase):
         self.assertEqual(Number(0), sa3e['a'])
         self.assertEqual(Number(0), sa3e['b'])
 
+    def test_while_evaluate_many_iterations(self):
+        """Check While.evaluate() with more iterations than the stack."""
+        # Initialize a counting loop
+        #
+        va = Variable('a')
+        vb = Variable('b')
+        sa1 = While(
+            LessThan(va, Number(20000)),
+            Sequence(
+                Assign('a', Add(va, Number(1))),
+                Assign('b', Add(vb, Number(2)))))
+
+        # Evaluate the loop
+        #
+        env = dict([
+            ('a', Number(0)),
+            ('b', Number(0))])
+        sa1e = sa1.evaluate(env)
+
+        # check the results
+        #
+        self.assertEqual(Number(20000), sa1e['a'])
+        self.assertEqual(Number(40000), sa1e['b'])
+        self.assertEqual(Number(0), env['a'])
+        self.assertEqual(Number(0), env['b'])
+
+    def test_while_execute(self):
+        """Check While.execute()."""
+        # Initialize some numbers, bools, variables, expressions,
+        # statements
+        #
+        n1 = Number(1)
+        n3 = Number(3)
+        vx = Variable('x')
+        vy = Variable('y')
+        e1 = Add(vx, n1)
+        e2 = Add(vy, vx)
+        s1 = Assign('x', e1)
+        s2 = Assign('y', e2)
+
+        statements = [
+            While(LessThan(vx, Add(n3, n3)), Sequence(s1, s2)),
+            While(LessThan(vx, Number(20000)), Block([s1, s2])),
+            While(Boolean(False), s1)]
+
+        # Execute each statement in place and compare with evaluate()
+        #
+        for statement in statements:
+            env = dict([
+                ('x', Number(5.2)),
+                ('y', Number(3.4))])
+            expected = statement.evaluate(env)
+            self.assertIsNone(statement.execute(env))
+            self.assertEqual(expected, env)
+
     def test_while_init(self):
         """Check While.__init__()."""
         # Initialize some numbers, bools, variables, expressions,
@@ -1341,3 +1901,18 @@ class StatementTests(unittest.TestCase):
             + "    e['a'] = (e['a']) + (1)\n"
             + "    e['b'] = (e['b']) + (e['a'])",
             sa3p)
+
+    # -------------------------------------------------------------------------+
+    # Node layout tests
+    # -------------------------------------------------------------------------+
+
+    def test_slots(self):
+        """Check statement objects carry no per-instance dictionary."""
+        s1 = Assign('a', Number(1))
+        statements = [
+            s1, Block([s1]), DoNothing(), If(Boolean(True), s1, s1),
+            Sequence(s1, s1), While(Boolean(False), s1)]
+        for statement in statements:
+            self.assertFalse(hasattr(statement, '__dict__'))
+            with self.assertRaises(AttributeError):
+                statement.unknown = 1
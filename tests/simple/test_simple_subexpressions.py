@@ -0,0 +1,230 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_subexpressions."""
+
+import unittest
+import os
+
+from simple.simple_engines import compile_program, ENGINES
+from simple.simple_environments import PersistentEnvironment
+from simple.simple_expressions import Add, And, Divide, LessThan, Multiply, \
+    Number, Subtract, Variable
+from simple.simple_limits import Limits
+from simple.simple_statements import Assign, Block, Delete, If, Sequence, \
+    While
+from simple.simple_subexpressions import eliminate_common_subexpressions, \
+    TEMPORARY_PREFIX
+from tests.simple.fixtures import example
+
+
+class SubexpressionTests(unittest.TestCase):
+
+    """Tests for module simple.simple_subexpressions."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+
+    # -------------------------------------------------------------------------+
+    # common subexpression elimination tests
+    # -------------------------------------------------------------------------+
+
+    def test_reuse_variable(self):
+        """Test reading a variable that still holds an operation."""
+        statement = Sequence(
+            Assign('a', Add(Variable('x1'), Variable('x0'))),
+            Assign('b', Add(Variable('x1'), Variable('x0'))))
+        self.assertEqual(
+            Block([Assign('a', Add(Variable('x1'), Variable('x0'))),
+                   Assign('b', Variable('a'))]),
+            eliminate_common_subexpressions(statement))
+
+    def test_temporary(self):
+        """Test computing a repeated operand once into a temporary."""
+        t = Variable(TEMPORARY_PREFIX + '0')
+        statement = Block([
+            Assign('a', Multiply(
+                Add(Variable('x'), Variable('y')), Variable('z'))),
+            Assign('b', Multiply(
+                Add(Variable('x'), Variable('y')), Number(2))),
+            Assign('c', Add(Variable('x'), Variable('y')))])
+        self.assertEqual(
+            Block([Assign(t.name, Add(Variable('x'), Variable('y'))),
+                   Assign('a', Multiply(t, Variable('z'))),
+                   Assign('b', Multiply(t, Number(2))),
+                   Assign('c', t),
+                   Delete([t.name])]),
+            eliminate_common_subexpressions(statement))
+
+    def test_within_statement(self):
+        """Test an operation repeated within one expression."""
+        t = Variable(TEMPORARY_PREFIX + '0')
+        x1 = Add(Variable('x'), Number(1))
+        statement = Assign('a', Multiply(x1, Add(Variable('x'), Number(1))))
+        self.assertEqual(
+            Block([Assign(t.name, x1), Assign('a', Multiply(t, t)),
+                   Delete([t.name])]),
+            eliminate_common_subexpressions(statement))
+
+    def test_invalidation(self):
+        """Test operations whose operands or holders are reassigned."""
+        xy = Multiply(Variable('x'), Variable('y'))
+        unchanged = [
+            Block([Assign('a', xy), Assign('x', Number(2)), Assign('b', xy)]),
+            Block([Assign('a', xy), Assign('a', Number(2)), Assign('b', xy)]),
+            Block([Assign('x', Add(Variable('x'), Number(1))),
+                   Assign('y', Add(Variable('x'), Number(1)))])]
+        for statement in unchanged:
+            self.assertIs(
+                statement, eliminate_common_subexpressions(statement))
+
+        # Reassigning an operand by its own expression leaves the value
+        # held by the variable
+        #
+        statement = Block([
+            Assign('x', Add(Variable('x'), Variable('y'))),
+            Assign('z', Add(Variable('x'), Variable('y')))])
+        self.assertIs(statement, eliminate_common_subexpressions(statement))
+
+    def test_exact_constants(self):
+        """Test operations on equal constants of different types."""
+        statement = Assign('a', Multiply(
+            Add(Variable('x'), Number(1)), Add(Variable('x'), Number(1.0))))
+        self.assertIs(statement, eliminate_common_subexpressions(statement))
+
+    def test_conditional(self):
+        """Test the right operand of an and, which may not be evaluated."""
+        xy = Add(Variable('x'), Variable('y'))
+        statement = Block([
+            Assign('a', And(Variable('p'), LessThan(xy, Number(2)))),
+            Assign('b', xy)])
+        self.assertIs(statement, eliminate_common_subexpressions(statement))
+        statement = Block([
+            Assign('b', xy),
+            Assign('a', And(Variable('p'), LessThan(xy, Number(2))))])
+        self.assertEqual(
+            Block([Assign('b', xy), Assign('a', And(
+                Variable('p'), LessThan(Variable('b'), Number(2))))]),
+            eliminate_common_subexpressions(statement))
+
+        # An error the operand would raise is not raised early
+        #
+        env = dict(p=Number(0), x=Number(1), y=Number(0))
+        statement = Block([
+            Assign('a', And(Variable('p'), LessThan(
+                Divide(Variable('x'), Variable('y')), Number(2)))),
+            Assign('b', And(Variable('p'), LessThan(
+                Divide(Variable('x'), Variable('y')), Number(3))))])
+        self.assertEqual(
+            statement.evaluate(dict(env)),
+            eliminate_common_subexpressions(statement).evaluate(dict(env)))
+
+    def test_basic_blocks(self):
+        """Test that loops and branches bound the basic blocks."""
+        t = Variable(TEMPORARY_PREFIX + '0')
+        xy = Multiply(Variable('x'), Variable('y'))
+        body = Block([
+            Assign('a', Add(xy, Variable('i'))),
+            Assign('b', Subtract(xy, Variable('i'))),
+            Assign('i', Add(Variable('i'), Number(1)))])
+        statement = Block([
+            Assign('c', xy),
+            While(LessThan(Variable('i'), Variable('n')), body),
+            If(Variable('a'), Assign('d', xy), Assign('d', Number(0)))])
+        self.assertEqual(
+            Block([
+                Assign('c', xy),
+                While(LessThan(Variable('i'), Variable('n')), Block([
+                    Assign(t.name, xy),
+                    Assign('a', Add(t, Variable('i'))),
+                    Assign('b', Subtract(t, Variable('i'))),
+                    Assign('i', Add(Variable('i'), Number(1))),
+                    Delete([t.name])])),
+                If(Variable('a'), Assign('d', xy), Assign('d', Number(0)))]),
+            eliminate_common_subexpressions(statement))
+
+    def test_temporary_names(self):
+        """Test that temporaries avoid the names the program uses."""
+        name = TEMPORARY_PREFIX + '0'
+        statement = Block([
+            Assign(name, Multiply(
+                Add(Variable('x'), Number(1)), Add(Variable('x'), Number(1))))
+        ])
+        result = eliminate_common_subexpressions(statement)
+        self.assertEqual(
+            Assign(TEMPORARY_PREFIX + '1', Add(Variable('x'), Number(1))),
+            result.statements[0])
+
+    def test_phi(self):
+        """Test that the phi example is left unchanged."""
+        statement = example("phi")
+        self.assertIs(statement, eliminate_common_subexpressions(statement))
+
+    def test_engines(self):
+        """Test that every engine runs the optimized program alike."""
+        xy = Multiply(Variable('x'), Variable('y'))
+        statement = While(LessThan(Variable('i'), Variable('n')), Block([
+            Assign('a', Add(Variable('a'), Add(xy, Variable('i')))),
+            Assign('b', Add(Variable('b'), Subtract(xy, Variable('i')))),
+            Assign('i', Add(Variable('i'), Number(1)))]))
+        optimized = eliminate_common_subexpressions(statement)
+        self.assertIsNot(statement, optimized)
+        for n in (5, 300):
+            env = dict(a=Number(0), b=Number(0), i=Number(0), n=Number(n),
+                       x=Number(3), y=Number(4))
+            expected = statement.evaluate(dict(env))
+            for engine in sorted(ENGINES):
+                result = compile_program(optimized, engine).evaluate(env)
+                self.assertEqual(expected, result, engine)
+                result = compile_program(optimized, engine).evaluate(
+                    PersistentEnvironment(env))
+                self.assertEqual(expected, dict(result.items()), engine)
+
+    def test_temporaries_deleted(self):
+        """Test that temporaries are not left in the environment."""
+        xy = Add(Variable('x'), Variable('y'))
+        statement = Block([
+            Assign('a', Multiply(xy, Number(2))),
+            Assign('b', Multiply(xy, Number(3)))])
+        optimized = eliminate_common_subexpressions(statement)
+        env = dict(x=Number(1), y=Number(2))
+        limits = Limits(variables=4)
+        for engine in sorted(ENGINES):
+            result = compile_program(optimized, engine, limits).evaluate(env)
+            self.assertEqual({'a', 'b', 'x', 'y'}, set(result), engine)
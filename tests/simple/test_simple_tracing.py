@@ -0,0 +1,259 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_tracing."""
+
+import unittest
+import os
+import time
+import warnings
+
+from simple.simple_engines import compile_program
+from simple.simple_environments import MutableEnvironment, \
+    PersistentEnvironment
+from simple.simple_expressions import Add, Boolean, Divide, GreaterThan, \
+    LessThan, Not, Number, Variable
+from simple.simple_limits import Limits
+from simple.simple_statements import Assign, Block, DoNothing, If, \
+    Sequence, While
+from simple.simple_tracing import compile_trace, HOT_LOOP, MAX_TRACES, \
+    trace_loops, TracingWhile
+from tests.simple.fixtures import phi_env, phi_env_inputs
+
+
+class TracingTests(unittest.TestCase):
+
+    """Tests for module simple.simple_tracing."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # tracing tests
+    # -------------------------------------------------------------------------+
+
+    def _count(self, limit, body):
+        """Produce a loop that counts i up to limit around a body."""
+        vi = Variable('i')
+        return While(
+            LessThan(vi, Number(limit)),
+            Sequence(Assign('i', Add(vi, Number(1))), body))
+
+    def test_trace_loops(self):
+        """Check trace_loops() replaces every while statement."""
+        s1 = Sequence(phi_env(), Assign('a', Number(1)))
+        t1 = trace_loops(s1)
+
+        self.assertEqual(s1, t1)
+        self.assertEqual(str(s1), str(t1))
+        self.assertIs(TracingWhile, type(t1.first))
+        self.assertIs(s1.second, t1.second)
+        self.assertEqual(
+            ('i', 'limit', 'x0', 'x1', 'x2', 'phi'), t1.first.names)
+
+    def test_trace_short_loop(self):
+        """Check a loop is not compiled before it turns hot."""
+        t1 = trace_loops(phi_env())
+        env = phi_env_inputs(HOT_LOOP - 1)
+
+        self.assertEqual(phi_env().evaluate(env), t1.evaluate(env))
+        self.assertEqual({}, t1.traces)
+        self.assertEqual(HOT_LOOP - 1, t1.iterations)
+
+    def test_trace_hot_loop(self):
+        """Check a hot loop is compiled and gives the same results."""
+        s1 = phi_env()
+        t1 = trace_loops(s1)
+
+        for env in (phi_env_inputs(HOT_LOOP * 3),
+                    PersistentEnvironment(phi_env_inputs(HOT_LOOP * 3))):
+            expected = s1.evaluate(env)
+            result = t1.evaluate(env)
+            self.assertEqual(expected, result)
+            self.assertIs(type(expected), type(result))
+        self.assertEqual(
+            [(int, int, int, int, int, float)], list(t1.traces))
+
+        for env in (dict(phi_env_inputs(HOT_LOOP * 3)),
+                    MutableEnvironment(phi_env_inputs(HOT_LOOP * 3))):
+            e1 = dict(env)
+            s1.execute(e1)
+            t1.execute(env)
+            self.assertEqual(e1, dict(env))
+
+    def test_trace_guard(self):
+        """Check a guard failure returns the loop to the interpreter."""
+        vx = Variable('x')
+        limit = HOT_LOOP * 3
+        s1 = self._count(limit, If(
+            GreaterThan(Variable('i'), Number(HOT_LOOP * 2)),
+            Assign('x', Divide(vx, Number(2))),
+            Assign('x', Add(vx, Number(1)))))
+        t1 = trace_loops(s1)
+        env = dict(i=Number(0), x=Number(0))
+
+        self.assertEqual(s1.evaluate(env), t1.evaluate(env))
+        self.assertEqual([(int, int)], list(t1.traces))
+        self.assertEqual(limit - HOT_LOOP * 2 - 1, t1.iterations)
+
+        s2 = self._count(limit * 3, If(
+            GreaterThan(Variable('i'), Number(limit)),
+            Assign('x', Divide(vx, Number(2))),
+            Assign('x', Add(vx, Number(1)))))
+        t2 = trace_loops(s2)
+        self.assertEqual(s2.evaluate(env), t2.evaluate(env))
+        self.assertEqual([(int, int), (int, float)], list(t2.traces))
+
+    def test_trace_limit(self):
+        """Check a loop keeps a limited number of compiled functions."""
+        vx = Variable('x')
+        s1 = self._count(HOT_LOOP * (MAX_TRACES + 3), Sequence(
+            Assign('b', Not(Variable('b'))),
+            If(Variable('b'),
+               Assign('x', Add(vx, Number(1))),
+               Assign('x', Add(vx, Number(0.5))))))
+        t1 = trace_loops(s1)
+        env = dict(i=Number(0), x=Number(0), b=Boolean(False))
+
+        self.assertEqual(s1.evaluate(env), t1.evaluate(env))
+        self.assertLessEqual(len(t1.traces), MAX_TRACES)
+
+    def test_trace_nested(self):
+        """Check nested loops are compiled and give the same results."""
+        vj = Variable('j')
+        s1 = self._count(HOT_LOOP * 2, Sequence(
+            Assign('j', Number(0)),
+            While(
+                LessThan(vj, Number(5)),
+                Block([
+                    Assign('j', Add(vj, Number(1))),
+                    Assign('s', Add(Variable('s'), vj))]))))
+        t1 = trace_loops(s1)
+        env = dict(i=Number(0), s=Number(0))
+
+        self.assertEqual(s1.evaluate(env), t1.evaluate(env))
+        self.assertEqual(1, len(t1.traces))
+        self.assertEqual(1, len(t1.body.second.second.traces))
+
+    def test_trace_conditions(self):
+        """Check a variable condition is tested by identity with true."""
+        vi = Variable('i')
+        s1 = While(Variable('b'), Block([
+            Assign('i', Add(vi, Number(1))),
+            Assign('b', LessThan(vi, Number(HOT_LOOP * 2)))]))
+        t1 = trace_loops(s1)
+        env = dict(i=Number(0), b=Boolean(True))
+
+        self.assertEqual(s1.evaluate(env), t1.evaluate(env))
+        self.assertEqual([(bool, int)], list(t1.traces))
+        self.assertEqual(
+            ([1, 0], True), compile_trace(s1, ('b', 'i'), (int, int))([1, 0]))
+        self.assertEqual(
+            ([False, HOT_LOOP * 2], True),
+            compile_trace(s1, ('b', 'i'), (bool, int))([True, 0]))
+
+    def test_trace_constant_conditions(self):
+        """Check constant conditions compile without warnings."""
+        s1 = self._count(HOT_LOOP * 2, If(
+            Add(Number(1), Number(2)),
+            Assign('x', Number(1)),
+            Assign('x', Number(2))))
+        t1 = trace_loops(s1)
+        env = dict(i=Number(0))
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            self.assertEqual(s1.evaluate(env), t1.evaluate(env))
+            run = compile_trace(
+                While(Divide(Number(4), Number(2)), Assign('x', Number(1))),
+                ('x',), (int,))
+        self.assertEqual(1, len(t1.traces))
+        self.assertEqual(([0], True), run([0]))
+
+    def test_trace_unbound(self):
+        """Check unassigned variables raise KeyError."""
+        s1 = self._count(HOT_LOOP * 2, If(
+            GreaterThan(Variable('i'), Number(HOT_LOOP + 10)),
+            Assign('y', Variable('z')),
+            Assign('y', Variable('i'))))
+        t1 = trace_loops(s1)
+
+        with self.assertRaises(KeyError) as context:
+            t1.evaluate(dict(i=Number(0)))
+        self.assertEqual(KeyError('z').args, context.exception.args)
+        self.assertEqual({}, t1.traces)
+        self.assertEqual(1, len(t1.failed))
+
+    def _late_unbound(self, limit):
+        """Produce a loop that reads an unbound variable near its end."""
+        return self._count(limit, If(
+            GreaterThan(Variable('i'), Number(limit - 10)),
+            Assign('y', Variable('z')),
+            DoNothing()))
+
+    def test_trace_unbound_linear(self):
+        """Check a loop reading an unbound variable is not retraced."""
+        def seconds(limit):
+            best = None
+            for _ in range(3):
+                t1 = trace_loops(self._late_unbound(limit))
+                started = time.perf_counter()
+                with self.assertRaises(KeyError):
+                    t1.evaluate(dict(i=Number(0)))
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            return best
+
+        # Four times the iterations should take about four times as
+        # long; tracing again every HOT_LOOP iterations, and throwing
+        # the trace away when it reached the read, made it sixteen
+        #
+        self.assertLess(seconds(HOT_LOOP * 160), 9 * seconds(HOT_LOOP * 40))
+
+    def test_trace_unbound_limits(self):
+        """Check a governed loop reading an unbound variable counts once."""
+        limit = HOT_LOOP * 20
+        for engine in ('tree', 'tracing'):
+            program = compile_program(
+                self._late_unbound(limit), engine, Limits(iterations=limit))
+            with self.assertRaises(KeyError) as context:
+                program.evaluate(dict(i=Number(0)))
+            self.assertEqual(KeyError('z').args, context.exception.args)
+            self.assertEqual(limit - 9, program.governor.iterations)
@@ -0,0 +1,153 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+
+"""Tests for module simple.simple_trees."""
+
+import unittest
+import os
+
+from simple.simple_expressions import Add, Boolean, LessThan, Multiply, \
+    Not, Number, Variable
+from simple.simple_statements import Assign, Block, DoNothing, If, \
+    Sequence, While
+from simple.simple_trees import base_class, children, dispatch, rebuild, \
+    transform, walk
+
+
+class TreeTests(unittest.TestCase):
+
+    """Tests for module simple.simple_trees."""
+
+    def __init__(self, *args):
+        """Test fixture constructor."""
+        super().__init__(*args)
+        self.__devnull = open(os.devnull, "w")
+        self.__root = os.path.dirname(__file__)
+        self.__data_dir = os.path.join(self.__root, "data")
+
+    def __del__(self):
+        """Test fixture destructor."""
+        if self.__devnull is not None:
+            self.__devnull.close()
+            self.__devnull = None
+
+    # -------------------------------------------------------------------------+
+    # setup, teardown, noop
+    # -------------------------------------------------------------------------+
+
+    def setUp(self):  # noqa
+        """Create data used by the test cases."""
+        import tempfile
+
+        self.tempDirPath = tempfile.TemporaryDirectory()
+        return
+
+    def tearDown(self):   # noqa
+        """Cleanup data used by the test cases."""
+        self.tempDirPath.cleanup()
+        self.tempDirPath = None
+
+    def test_noop(self):
+        """Excercise tearDown and setUp methods without side effects.
+
+        This test does nothing itself. It is useful to test the tearDown()
+        and setUp() methods in isolation (without side effects).
+
+        """
+        return
+
+    # -------------------------------------------------------------------------+
+    # tree helper tests
+    # -------------------------------------------------------------------------+
+
+    def test_base_class(self):
+        """Check base_class() for plain and specialized nodes."""
+        class Counter(Assign):
+            pass
+
+        self.assertIs(Add, base_class(Add(Number(1), Number(2))))
+        self.assertIs(Assign, base_class(Counter('a', Number(1))))
+        self.assertIs(DoNothing, base_class(DoNothing()))
+        self.assertRaises(TypeError, base_class, 'a')
+
+    def test_children(self):
+        """Check children() for each kind of node."""
+        n1 = Number(1)
+        va = Variable('a')
+        e1 = LessThan(va, n1)
+        s1 = Assign('a', n1)
+        s2 = Assign('b', va)
+
+        self.assertEqual((), children(n1))
+        self.assertEqual((), children(va))
+        self.assertEqual((va, n1), children(e1))
+        self.assertEqual((e1,), children(Not(e1)))
+        self.assertEqual((n1,), children(s1))
+        self.assertEqual((s1, s2), children(Block([s1, s2])))
+        self.assertEqual((s1, s2), children(Sequence(s1, s2)))
+        self.assertEqual((e1, s1, s2), children(If(e1, s1, s2)))
+        self.assertEqual((e1, s1), children(While(e1, s1)))
+
+    def test_dispatch(self):
+        """Check dispatch() picks the most specific table entry."""
+        class Counter(Assign):
+            pass
+
+        table = {Assign: 'assign', Counter: 'counter', Number: 'number'}
+        self.assertEqual('assign', dispatch(table, Assign('a', Number(1))))
+        self.assertEqual('counter', dispatch(table, Counter('a', Number(1))))
+        self.assertEqual('number', dispatch(table, Number(1)))
+        self.assertRaises(TypeError, dispatch, table, Variable('a'))
+
+    def test_rebuild(self):
+        """Check rebuild() shares unchanged nodes."""
+        n1 = Number(1)
+        n2 = Number(2)
+        e1 = Add(n1, n2)
+
+        self.assertIs(e1, rebuild(e1, [n1, n2]))
+        e2 = rebuild(e1, [n2, n1])
+        self.assertIsNot(e1, e2)
+        self.assertEqual(Add(n2, n1), e2)
+        self.assertEqual(
+            Assign('a', n2), rebuild(Assign('a', n1), [n2]))
+        self.assertEqual(
+            While(Boolean(False), DoNothing()),
+            rebuild(While(Boolean(True), DoNothing()),
+                    [Boolean(False), DoNothing()]))
+
+    def test_transform(self):
+        """Check transform() rewrites the tree bottom up."""
+        va = Variable('a')
+        s1 = Block([
+            Assign('a', Add(va, Number(1))),
+            While(
+                LessThan(va, Number(3)),
+                Assign('a', Multiply(va, Number(2))))])
+
+        def double(node):
+            if isinstance(node, Number):
+                return Number(node.value * 2)
+            return node
+
+        self.assertEqual(
+            Block([
+                Assign('a', Add(va, Number(2))),
+                While(
+                    LessThan(va, Number(6)),
+                    Assign('a', Multiply(va, Number(4))))]),
+            transform(s1, double))
+        self.assertIs(s1, transform(s1, lambda node: node))
+
+    def test_walk(self):
+        """Check walk() visits nodes in pre-order."""
+        va = Variable('a')
+        n1 = Number(1)
+        e1 = Add(va, n1)
+        s1 = Assign('a', e1)
+        s2 = DoNothing()
+        s3 = Sequence(s1, s2)
+
+        self.assertEqual([s3, s1, e1, va, n1, s2], list(walk(s3)))